@@ -0,0 +1,139 @@
+# Model artifact size, load time and per-process memory: pickled bundle vs memory-mapped serving artifact
+# run from the repo root: python -m benchmarks.bench_artifact [--processes 4]
+# memory is read from /proc/self/smaps_rollup (Linux); PSS splits shared pages between the processes mapping them
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from modules.asian_range_feature import AsianRange
+from modules.bundle import ModelBundle, artifact_path, model_path
+from modules.candle import CandleSeries
+from modules.model import Model
+from modules.synthetic import generate_candles
+
+
+def dir_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def memory_kb() -> dict:
+    # Rss / Pss / Private_* of this process, in kB
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    out[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        pass
+    return out
+
+
+def _child(workdir: str, ticker: str, how: str, rows, barrier, results):
+    # load one model the given way, score a batch, report memory while every child holds its copy
+    os.chdir(workdir)
+    before = memory_kb()
+    if how == "pickle":
+        warnings.filterwarnings("ignore", category=UserWarning)  # scaler was fitted with feature names
+        with open(model_path(ticker), "rb") as f:
+            bundle = pickle.load(f)
+        bundle["model"].predict(bundle["scaler"].transform(rows))
+    else:
+        forest = ModelBundle.load(ticker).forest
+        forest.predict(rows)
+        for name in ("feature", "threshold", "left", "right", "value", "missing_left"):
+            getattr(forest, name).sum()  # touch every page
+    barrier.wait()
+    after = memory_kb()
+    results.put({k: after.get(k, 0) - before.get(k, 0) for k in ("Rss", "Pss", "Private_Clean", "Private_Dirty")})
+    barrier.wait()  # keep the mapping alive until everyone has measured
+
+
+def measure(workdir: str, ticker: str, how: str, rows, processes: int) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(processes), ctx.Queue()
+    procs = [ctx.Process(target=_child, args=(workdir, ticker, how, rows, barrier, results)) for _ in range(processes)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {k: sum(r[k] for r in out) for k in out[0]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serving artifact vs pickled model: size, load time, shared memory")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    candles = CandleSeries.from_frame(generate_candles(args.years, seed=args.seed))
+    ar = AsianRange("SYNTH", candles)
+    ar._run_backtest()
+    features = pd.DataFrame(ar._data)
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        report(workdir, features, args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+def report(workdir: str, features: pd.DataFrame, args):
+    model = Model("SYNTH", features)
+    model.model = RandomForestClassifier(n_estimators=args.trees, random_state=args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.train()
+    rows = model.x.to_numpy(dtype=float)[-64:]
+    print(f"{len(features)} feature rows, {args.trees} trees")
+
+    sizes = {"pickle": dir_size(model_path("SYNTH")), "artifact float64": dir_size(artifact_path("SYNTH"))}
+    for label, keep, f32 in (("artifact float32", None, True), ("artifact float32, 50% trees", 0.5, True)):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            model.export_forest(keep, f32)
+        sizes[label] = dir_size(artifact_path("SYNTH"))
+        print(out.getvalue().strip())
+    for label, size in sizes.items():
+        print(f"{label:28s} {size / 1024:10.1f} kB")
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.export_forest()  # back to the exact artifact for the timings below
+
+    t0 = time.perf_counter()
+    with open(model_path("SYNTH"), "rb") as f:
+        pickle.load(f)
+    t_pickle = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ModelBundle.load("SYNTH")
+    t_mmap = time.perf_counter() - t0
+    print(f"load: pickle {t_pickle * 1000:.1f} ms, memory-mapped artifact {t_mmap * 1000:.1f} ms")
+
+    if not memory_kb():
+        print("/proc/self/smaps_rollup not available, memory not measured")
+        return
+    for how in ("pickle", "mmap"):
+        total = measure(workdir, "SYNTH", how, rows, args.processes)
+        print(f"{how:7s} x{args.processes}: RSS +{total['Rss'] / 1024:7.1f} MB  PSS +{total['Pss'] / 1024:7.1f} MB  "
+              f"private +{(total['Private_Clean'] + total['Private_Dirty']) / 1024:7.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# CPU time and memory of the multi-symbol monitor as symbols are added, vs one process per symbol
+# run from the repo root: python -m benchmarks.bench_monitor [--symbols 1 4 16]
+# every count runs in a fresh process; all symbols replay synthetic candles and share one trained bundle
+import argparse
+import asyncio
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_artifact import memory_kb
+from benchmarks.bench_startup import make_bundle
+from modules.bundle import artifact_path, model_path
+
+
+def _child(workdir: str, symbols: int, years: float, workers: int, results):
+    os.chdir(workdir)
+    from modules.base_bot import LocalBot
+    from modules.candle import CandleSeries
+    from modules.metrics import Metrics
+    from modules.monitor import Monitor
+    from modules.replay import ReplaySource, bar_events
+    from modules.synthetic import generate_candles
+
+    tickers = [f"SYM{i}" for i in range(symbols)]
+    candles = {t: CandleSeries.from_frame(generate_candles(years, seed=i)) for i, t in enumerate(tickers)}
+    monitor = Monitor({t: ReplaySource(c) for t, c in candles.items()}, bot=LocalBot(), workers=workers,
+                      metrics=Metrics(path=None), send_charts=False)
+    events = bar_events(candles[tickers[0]])
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor.load_models()
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        asyncio.run(monitor.process(events))
+        cpu, wall = time.process_time() - cpu0, time.perf_counter() - t0
+    rss = memory_kb().get("Rss", 0)
+    monitor.close()
+    results.put({"symbols": symbols, "events": len(events), "cpu": cpu, "wall": wall, "rss": rss})
+
+
+def measure(workdir: str, symbols: int, years: float, workers: int) -> dict:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(workdir, symbols, years, workers, results))
+    proc.start()
+    out = results.get()
+    proc.join()
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-symbol monitor: CPU and memory vs number of symbols")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--years", type=float, default=0.25, help="replayed history per symbol")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        make_bundle(workdir, 1, args.seed)
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for i in range(max(args.symbols)):  # same model under every symbol name
+                shutil.copy(model_path("EURUSD"), model_path(f"SYM{i}"))
+                shutil.copytree(artifact_path("EURUSD"), artifact_path(f"SYM{i}"))
+        finally:
+            os.chdir(cwd)
+
+        rows = [measure(workdir, n, args.years, args.workers) for n in args.symbols]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    single = next((r for r in rows if r["symbols"] == 1), None)
+    print(f"{'symbols':>7s} {'cpu ms/bar':>11s} {'per symbol':>11s} {'RSS MB':>8s} {'per symbol':>11s}"
+          f"{'  1 process/symbol RSS MB' if single else ''}")
+    for r in rows:
+        per_bar = r["cpu"] / r["events"] * 1000
+        line = (f"{r['symbols']:7d} {per_bar:11.2f} {per_bar / r['symbols']:11.2f} {r['rss'] / 1024:8.1f} "
+                f"{r['rss'] / 1024 / r['symbols']:11.1f}")
+        if single:
+            line += f" {single['rss'] * r['symbols'] / 1024:25.1f}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
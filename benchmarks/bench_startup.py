@@ -0,0 +1,98 @@
+# Cold-start time of the live path and the model tests, each measured in a fresh interpreter
+# run from the repo root: python -m benchmarks.bench_startup [--limit 1.0] [--model-limit 1.0]
+# a synthetic model bundle is trained into a temp directory first, so no real artifacts are needed
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.model import Model
+from modules.synthetic import generate_candles
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("sklearn", "matplotlib", "telegram", "MetaTrader5")
+
+# each child prints "<seconds> <heavy modules loaded>"
+_CHILD = """
+import sys, time
+t0 = time.perf_counter()
+{body}
+seconds = time.perf_counter() - t0
+print(seconds, ",".join(m for m in {heavy!r} if m in sys.modules) or "-")
+"""
+
+CASES = {
+    # what live_runner.py does before its first fetch (with a local bot instead of Telegram)
+    "import_live": ("from modules.live_trading import LiveTrader", ()),
+    "live_ready": ("from modules.live_trading import LiveTrader\n"
+                   "from modules.base_bot import LocalBot\n"
+                   "LiveTrader('EURUSD', bot=LocalBot()).load_model()", ()),  # MT5 connects on first fetch
+    # test_model.setUp: metadata only, the estimator is unpickled (with sklearn) on first prediction
+    "model_load": ("from modules.model import Model\n"
+                   "Model('EURUSD').load_model()", ()),
+}
+
+
+def make_bundle(path: str, years: float, seed: int):
+    # train and save a synthetic EURUSD bundle under path/modules/data/models
+    candles = CandleSeries.from_frame(generate_candles(years, seed=seed))
+    ar = AsianRange("EURUSD", candles)
+    ar._run_backtest()
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            Model("EURUSD", pd.DataFrame(ar._data)).train()
+    finally:
+        os.chdir(cwd)
+
+
+def run_child(body: str, cwd: str) -> tuple[float, str]:
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    code = _CHILD.format(body=body, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    seconds, loaded = out.stdout.strip().splitlines()[-1].split(" ")
+    return float(seconds), loaded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start time of the live path and model loading")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=float, default=1.0, help="seconds allowed for live_ready")
+    parser.add_argument("--model-limit", type=float, default=1.0, help="seconds allowed for model_load")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_bundle(tmp, args.years, args.seed)
+        results = {}
+        for name, (body, needs) in CASES.items():
+            missing = [m for m in needs if importlib.util.find_spec(m) is None]
+            if missing:
+                print(f"{name:12s}    skipped ({', '.join(missing)} not installed)")
+                continue
+            runs = [run_child(body, tmp) for _ in range(args.repeat)]
+            times = [t for t, _ in runs]
+            results[name] = statistics.median(times)
+            print(f"{name:12s} {min(times) * 1000:8.1f} ms best  {results[name] * 1000:8.1f} ms median  "
+                  f"heavy imports: {runs[-1][1]}")
+
+    over = [(name, limit) for name, limit in (("live_ready", args.limit), ("model_load", args.model_limit))
+            if results.get(name, 0.0) > limit]
+    for name, limit in over:
+        print(f"{name} is over the {limit:.2f}s limit")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
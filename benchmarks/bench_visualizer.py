@@ -0,0 +1,65 @@
+# Chart render time: original per-row pyplot drawing vs the batched, reused-template Visualizer
+# run from the repo root: python -m benchmarks.bench_visualizer
+import io
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from modules.candle import CandleSeries
+from modules.sessions import label_sessions
+from modules.visualizer import Visualizer
+
+
+def random_window(n=100, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-06-03", periods=n, freq="30min", tz="UTC")
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0007, n)), 5)
+    opens = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0, 0.0005, (2, n)))
+    df = pd.DataFrame({"Date": dates, "Open": opens, "High": np.maximum(opens, close) + wick[0],
+                       "Low": np.minimum(opens, close) - wick[1], "Close": close, "Volume": 100})
+    df["Session"] = label_sessions(df["Date"])
+    return df
+
+
+def render_original(ticker: str, df: pd.DataFrame) -> bytes:
+    # the drawing code Visualizer used before: one plot call per wick/body, one axvspan per Asia bar
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for _, row in df.iterrows():
+        color = 'green' if row["Close"] >= row["Open"] else 'red'
+        ax.plot([row["Date"], row["Date"]], [row["Low"], row["High"]], color='black')
+        ax.plot([row["Date"], row["Date"]], [row["Open"], row["Close"]], color=color, linewidth=4)
+    for date in df[df["Session"] == "Asia"]["Date"]:
+        ax.axvspan(date, date + pd.Timedelta(minutes=30), color='blue', alpha=0.1)
+    ax.set_title(ticker)
+    ax.grid(True)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def timeit(fn, repeat=10) -> float:
+    fn()  # warm-up (font cache, first figure)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    df = random_window()
+    candles = CandleSeries.from_frame(df)
+    levels = {"asian_high": float(df["High"].max()), "asian_low": float(df["Low"].min())}
+    old = timeit(lambda: render_original("EURUSD", df))
+    new = timeit(lambda: Visualizer("EURUSD", candles).render(levels))
+    print(f"original : {old * 1000:7.1f} ms/chart")
+    print(f"batched  : {new * 1000:7.1f} ms/chart  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
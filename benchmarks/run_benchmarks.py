@@ -0,0 +1,130 @@
+# Timing suite for the hot paths, on synthetic candles (offline, no MT5 terminal)
+# python -m benchmarks.run_benchmarks                 compare against benchmarks/baseline.json
+# python -m benchmarks.run_benchmarks --update        write a new baseline (do this once per machine)
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import pandas as pd
+
+from modules import fast_forest, indicators
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.day_index import DayIndex
+from modules.model import Model
+from modules.sessions import label_sessions
+from modules.synthetic import generate_candles
+from modules.visualizer import Visualizer
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def best_of(fn, repeat: int, min_sample: float = 0.01) -> float:
+    # fastest of `repeat` samples, after one warm-up; cases faster than `min_sample` seconds are run
+    # many times per sample and timed per call, so timer resolution and scheduling noise average out
+    t0 = time.perf_counter()
+    fn()
+    number = max(1, math.ceil(min_sample / max(time.perf_counter() - t0, 1e-9)))
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return min(times)
+
+
+def quiet(fn):
+    # Model.train prints its classification report
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def build_cases(years: float, seed: int) -> dict:
+    df = generate_candles(years, seed=seed)
+    candles = CandleSeries.from_frame(df)
+    dates = df["Date"]
+    ar = AsianRange("SYNTH", candles)
+    ar._run_backtest()
+    features = pd.DataFrame(ar._data)
+
+    model = Model("SYNTH", features)
+    quiet(lambda: model.train(save=False))()
+    forest = fast_forest.FlatForest(fast_forest.export_forest(model.model, model.scaler))
+    row = model.x.to_numpy(dtype=float)[-1]
+    window = candles[-100:]
+    levels = {"asian_high": float(window.high.max()), "asian_low": float(window.low.min())}
+    days = DayIndex(candles)
+    today = candles[-1].date.date()
+
+    return {
+        "label_sessions": lambda: label_sessions(dates),
+        "indicators": lambda: indicators.compute_all(candles.high, candles.low, candles.close),
+        "backtest": ar._run_backtest,
+        "model_train": quiet(lambda: Model("SYNTH", features).train(save=False)),
+        "predict_row": lambda: forest.predict(row),
+        "render_chart": lambda: Visualizer("SYNTH", window).render(levels),
+        "day_index": lambda: DayIndex(candles),
+        "today_lookup": lambda: (days.asian_range(today), days.session(candles, today, "London")),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, floor: float = 50e-6) -> list[str]:
+    # names of the cases that got slower than baseline * (1 + tolerance) and by more than `floor` seconds
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + tolerance) and seconds - baseline[name] > floor]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the strategy hot paths on synthetic data")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--floor", type=float, default=50.0,
+                        help="slowdowns smaller than this many microseconds are never a regression")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="save the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.years, args.seed)
+    results = {name: best_of(fn, args.repeat) for name, fn in cases.items()}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved.get("years") == args.years and saved.get("seed") == args.seed:
+            baseline = saved["results"]
+        else:
+            print(f"Baseline was recorded for {saved.get('years')} years / seed {saved.get('seed')}, not compared.")
+
+    for name, seconds in results.items():
+        ref = baseline.get(name)
+        change = f"{(seconds / ref - 1) * 100:+6.1f}%" if ref else "     -"
+        print(f"{name:15s} {seconds * 1000:10.2f} ms  {change}")
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump({"years": args.years, "seed": args.seed, "results": results}, f, indent=1)
+        print("Baseline saved:", args.baseline)
+        return 0
+
+    slower = compare(results, baseline, args.tolerance, args.floor / 1e6)
+    if slower:
+        print("Slower than baseline:", ", ".join(slower))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+# compare M30-only backtest labels with M1 intrabar resolution, side by side
+import argparse
+from datetime import datetime
+from modules import indicators
+from modules.candle import CandleSeries
+from modules.intrabar import IntrabarStore, compare
+
+
+def fetch_m1(ticker: str, date_from: datetime) -> IntrabarStore:
+    # download M1 bars once into the memory-mapped store (the M30 CSV is left alone)
+    from modules.collect_data import MT5DataFetcher
+    fetcher = MT5DataFetcher(ticker, timeframe=1, date_from=date_from)  # M1
+    fetcher._fetch_data()
+    store = IntrabarStore.for_ticker(ticker)
+    store.write(fetcher.df)
+    print(f"M1 bars stored: {len(fetcher.df)} in {store.path}")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intrabar (M1) resolution of ambiguous backtest bars")
+    parser.add_argument("ticker", nargs="?", default="EURUSD")
+    parser.add_argument("--fetch", action="store_true", help="download M1 data from MT5 first")
+    parser.add_argument("--lookahead", type=int, default=30)
+    args = parser.parse_args()
+
+    candles = CandleSeries.from_csv(f"modules/data/price/{args.ticker}.csv")
+    store = IntrabarStore.for_ticker(args.ticker)
+    if args.fetch or not store.exists():
+        store = fetch_m1(args.ticker, candles.dates[0].tz_localize(None).to_pydatetime())
+
+    report = compare(candles, store, indicators.compute_all(candles.high, candles.low, candles.close),
+                     args.lookahead)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
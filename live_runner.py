@@ -1,6 +1,24 @@
 # simple script to launch the live trader
+# python live_runner.py                  -> EURUSD
+# python live_runner.py EURUSD GBPUSD …  -> all symbols in one process (modules.monitor)
+# --source synthetic / "backup/{symbol}.csv" runs the same loop without a MetaTrader terminal
+import argparse
 from modules.live_trading import LiveTrader
 
 if __name__ == "__main__":
-    trader = LiveTrader(ticker="EURUSD")
-    trader.run()
+    parser = argparse.ArgumentParser(description="Live Asian range sweep monitor")
+    parser.add_argument("tickers", nargs="*", default=["EURUSD"])
+    parser.add_argument("--source", default="mt5", help='"mt5", "synthetic[:years]" or a price file pattern')
+    args = parser.parse_args()
+
+    from modules.data_source import open_source
+    source = open_source(args.source)
+    if len(args.tickers) == 1:
+        from modules.collect_data import MT5DataFetcher
+        ticker = args.tickers[0]
+        trader = LiveTrader(ticker=ticker, fetcher=MT5DataFetcher(ticker, source=source))
+        trader.run()
+    else:
+        import asyncio
+        from modules.monitor import live_monitor
+        asyncio.run(live_monitor(args.tickers, source=source).run())
@@ -0,0 +1,210 @@
+# Vectorized backtest of Asian range sweeps, grouped by trading day
+# produces exactly the same rows as the per-candle loop in AsianRange
+import numpy as np
+import pandas as pd
+from modules.candle import CandleSeries
+
+# feature columns, in the order AsianRange has always written them
+COLUMNS = [
+    "index", "date", "asian_high", "asian_low", "session",
+    "trade_direction", "entry_price", "tp1_hit", "tp2_hit",
+    "sl_hit", "be_hit", "rr_tp1", "rr_tp2",
+    "atr14", "ema20", "rsi14", "macd",
+    "prev_result", "prev_direction", "prev_traded",
+    "day_type", "asia_vol", "london_vol",
+]
+INDICATOR_COLUMNS = ["atr14", "ema20", "rsi14", "macd"]
+WEEKDAYS = np.array(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], dtype=object)
+
+_DAY_NS = 86_400_000_000_000
+
+
+def empty_result() -> dict[str, np.ndarray]:
+    return {col: np.array([], dtype=object) for col in COLUMNS}
+
+
+def trading_days(candles: CandleSeries) -> np.ndarray:
+    # calendar day number (days since 1970-01-01) of every bar
+    return candles.time.astype(np.int64) // _DAY_NS
+
+
+def asia_blocks(candles: CandleSeries):
+    # every run of consecutive Asia bars is one block; returns for each bar the
+    # latest block seen so far (0 = none yet) plus the high/low of every block
+    is_asia = candles.session_mask("Asia")
+    starts = is_asia & ~np.r_[False, is_asia[:-1]]
+    block_of = np.cumsum(starts)
+    asia_idx = np.flatnonzero(is_asia)
+    if len(asia_idx) == 0:
+        return block_of, np.empty(0), np.empty(0)
+    seg = np.searchsorted(asia_idx, np.flatnonzero(starts))
+    block_high = np.maximum.reduceat(candles.high[asia_idx], seg)
+    block_low = np.minimum.reduceat(candles.low[asia_idx], seg)
+    return block_of, block_high, block_low
+
+
+def _first(mask: np.ndarray) -> np.ndarray:
+    # column of the first True per row, or the row width when there is none
+    if mask.shape[1] == 0:  # lookahead=0: argmax has nothing to reduce over
+        return np.zeros(mask.shape[0], dtype=np.int64)
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    # Python's round() on the (few) trade rows keeps the CSV identical to the old loop
+    return np.array([round(v, digits) for v in values.tolist()], dtype=np.float64)
+
+
+def find_sweeps(candles: CandleSeries, block_of, block_high, block_low, one_trade_per_day: bool = True,
+                start: int = 0):
+    # London bars that wick through the Asian range and close back inside (first one per day by default)
+    has_block = block_of > 0
+    b = np.maximum(block_of - 1, 0)
+    ah = np.where(has_block, block_high[b] if len(block_high) else np.nan, np.nan)
+    al = np.where(has_block, block_low[b] if len(block_low) else np.nan, np.nan)
+    london = candles.session_mask("London") & has_block
+
+    short = london & (candles.high > ah) & (ah > candles.close)
+    long = london & ~short & (candles.low < al) & (al < candles.close)
+    idx = np.flatnonzero(short | long)
+    idx = idx[idx >= start]
+
+    if one_trade_per_day and len(idx):
+        days = trading_days(candles)[idx]
+        idx = idx[np.r_[True, days[1:] != days[:-1]]]
+    return idx, short[idx], ah[idx], al[idx]
+
+
+def resolve_outcomes(high, low, idx, short, entry, sl, tp1, tp2, lookahead: int, resolver=None):
+    # first-touch times of SL, TP1, BE and TP2 over the lookahead window of every trade
+    # resolver: optional callable deciding bars that touch SL and TP1 together from finer data
+    n = len(high)
+    offs = idx[:, None] + 1 + np.arange(lookahead)[None, :]
+    valid = offs < n
+    offs = np.minimum(offs, n - 1)
+    fh = np.where(valid, high[offs], np.nan)
+    fl = np.where(valid, low[offs], np.nan)
+
+    s = short[:, None]
+    sl_touch = np.where(s, fh >= sl[:, None], fl <= sl[:, None])
+    tp1_touch = np.where(s, fl <= tp1[:, None], fh >= tp1[:, None])
+    tp2_touch = np.where(s, fl <= tp2[:, None], fh >= tp2[:, None])
+    be_touch = np.where(s, fh >= entry[:, None], fl <= entry[:, None])
+
+    # SL is checked before TP1 inside a bar, so a tie goes to SL
+    col = np.arange(lookahead)[None, :]
+    s0 = _first(sl_touch)
+    t1 = _first(tp1_touch)
+    sl_hit = (s0 < lookahead) & (s0 <= t1)
+    tp1_hit = (t1 < lookahead) & (t1 < s0)
+
+    won, won_tp2 = np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+    if resolver is not None:
+        tie = np.flatnonzero(sl_hit & (s0 == t1))
+        known, tp1_first, tp2_first = resolver(idx[tie] + 1 + s0[tie], short[tie], entry[tie], sl[tie],
+                                               tp1[tie], tp2[tie])
+        keep = known & tp1_first
+        won, won_tp2 = tie[keep], tp2_first[keep]
+        sl_hit[won] = False
+        tp1_hit[won] = True
+
+    # after TP1 the stop sits at entry; TP2 can still fill on the TP1 bar itself
+    be = _first(be_touch & (col > t1[:, None]))
+    t2 = _first(tp2_touch & (col >= t1[:, None]))
+    if len(won):
+        # price went on to the stop inside the TP1 bar, so it crossed entry there unless TP2 filled first
+        t2[won] = np.where(won_tp2, t1[won], t2[won])
+        be[won] = np.where(won_tp2, be[won], t1[won])
+    tp2_hit = tp1_hit & (t2 < lookahead) & (t2 < be)
+    be_hit = tp1_hit & ~tp2_hit & (be < lookahead)
+
+    end = np.where(sl_hit, s0, np.where(tp2_hit, t2, np.where(be_hit, be, lookahead - 1)))
+    seen = valid & (col <= end[:, None])
+    london_high = np.maximum(high[idx], np.where(seen, fh, -np.inf).max(axis=1, initial=-np.inf))
+    london_low = np.minimum(low[idx], np.where(seen, fl, np.inf).min(axis=1, initial=np.inf))
+    return {
+        "tp1_hit": tp1_hit.astype(np.int64), "tp2_hit": tp2_hit.astype(np.int64),
+        "sl_hit": sl_hit.astype(np.int64), "be_hit": be_hit.astype(np.int64),
+        "london_high": london_high, "london_low": london_low,
+    }
+
+
+def link_previous(days: np.ndarray, result: np.ndarray, direction: np.ndarray):
+    # previous calendar day's (last) trade result/direction, "None" when there was no trade
+    k = len(days)
+    pos = np.maximum(np.searchsorted(days, days - 1, side="right") - 1, 0)
+    has = (days[pos] == days - 1) if k else np.zeros(0, dtype=bool)
+    prev_result = np.where(has, result[pos] if k else result, "None").astype(object)
+    prev_direction = np.where(has, direction[pos] if k else direction, "None").astype(object)
+    return prev_result, prev_direction, has.astype(np.int64)
+
+
+def trade_results(tp1_hit, tp2_hit, sl_hit) -> np.ndarray:
+    # the label the next day's row sees as prev_result
+    return np.select([np.asarray(tp1_hit) == 1, np.asarray(tp2_hit) == 1, np.asarray(sl_hit) == 1],
+                     ["TP1", "TP2", "SL"], "BE").astype(object)
+
+
+def run_backtest(candles: CandleSeries, indicators: dict | None = None, lookahead: int = 30,
+                 tp1_frac: float = 0.5, one_trade_per_day: bool = True, start: int = 0,
+                 resolver=None) -> dict[str, np.ndarray]:
+    # whole backtest in array operations: Asia blocks -> sweeps -> outcomes -> feature rows
+    # tp1_frac: how far across the Asian range TP1 sits, measured from the swept side (0.5 = mid)
+    # start: only trades entered at bar `start` or later (earlier bars still give Asia ranges)
+    # resolver: see resolve_outcomes (e.g. intrabar.IntrabarResolver)
+    if len(candles) == 0:
+        return empty_result()
+    block_of, block_high, block_low = asia_blocks(candles)
+    idx, short, ah, al = find_sweeps(candles, block_of, block_high, block_low, one_trade_per_day, start)
+    if len(idx) == 0:
+        return empty_result()
+
+    entry = candles.close[idx]
+    sl = np.where(short, candles.high[idx], candles.low[idx])
+    if tp1_frac == 0.5:
+        tp1 = (ah + al) / 2
+    else:
+        tp1 = np.where(short, ah - tp1_frac * (ah - al), al + tp1_frac * (ah - al))
+    tp2 = np.where(short, al, ah)
+
+    risk = np.where(short, sl - entry, entry - sl)
+    safe = np.where(risk != 0, risk, 1.0)
+    rr_tp1 = np.where(risk != 0, np.where(short, entry - tp1, tp1 - entry) / safe, 0)
+    rr_tp2 = np.where(risk != 0, np.where(short, entry - tp2, tp2 - entry) / safe, 0)
+
+    out = resolve_outcomes(candles.high, candles.low, idx, short, entry, sl, tp1, tp2, lookahead, resolver)
+    direction = np.where(short, "Short", "Long").astype(object)
+    result = trade_results(out["tp1_hit"], out["tp2_hit"], out["sl_hit"])
+    days = trading_days(candles)[idx]
+    prev_result, prev_direction, prev_traded = link_previous(days, result, direction)
+
+    indicators = indicators or {}
+    data = {
+        "index": candles.index[idx],
+        "date": candles.dates[idx],
+        "asian_high": ah,
+        "asian_low": al,
+        "session": np.full(len(idx), "London", dtype=object),
+        "trade_direction": direction,
+        "entry_price": entry,
+        "tp1_hit": out["tp1_hit"],
+        "tp2_hit": out["tp2_hit"],
+        "sl_hit": out["sl_hit"],
+        "be_hit": out["be_hit"],
+        "rr_tp1": _round(rr_tp1, 2),
+        "rr_tp2": _round(rr_tp2, 2),
+        "prev_result": prev_result,
+        "prev_direction": prev_direction,
+        "prev_traded": prev_traded,
+        "day_type": WEEKDAYS[(days + 3) % 7],
+        "asia_vol": ah - al,
+        "london_vol": out["london_high"] - out["london_low"],
+    }
+    for col in INDICATOR_COLUMNS:
+        values = indicators.get(col)
+        data[col] = np.asarray(values, dtype=np.float64)[idx] if values is not None else np.full(len(idx), np.nan)
+    return {col: data[col] for col in COLUMNS}
+
+
+def to_frame(data: dict) -> pd.DataFrame:
+    return pd.DataFrame(data, columns=COLUMNS)
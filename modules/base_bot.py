@@ -1,4 +1,6 @@
 # base_bot.py
+import threading
+import time
 from abc import ABC, abstractmethod
 
 # Abstract base class for a bot (to demonstrate abstraction)
@@ -11,5 +13,38 @@ class BaseBot(ABC):
 
     # Abstract method for sending a photo (from file or bytes)
     @abstractmethod
-    def send_photo(self, data):
+    def send_photo(self, data, caption=None):
         pass
+
+    # Several photos as one post; backends without albums send them one by one
+    def send_album(self, photos, caption=None):
+        for i, data in enumerate(photos):
+            self.send_photo(data, caption if i == 0 else None)
+
+
+# Stand-in backend that only records what would have been sent (tests, replays, benchmarks)
+class LocalBot(BaseBot):
+
+    def __init__(self, delay: float = 0.0, fail_first: int = 0):
+        self.delay = delay  # simulated network time per send
+        self.fail_first = fail_first  # number of sends that raise before things start working
+        self.sent = []  # (kind, payload, caption, time)
+        self._lock = threading.Lock()
+
+    def _record(self, kind, payload, caption=None):
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                raise ConnectionError("simulated send failure")
+            self.sent.append((kind, payload, caption, time.monotonic()))
+
+    def send_message(self, text):
+        self._record("message", text)
+
+    def send_photo(self, data, caption=None):
+        self._record("photo", data, caption)
+
+    def send_album(self, photos, caption=None):
+        self._record("album", list(photos), caption)
@@ -1,6 +1,6 @@
 import asyncio
-from telegram import Bot as _TGBot
-from io import BytesIO
+from pathlib import Path
+from telegram import Bot as _TGBot, InputMediaPhoto
 from dotenv import load_dotenv
 import os
 from modules.base_bot import BaseBot
@@ -11,33 +11,32 @@ class Bot(BaseBot):
         load_dotenv()  # load API keys from .env file
         self._bot = _TGBot(token=os.getenv("TELEGRAM_TOKEN"))
         self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        # one loop for the bot's lifetime, so its HTTP connection pool is reused between sends
+        self._loop = asyncio.new_event_loop()
 
     def _run_async(self, coro):
-        # this lets us call async methods from sync code
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        # this lets us call async methods from sync code (one caller thread at a time)
+        return self._loop.run_until_complete(coro)
 
-        if loop.is_running():
-            return asyncio.ensure_future(coro)
-        else:
-            return loop.run_until_complete(coro)
+    @staticmethod
+    def _photo(data):
+        # bytes go as they are, paths are streamed by the library instead of read into memory here
+        if isinstance(data, (bytes, bytearray)):
+            return bytes(data)
+        return Path(data)
 
-    def send_photo(self, data):
+    def send_photo(self, data, caption=None):
         # accepts either path or image bytes
-        if isinstance(data, (bytes, bytearray)):
-            bio = BytesIO(data)
-            coro = self._bot.send_photo(self.chat_id, photo=bio)
-        else:
-            with open(data, "rb") as f:
-                file_bytes = f.read()
-                bio = BytesIO(file_bytes)
-                coro = self._bot.send_photo(self.chat_id, photo=bio)
-        self._run_async(coro)
+        self._run_async(self._bot.send_photo(self.chat_id, photo=self._photo(data), caption=caption))
+
+    def send_album(self, photos, caption=None):
+        # Telegram albums need at least two photos
+        photos = list(photos)
+        if len(photos) == 1:
+            return self.send_photo(photos[0], caption)
+        media = [InputMediaPhoto(self._photo(p), caption=caption if i == 0 else None) for i, p in enumerate(photos)]
+        self._run_async(self._bot.send_media_group(self.chat_id, media=media))
 
     def send_message(self, text):
         # send text message
-        coro = self._bot.send_message(self.chat_id, text)
-        self._run_async(coro)
+        self._run_async(self._bot.send_message(self.chat_id, text))
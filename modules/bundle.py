@@ -0,0 +1,103 @@
+# Serving-only model bundle: everything the live path needs to score a raw feature vector
+# the serving artifact is a directory of uncompressed .npy tree arrays, memory-mapped read-only so
+# processes serving the same model share pages, plus a JSON header (scaler, label maps, columns);
+# neither the training features nor sklearn are loaded, the pickled estimator is only read on demand
+import os
+import pickle
+
+from modules.fast_forest import FlatForest, export_forest, load_forest, open_forest, read_header, write_arrays
+
+SCHEMA_VERSION = 3  # bump when the bundle layout or the feature encoding changes
+
+
+def model_path(ticker: str) -> str:
+    # one model bundle per symbol
+    return f"modules/data/models/{ticker}_model.pkl"
+
+
+def forest_path(ticker: str) -> str:
+    return f"modules/data/models/{ticker}_forest.npz"
+
+
+def artifact_path(ticker: str) -> str:
+    return f"modules/data/models/{ticker}_serving"
+
+
+def save_artifact(ticker: str, arrays: dict, label_maps: dict, columns: list, scaler=None, **info):
+    # info: anything worth keeping next to the trees (pruning, float32, ...)
+    # JSON keys are strings; the live path looks labels up by their string form anyway
+    maps = {col: {str(k): int(v) for k, v in mapping.items()} for col, mapping in label_maps.items()}
+    header = {"schema_version": SCHEMA_VERSION, "label_maps": maps, "columns": list(columns),
+              "scaler": None if scaler is None else {"mean": scaler.mean_.tolist(), "scale": scaler.scale_.tolist()},
+              "trees": len(arrays["roots"]), **info}
+    write_arrays(arrays, artifact_path(ticker), header)
+
+
+class ModelBundle:
+
+    def __init__(self, ticker: str, label_maps: dict, columns: list, schema_version: int = SCHEMA_VERSION,
+                 forest: FlatForest | None = None, estimator=None, scaler=None):
+        self.ticker = ticker
+        self.label_maps = label_maps
+        self.columns = columns
+        self.schema_version = schema_version
+        self.forest = forest  # flattened trees, scaler folded in
+        self._estimator = estimator
+        self._scaler = scaler
+        self._unpickled = estimator is not None
+
+    @classmethod
+    def load(cls, ticker: str, mmap: bool = True) -> "ModelBundle":
+        path = model_path(ticker)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Trained model for {ticker} not found. Train and save first.")
+
+        artifact = artifact_path(ticker)
+        if os.path.exists(os.path.join(artifact, "header.json")):
+            header = read_header(artifact)
+            if header["schema_version"] != SCHEMA_VERSION:
+                raise ValueError(f"Model bundle for {ticker} has schema {header['schema_version']}, "
+                                 f"expected {SCHEMA_VERSION}. Retrain and save again.")
+            return cls(ticker, header["label_maps"], header["columns"], header["schema_version"],
+                       open_forest(artifact, mmap))
+
+        # bundles saved before the serving artifact existed: everything is in the pickle
+        forest = load_forest(forest_path(ticker)) if os.path.exists(forest_path(ticker)) else None
+        bundle = _read_pickle(path)
+        return cls(ticker, bundle["label_maps"], bundle["columns"], bundle.get("schema_version", 1), forest,
+                   bundle["model"], bundle["scaler"])
+
+    @classmethod
+    def from_model(cls, model) -> "ModelBundle":
+        # a trained modules.model.Model, without going through disk (replays, tests)
+        forest = FlatForest(export_forest(model.model, model.scaler))
+        return cls(model.ticker, model.label_maps, model.x.columns.tolist(), SCHEMA_VERSION, forest,
+                   model.model, model.scaler)
+
+    def _unpickle(self):
+        # imports sklearn; only needed without a flattened forest
+        if not self._unpickled:
+            bundle = _read_pickle(model_path(self.ticker))
+            self._estimator, self._scaler = bundle["model"], bundle["scaler"]
+            self._unpickled = True
+
+    @property
+    def estimator(self):
+        self._unpickle()
+        return self._estimator
+
+    @property
+    def scaler(self):
+        self._unpickle()
+        return self._scaler
+
+    def predict(self, features: list[float]) -> int:
+        # score one raw (unscaled) feature vector
+        if self.forest is not None:
+            return int(self.forest.predict(features)[0])
+        return int(self.estimator.predict(self.scaler.transform([features]))[0])
+
+
+def _read_pickle(path: str) -> dict:
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+from modules.sessions import session_dtype, label_sessions
+
 # Simple class to represent a candlestick
 class Candlestick:
 
@@ -48,3 +52,190 @@ class Candlestick:
             "high": max(candle.high for candle in candles),
             "low": min(candle.low for candle in candles)
         }
+
+
+# Read-only Candlestick backed by one row of a CandleSeries (no copying of prices)
+class CandleView(Candlestick):
+    __slots__ = ("_series", "_i")
+
+    def __init__(self, series, i):
+        self._series = series
+        self._i = i
+
+    @property
+    def index(self):
+        return int(self._series.index[self._i])
+
+    @property
+    def date(self):
+        return pd.Timestamp(self._series.time[self._i], tz=self._series.tz)
+
+    @property
+    def open(self):
+        return float(self._series.open[self._i])
+
+    @property
+    def high(self):
+        return float(self._series.high[self._i])
+
+    @property
+    def low(self):
+        return float(self._series.low[self._i])
+
+    @property
+    def close(self):
+        return float(self._series.close[self._i])
+
+    @property
+    def volume(self):
+        return self._series.volume[self._i].item()
+
+    @property
+    def session(self):
+        return self._series.session_names[self._series.session_codes[self._i]]
+
+    def __repr__(self):
+        return f"CandleView({self.date}, {self.session}, O={self.open} H={self.high} L={self.low} C={self.close})"
+
+
+# Struct-of-arrays candle container: one typed NumPy array per field instead of one object per row
+class CandleSeries:
+
+    def __init__(self, index, time, open, high, low, close, volume, session_codes, session_names, tz="UTC"):
+        self.index = np.asarray(index, dtype=np.int64)
+        self.time = np.asarray(time, dtype="datetime64[ns]")  # naive, in `tz`
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume)
+        self.session_codes = np.asarray(session_codes, dtype=np.int8)
+        self.session_names = tuple(session_names)
+        self.tz = tz
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CandleSeries":
+        # build from a price DataFrame (Index, Date, Open, High, Low, Close, Volume, Session)
+        dates = df["Date"]
+        tz = None
+        if dates.dt.tz is not None:
+            tz = "UTC"
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+        sessions = df["Session"]
+        if isinstance(sessions.dtype, pd.CategoricalDtype):
+            unknown = sessions.cat.codes < 0
+        else:
+            unknown = ~sessions.isin(session_dtype().categories)
+        if unknown.any():
+            # code -1 would read back as the last session name
+            names = sorted({str(s) for s in sessions[unknown]})
+            raise ValueError(f"Unknown or missing sessions: {', '.join(names)}")
+        if not isinstance(sessions.dtype, pd.CategoricalDtype):
+            sessions = sessions.astype(session_dtype())
+        index = df["Index"] if "Index" in df.columns else np.arange(len(df))
+        return cls(index, dates.to_numpy("datetime64[ns]"), df["Open"], df["High"], df["Low"],
+                   df["Close"], df["Volume"], sessions.cat.codes, sessions.cat.categories, tz)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "CandleSeries":
+        df = pd.read_csv(path, parse_dates=["Date"], dtype={"Session": session_dtype()})
+        return cls.from_frame(df)
+
+    @classmethod
+    def from_candles(cls, candles) -> "CandleSeries":
+        # for callers that still hold a list of Candlestick objects
+        candles = list(candles)
+        df = pd.DataFrame({
+            "Index": [c.index for c in candles], "Date": [c.date for c in candles],
+            "Open": [c.open for c in candles], "High": [c.high for c in candles],
+            "Low": [c.low for c in candles], "Close": [c.close for c in candles],
+            "Volume": [c.volume for c in candles], "Session": [c.session for c in candles],
+        })
+        if len(df):
+            df["Date"] = pd.to_datetime(df["Date"])
+        return cls.from_frame(df)
+
+    def relabel(self, windows: dict) -> "CandleSeries":
+        # same price buffers, sessions recomputed for other hour windows
+        labels = label_sessions(self.dates, windows)
+        return CandleSeries(self.index, self.time, self.open, self.high, self.low, self.close, self.volume,
+                            labels.cat.codes, labels.cat.categories, self.tz)
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, item):
+        # int -> CandleView, slice -> CandleSeries sharing the same buffers
+        if isinstance(item, slice):
+            return CandleSeries(self.index[item], self.time[item], self.open[item], self.high[item],
+                                self.low[item], self.close[item], self.volume[item],
+                                self.session_codes[item], self.session_names, self.tz)
+        i = int(item)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("candle index out of range")
+        return CandleView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield CandleView(self, i)
+
+    def _to_naive(self, value) -> np.datetime64:
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert(self.tz).tz_localize(None)
+        return np.datetime64(ts.to_datetime64(), "ns")
+
+    def between(self, start=None, end=None) -> "CandleSeries":
+        # zero-copy slice of candles with start <= time < end (time must be sorted)
+        lo = 0 if start is None else int(np.searchsorted(self.time, self._to_naive(start), "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, self._to_naive(end), "left"))
+        return self[lo:hi]
+
+    def day(self, date) -> "CandleSeries":
+        # all candles of one calendar day
+        start = pd.Timestamp(date).normalize()
+        if start.tzinfo is None and self.tz is not None:
+            start = start.tz_localize(self.tz)
+        return self.between(start, start + pd.Timedelta(days=1))
+
+    def session_mask(self, name: str) -> np.ndarray:
+        if name not in self.session_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.session_codes == self.session_names.index(name)
+
+    @property
+    def session(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.session_codes, categories=list(self.session_names))
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self.time)
+        return index.tz_localize(self.tz) if self.tz is not None else index
+
+    @property
+    def is_bull(self) -> np.ndarray:
+        return self.close > self.open
+
+    @property
+    def is_bear(self) -> np.ndarray:
+        return self.close < self.open
+
+    @property
+    def body_size(self) -> np.ndarray:
+        return np.abs(self.close - self.open)
+
+    @property
+    def shadow_ratio(self) -> dict[str, np.ndarray]:
+        # same as Candlestick.shadow_ratio, zeros where the body is empty
+        body = self.body_size
+        upper = self.high - np.maximum(self.open, self.close)
+        lower = np.minimum(self.open, self.close) - self.low
+        safe = np.where(body == 0, 1.0, body)
+        zero = body == 0
+        return {
+            "overall": np.where(zero, 0.0, (upper + lower) / safe),
+            "upper": np.where(zero, 0.0, upper / safe),
+            "lower": np.where(zero, 0.0, lower / safe),
+        }
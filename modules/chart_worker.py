@@ -0,0 +1,148 @@
+# Chart rendering in a separate, pre-warmed process
+# the live loop hands over a chart request and moves on; a slow or crashing matplotlib
+# only costs the chart (the worker is restarted), never the text alert
+import multiprocessing as mp
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from modules.candle import CandleSeries
+from modules.metrics import NULL_METRICS
+
+
+def _warm_up(render):
+    # first render pays for font cache, canvas and PNG encoder setup
+    time_ = np.array(["2024-01-01T00:00", "2024-01-01T00:30"], dtype="datetime64[ns]")
+    prices = np.array([1.0, 1.001])
+    candles = CandleSeries(np.arange(2), time_, prices, prices + 0.001, prices - 0.001, prices,
+                           np.zeros(2, dtype=np.int64), np.zeros(2, dtype=np.int8), ["Asia"])
+    render("warm-up", candles, {"asian_high": 1.002, "asian_low": 0.999})
+
+
+def _serve(conn):
+    # worker process: import matplotlib once, then render requests until the pipe closes
+    import matplotlib
+    matplotlib.use("Agg")
+    from modules.visualizer import Visualizer
+
+    def render(ticker, candles, levels):
+        return Visualizer(ticker, candles).render(levels)
+
+    _warm_up(render)
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            conn.send(("ok", render(*request)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class ChartRenderer:
+
+    def __init__(self, timeout: float = 10.0, startup_timeout: float = 60.0, window: int = 100,
+                 metrics=NULL_METRICS):
+        self.metrics = metrics
+        self.timeout = timeout  # per chart; the worker is restarted when it is exceeded
+        self.startup_timeout = startup_timeout
+        self.window = window  # bars sent to the worker
+        self.stats = {"rendered": 0, "errors": 0, "timeouts": 0, "restarts": 0}
+        self._ctx = mp.get_context("spawn")  # no forked copies of the live loop's threads
+        self._proc = None
+        self._conn = None
+        self._started = False
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix="chart")
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def start(self):
+        # spawn the worker and wait until matplotlib is imported and warmed up
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        if self.alive:
+            return
+        if self._started:
+            self.stats["restarts"] += 1
+            self.metrics.inc("render_restarts")
+        self._started = True
+        parent, child = self._ctx.Pipe()
+        self._proc = self._ctx.Process(target=_serve, args=(child,), name="chart-worker", daemon=True)
+        self._proc.start()
+        child.close()
+        self._conn = parent
+        if not parent.poll(self.startup_timeout):
+            self._kill()
+            raise TimeoutError("chart worker did not start")
+        parent.recv()
+
+    def _kill(self):
+        if self._proc is not None and self._proc.pid is not None:
+            self._proc.kill()
+            self._proc.join()
+        if self._conn is not None:
+            self._conn.close()
+        self._proc, self._conn = None, None
+
+    def render(self, ticker: str, candles: CandleSeries, levels: dict | None = None) -> bytes:
+        # blocking call (up to `timeout`): PNG bytes of the last `window` bars
+        window = candles[-self.window:]
+        with self._lock:
+            self._start()
+            try:
+                self._conn.send((ticker, window, levels or {}))
+                ready = self._conn.poll(self.timeout)
+                status, payload = self._conn.recv() if ready else (None, None)
+            except (EOFError, OSError, BrokenPipeError) as e:
+                self.stats["errors"] += 1
+                self._kill()
+                raise RuntimeError(f"chart worker died: {e}") from e
+            if not ready:
+                self.stats["timeouts"] += 1
+                self.metrics.inc("render_timeouts")
+                self._kill()
+                raise TimeoutError(f"chart not rendered within {self.timeout:.1f}s")
+        if status != "ok":
+            self.stats["errors"] += 1
+            raise RuntimeError(payload)
+        self.stats["rendered"] += 1
+        return payload
+
+    def submit(self, ticker: str, candles: CandleSeries, levels: dict | None = None, on_done=None) -> Future:
+        # non-blocking: render on a helper thread and pass the PNG to on_done when ready
+        candles = candles[-self.window:]  # pin the window now, the caller may replace its series
+
+        def job():
+            t0 = time.perf_counter()
+            try:
+                with self.metrics.stage("render"):
+                    png = self.render(ticker, candles, levels)
+            except Exception as e:
+                print("Chart rendering failed:", e)
+                return None
+            if on_done is not None:
+                on_done(png)
+            return time.perf_counter() - t0
+        return self._pool.submit(job)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            if self.alive:
+                try:
+                    self._conn.send(None)
+                    self._proc.join(2)
+                except (OSError, BrokenPipeError):
+                    pass
+            self._kill()
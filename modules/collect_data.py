@@ -1,97 +1,147 @@
-import MetaTrader5 as mt
 import pandas as pd
-from datetime import datetime, timedelta
-from calendar import monthrange
+from datetime import datetime, timedelta, timezone
 import os
+from modules import sessions
+from modules.data_source import DataSource, default_session, timeframe_minutes
 
-# This class downloads historical candle data from MT5
+# This class downloads historical candle data from MT5 (or any other DataSource)
 class MT5DataFetcher:
 
-    def __init__(self, ticker: str, timeframe: int = mt.TIMEFRAME_M30, date_from: datetime = datetime(2020, 1, 1)):
+    def __init__(self, ticker: str, timeframe: int = 30, date_from: datetime = datetime(2020, 1, 1),
+                 overlap: int = 2, session_hours: dict = sessions.SESSION_HOURS,
+                 broker_offset: timedelta | None = None, source: DataSource | None = None):
         self.ticker = ticker
-        self.timeframe = timeframe
+        self.timeframe = timeframe  # MT5 timeframe code (TIMEFRAME_M30 == 30, minute frames are their minutes)
+        self.source = source or default_session()  # long-lived MT5 session unless told otherwise
         self.date_from = date_from
+        self.session_hours = session_hours  # local hour windows used to label sessions
+        self.broker_offset = broker_offset  # fixed broker-minus-UTC offset; None = EET/EEST with EU DST
+        self.overlap = overlap  # bars re-fetched behind the watermark so the forming bar gets revised
         self.df: pd.DataFrame | None = None  # this will hold the result
+        self.watermark: pd.Timestamp | None = None  # time of the last stored bar
+        self.new_rows = 0  # rows added or revised by the last fetch
 
-    def get_data(self) -> pd.DataFrame:
-        self._fetch_data()
-        self._save_to_csv()
+    @property
+    def path(self) -> str:
+        return f"modules/data/price/{self.ticker}.csv"
+
+    def get_data(self, incremental: bool = False) -> pd.DataFrame:
+        # incremental mode only downloads bars after the watermark and appends them
+        if incremental and self._load_stored():
+            self._fetch_delta()
+        else:
+            self._fetch_data()
+            self._save_to_csv()
+            self.new_rows = len(self.df)
+        self.watermark = self.df["Date"].iloc[-1]
         return self.df
 
-    @staticmethod
-    def _last_sunday(year: int, month: int) -> datetime:
-        # find last Sunday in given month (used for DST rules)
-        d = datetime(year, month, monthrange(year, month)[1])
-        while d.weekday() != 6:
-            d -= timedelta(days=1)
-        return d
+    _bar_minutes = staticmethod(timeframe_minutes)
 
-    @staticmethod
-    def _first_sunday(year: int, month: int) -> datetime:
-        # first Sunday of a month
-        d = datetime(year, month, 1)
-        while d.weekday() != 6:
-            d += timedelta(days=1)
-        return d
+    # session helpers live in modules.sessions; kept here for existing callers
+    _last_sunday = staticmethod(sessions._last_sunday)
+    _first_sunday = staticmethod(sessions._first_sunday)
+    _determine_session = staticmethod(sessions.session_of)
 
-    @staticmethod
-    def _determine_session(ts: pd.Timestamp) -> str:
-        # figure out what session a candle belongs to (Asia, London, etc)
-        year = ts.year
-        eu_dst_start = MT5DataFetcher._last_sunday(year, 3)
-        eu_dst_end = MT5DataFetcher._last_sunday(year, 10)
-        dt_broker = ts.replace(tzinfo=None)
-
-        # Adjust for local time based on DST
-        if eu_dst_start <= dt_broker < eu_dst_end:
-            local_time = dt_broker
-        else:
-            local_time = dt_broker - timedelta(hours=1)
-
-        h = local_time.hour
-        if 2 <= h < 9:
-            return "Asia"
-        if 9 <= h < 10:
-            return "Frankfurt"
-        if 10 <= h < 15:
-            return "London"
-        if 15 <= h < 23:
-            return "New-York"
-        return "Other"
-
-    def _connect(self):
-        if not mt.initialize():
-            raise ConnectionError("MetaTrader5 initialization failed.")
-
-    def _disconnect(self):
-        mt.shutdown()
+    def _broker_now(self) -> datetime:
+        # MT5 ranges are given in broker wall-clock time
+        return sessions.utc_to_broker(datetime.now(timezone.utc), self.broker_offset)
+
+    def trim(self, rows: int):
+        # keep only the last `rows` bars in memory; the CSV keeps the full history
+        if self.df is not None and len(self.df) > rows:
+            self.df = self.df.iloc[-rows:].reset_index(drop=True)
+
+    def _download(self, date_from: datetime, date_to: datetime) -> pd.DataFrame | None:
+        # download one range (no Index or Session column yet)
+        return self.source.fetch(self.ticker, self._bar_minutes(self.timeframe), date_from, date_to)
 
     def _fetch_data(self):
-        # download data from MT5 and process it
-        date_to: datetime = datetime.now() + timedelta(hours=3)  # MT5 time offset
-        self._connect()
-        data = mt.copy_rates_range(self.ticker, self.timeframe, self.date_from, date_to)
-        self._disconnect()
-
-        if data is None or len(data) == 0:
-            raise ValueError("No data returned from MetaTrader5.")
-
-        df = pd.DataFrame(data)
-        df["time"] = pd.to_datetime(df["time"], unit="s").dt.tz_localize("UTC")
-        df = df.rename(columns={
-            "time": "Date", "open": "Open", "high": "High",
-            "low": "Low", "close": "Close", "tick_volume": "Volume",
-        })
-        df = df[["Date", "Open", "High", "Low", "Close", "Volume"]]
-        df.reset_index(drop=True, inplace=True)
+        # download the full history from the source and process it
+        date_to: datetime = self._broker_now()
+        df = self._download(self.date_from, date_to)
+        if df is None:
+            raise ValueError(f"No data returned for {self.ticker}.")
+
         df["Index"] = df.index
-        df["Session"] = df["Date"].apply(self._determine_session)
+        df["Session"] = sessions.label_sessions(df["Date"], self.session_hours)
         self.df = df
 
+    def _load_stored(self) -> bool:
+        # reuse what we already have in memory or on disk
+        if self.df is None and os.path.exists(self.path):
+            self.df = pd.read_csv(self.path, parse_dates=["Date"])
+            self.df["Session"] = self.df["Session"].astype(sessions.session_dtype(self.session_hours))
+        return self.df is not None and len(self.df) > 0
+
+    def _fetch_delta(self):
+        # fetch only bars after the watermark, plus a small overlap to revise the forming bar
+        watermark = self.df["Date"].iloc[-1]
+        start = watermark - timedelta(minutes=self.overlap * self._bar_minutes(self.timeframe))
+        date_to: datetime = self._broker_now()
+        new = self._download(start.tz_localize(None).to_pydatetime(), date_to)
+        if new is None:
+            self.new_rows = 0
+            return
+
+        # stored bars at/after the first fetched bar get replaced by the fresh ones
+        cutoff = new["Date"].iloc[0]
+        keep = self.df[self.df["Date"] < cutoff]
+        first = int(keep["Index"].iloc[-1]) + 1 if len(keep) else 0  # memory may hold only a tail
+        new["Index"] = range(first, first + len(new))
+        new["Session"] = sessions.label_sessions(new["Date"], self.session_hours)
+        new = new[self.df.columns]
+
+        self.df = pd.concat([keep, new], ignore_index=True)
+        self.new_rows = len(new)
+        self._append_to_csv(new, cutoff)
+
+    def _append_to_csv(self, new: pd.DataFrame, cutoff: pd.Timestamp):
+        # cut the revised tail off the stored file and append the new bars
+        if not os.path.exists(self.path):
+            self._save_to_csv()
+            return
+        self._truncate_csv(self.path, cutoff)
+        new.to_csv(self.path, mode="a", header=False, index=False)
+
+    @staticmethod
+    def _truncate_csv(path: str, cutoff: pd.Timestamp, chunk: int = 4096):
+        # drop rows dated at or after cutoff; only the tail of the file is read
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            while True:
+                start = max(0, size - chunk)
+                f.seek(start)
+                lines = f.read().split(b"\n")
+                offsets, pos = [], start
+                for line in lines:
+                    offsets.append(pos)
+                    pos += len(line) + 1
+                if start > 0:  # first piece may be a partial line
+                    lines, offsets = lines[1:], offsets[1:]
+
+                cut, found_older = size, False
+                for line, offset in zip(reversed(lines), reversed(offsets)):
+                    if not line.strip():
+                        continue
+                    field = line.split(b",", 1)[0].decode()
+                    if field == "Date" or pd.Timestamp(field) < cutoff:
+                        found_older = True
+                        break
+                    cut = offset
+                if found_older or start == 0:
+                    break
+                chunk *= 2
+            f.truncate(cut)
+            if cut > 0:  # appended rows must start on a new line
+                f.seek(cut - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
     def _save_to_csv(self, path: str | None = None):
         # write DataFrame to CSV file
         if self.df is None:
             raise ValueError("DataFrame is empty.")
         os.makedirs("modules/data/price/", exist_ok=True)
-        path = path or f"modules/data/price/{self.ticker}.csv"
+        path = path or self.path
         self.df.to_csv(path, index=False)
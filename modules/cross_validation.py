@@ -0,0 +1,99 @@
+# Walk-forward (expanding window) cross-validation for time-ordered feature rows
+# every fold's scaler and scaled matrices are computed once and reused by all later evaluations,
+# folds are fitted in parallel worker processes
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+METRICS = ("accuracy", "precision", "recall", "f1", "roc_auc")
+
+
+def walk_forward_splits(n: int, n_folds: int = 5, test_size: int | None = None, min_train: int | None = None):
+    # (train_end, test_end) per fold: train on rows [0, train_end), test on [train_end, test_end)
+    test_size = test_size or n // (n_folds + 1)
+    first = n - n_folds * test_size
+    if min_train is not None:
+        first = max(first, min_train)
+    if test_size <= 0 or first <= 0:
+        raise ValueError(f"Not enough rows ({n}) for {n_folds} folds.")
+    return [(end, min(end + test_size, n)) for end in range(first, n, test_size)][:n_folds]
+
+
+class Fold:
+
+    def __init__(self, number: int, x_train, y_train, x_test, y_test, scaler):
+        self.number = number
+        self.x_train = x_train
+        self.y_train = y_train
+        self.x_test = x_test
+        self.y_test = y_test
+        self.scaler = scaler
+
+
+def build_folds(x, y, n_folds: int = 5, test_size: int | None = None) -> list[Fold]:
+    # scale every fold with a scaler fitted on its own training rows only
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y)
+    folds = []
+    for i, (train_end, test_end) in enumerate(walk_forward_splits(len(x), n_folds, test_size)):
+        scaler = StandardScaler().fit(x[:train_end])
+        folds.append(Fold(i, scaler.transform(x[:train_end]), y[:train_end],
+                          scaler.transform(x[train_end:test_end]), y[train_end:test_end], scaler))
+    return folds
+
+
+def score(y_true, y_pred, proba=None) -> dict:
+    # metrics for the positive class (tp1_hit == 1)
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_true, y_pred, average="binary", pos_label=1, zero_division=0)
+    auc = np.nan
+    if proba is not None and len(np.unique(y_true)) == 2:
+        auc = roc_auc_score(y_true, proba)
+    return {"accuracy": accuracy_score(y_true, y_pred), "precision": precision, "recall": recall,
+            "f1": f1, "roc_auc": auc}
+
+
+def fit_fold(estimator, fold: Fold) -> dict:
+    # fit a fresh copy on the fold's training rows and score its test rows
+    t0 = time.perf_counter()
+    model = clone(estimator).fit(fold.x_train, fold.y_train)
+    fit_seconds = time.perf_counter() - t0
+    proba = None
+    if hasattr(model, "predict_proba") and 1 in list(model.classes_):
+        proba = model.predict_proba(fold.x_test)[:, list(model.classes_).index(1)]
+    row = {"fold": fold.number, "train_rows": len(fold.y_train), "test_rows": len(fold.y_test),
+           "fit_seconds": fit_seconds}
+    row.update(score(fold.y_test, model.predict(fold.x_test), proba))
+    return row
+
+
+def _fit_fold_task(args):
+    return fit_fold(*args)
+
+
+def cross_validate(estimator, folds: list[Fold], workers: int | None = None) -> pd.DataFrame:
+    # one row per fold, in fold order
+    workers = min(workers or os.cpu_count() or 1, len(folds))
+    if workers <= 1:
+        rows = [fit_fold(estimator, fold) for fold in folds]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            rows = list(pool.map(_fit_fold_task, [(estimator, fold) for fold in folds]))
+    return pd.DataFrame(rows)
+
+
+def aggregate(per_fold: pd.DataFrame) -> dict:
+    # mean and standard deviation of every metric over the folds
+    out = {}
+    for metric in METRICS:
+        values = per_fold[metric].astype(float)
+        out[f"{metric}_mean"] = float(values.mean())
+        out[f"{metric}_std"] = float(values.std(ddof=0))
+    out["folds"] = len(per_fold)
+    return out
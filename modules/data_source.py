@@ -0,0 +1,280 @@
+# Where candles come from: one interface, several backends
+# MT5Session keeps one terminal session open for every symbol and timeframe (health checks, reconnects);
+# FileSource replays stored CSV/Parquet files and SyntheticSource generates candles, so the fetcher,
+# the live path and the training pipeline run on machines without a terminal
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+def timeframe_minutes(timeframe: int) -> int:
+    # MT5 stores minute frames as-is and hour/week/month frames with flag bits
+    if timeframe < 0x4000:
+        return timeframe
+    if timeframe & 0xC000 == 0x4000:
+        return (timeframe & 0x3FFF) * 60
+    if timeframe & 0xC000 == 0x8000:
+        return 7 * 24 * 60
+    return 31 * 24 * 60
+
+
+def timeframe_code(minutes: int) -> int:
+    # inverse of timeframe_minutes(): M1..M30, H1..D1, W1, MN1
+    if minutes < 60:
+        return minutes
+    if minutes % 60 == 0 and minutes <= 24 * 60:
+        return 0x4000 | minutes // 60
+    if minutes == 7 * 24 * 60:
+        return 0x8001
+    if minutes == 31 * 24 * 60:
+        return 0xC001
+    raise ValueError(f"No MT5 timeframe for {minutes} minutes")
+
+
+def rates_frame(data) -> pd.DataFrame | None:
+    # MT5 rates array -> Date (UTC-labelled) + OHLCV frame
+    if data is None or len(data) == 0:
+        return None
+    df = pd.DataFrame(data)
+    df["time"] = pd.to_datetime(df["time"], unit="s").dt.tz_localize("UTC")
+    df = df.rename(columns={
+        "time": "Date", "open": "Open", "high": "High",
+        "low": "Low", "close": "Close", "tick_volume": "Volume",
+    })
+    return df[COLUMNS].reset_index(drop=True)
+
+
+def _utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class DataSource(ABC):
+
+    # bars of one symbol with date_from <= open time <= date_to (broker wall clock), None when there are none
+    @abstractmethod
+    def fetch(self, symbol: str, minutes: int, date_from: datetime, date_to: datetime) -> pd.DataFrame | None:
+        pass
+
+    @contextmanager
+    def batch(self):
+        # several fetches in a row (every symbol at one bar close); backends with a session check it once
+        yield self
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# Long-lived MetaTrader 5 terminal session shared by every symbol and timeframe
+class MT5Session(DataSource):
+
+    def __init__(self, retries: int = 3, backoff: float = 1.0, check_interval: float = 30.0, module=None,
+                 **init_kwargs):
+        self.retries = retries
+        self.backoff = backoff  # first reconnect delay in seconds, doubled each attempt
+        self.check_interval = check_interval  # seconds between terminal health checks
+        self.init_kwargs = init_kwargs  # path / login / password / server / timeout for mt.initialize()
+        self.connected = False
+        self.stats = {"connects": 0, "reconnects": 0, "requests": 0, "empty": 0}
+        self._mt = module  # MetaTrader5 is imported on the first connect
+        self._selected: set[str] = set()  # symbols added to Market Watch in this session
+        self._checked = 0.0
+        self._lock = threading.RLock()  # the MT5 API is not thread-safe
+
+    def _connect(self):
+        if self._mt is None:
+            import MetaTrader5
+            self._mt = MetaTrader5
+        if not self._mt.initialize(**self.init_kwargs):
+            raise ConnectionError(f"MetaTrader5 initialization failed: {self._mt.last_error()}")
+        self.connected = True
+        self.stats["connects"] += 1
+        self._selected.clear()
+        self._checked = time.monotonic()
+
+    def _disconnect(self):
+        if self.connected:
+            self._mt.shutdown()
+        self.connected = False
+
+    def healthy(self) -> bool:
+        # terminal still running and connected to the trade server
+        if not self.connected:
+            return False
+        info = self._mt.terminal_info()
+        return info is not None and bool(getattr(info, "connected", True))
+
+    def reconnect(self):
+        for attempt in range(self.retries + 1):
+            if self.connected:
+                self.stats["reconnects"] += 1
+            self._disconnect()
+            try:
+                self._connect()
+                return
+            except ConnectionError:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _ensure(self, force: bool = False):
+        # connect on first use; afterwards a health check at most every `check_interval` seconds
+        now = time.monotonic()
+        if self.connected and not force and now - self._checked < self.check_interval:
+            return
+        if self.healthy():
+            self._checked = now
+            return
+        self.reconnect()
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._ensure(force=True)
+            yield self
+
+    def fetch(self, symbol: str, minutes: int, date_from: datetime, date_to: datetime) -> pd.DataFrame | None:
+        with self._lock:
+            self._ensure()
+            if symbol not in self._selected:
+                self._mt.symbol_select(symbol, True)
+                self._selected.add(symbol)
+            timeframe = timeframe_code(minutes)
+            data = self._mt.copy_rates_range(symbol, timeframe, date_from, date_to)
+            if data is None and not self.healthy():  # connection dropped mid-request: once more after a reconnect
+                self.reconnect()
+                self._mt.symbol_select(symbol, True)
+                self._selected.add(symbol)
+                data = self._mt.copy_rates_range(symbol, timeframe, date_from, date_to)
+            self.stats["requests"] += 1
+        df = rates_frame(data)
+        if df is None:
+            self.stats["empty"] += 1
+        return df
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+_default_session: MT5Session | None = None
+
+
+def default_session() -> MT5Session:
+    # one terminal session per process, shared by every fetcher that is not given a source
+    global _default_session
+    if _default_session is None:
+        _default_session = MT5Session()
+    return _default_session
+
+
+# Candles loaded once per symbol and timeframe, then served by range; `until` hides bars not yet "published"
+class HistoricalSource(DataSource):
+
+    def __init__(self, until=None):
+        self.until = until  # replay cursor: only bars opened before it are visible (None = all)
+        self.stats = {"requests": 0, "empty": 0}
+        self._frames: dict[tuple[str, int], pd.DataFrame] = {}
+        self._times: dict[tuple[str, int], np.ndarray] = {}  # naive open times for the range search
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _load(self, symbol: str, minutes: int) -> pd.DataFrame:
+        pass
+
+    def frame(self, symbol: str, minutes: int) -> pd.DataFrame:
+        with self._lock:
+            key = (symbol, minutes)
+            if key not in self._frames:
+                df = self._load(symbol, minutes)
+                df["Date"] = pd.to_datetime(df["Date"], utc=True)
+                df = df[COLUMNS].sort_values("Date", ignore_index=True)
+                self._frames[key] = df
+                self._times[key] = df["Date"].dt.tz_localize(None).to_numpy("datetime64[ns]")
+            return self._frames[key]
+
+    def fetch(self, symbol: str, minutes: int, date_from: datetime, date_to: datetime) -> pd.DataFrame | None:
+        df = self.frame(symbol, minutes)
+        dates = self._times[(symbol, minutes)]
+        end = _utc(date_to)
+        if self.until is not None:
+            end = min(end, _utc(self.until) - pd.Timedelta(1, "ns"))
+        lo = int(np.searchsorted(dates, _utc(date_from).tz_localize(None).to_datetime64(), "left"))
+        hi = int(np.searchsorted(dates, end.tz_localize(None).to_datetime64(), "right"))
+        self.stats["requests"] += 1
+        if hi <= lo:
+            self.stats["empty"] += 1
+            return None
+        return df.iloc[lo:hi].reset_index(drop=True)
+
+
+# Stored price files, e.g. FileSource("backup/{symbol}.csv") or FileSource("m1/{symbol}_{minutes}.parquet")
+class FileSource(HistoricalSource):
+
+    def __init__(self, pattern: str, minutes: int = 30, until=None):
+        super().__init__(until)
+        self.pattern = pattern  # {symbol} and optionally {minutes} are filled in
+        self.minutes = minutes  # timeframe of the files when the pattern has no {minutes}
+
+    def _load(self, symbol: str, minutes: int) -> pd.DataFrame:
+        if "{minutes}" not in self.pattern and minutes != self.minutes:
+            raise ValueError(f"{self.pattern} holds M{self.minutes} bars, M{minutes} requested")
+        path = self.pattern.format(symbol=symbol, minutes=minutes)
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_csv(path, parse_dates=["Date"])
+
+
+# Deterministic synthetic candles per symbol (modules.synthetic), M1 paths and multiples of M30
+class SyntheticSource(HistoricalSource):
+
+    def __init__(self, years: float = 5, start: str | None = None, seed: int = 0, until=None, **kwargs):
+        super().__init__(until)
+        self.years = years
+        # default: history ending today, so the fetcher's date_from/now ranges find bars
+        self.start = start or str((pd.Timestamp.now().normalize() - pd.DateOffset(days=int(years * 365.25))).date())
+        self.seed = seed
+        self.kwargs = kwargs  # passed on to generate_candles (price, sweep_probability, ...)
+
+    def _load(self, symbol: str, minutes: int) -> pd.DataFrame:
+        from modules.synthetic import generate_candles, m1_from_m30
+        seed = zlib.crc32(symbol.encode()) ^ self.seed  # different but stable path per symbol
+        m30 = generate_candles(self.years, seed=seed, start=self.start, **self.kwargs)
+        if minutes == 30:
+            return m30
+        if minutes == 1:
+            m1 = m1_from_m30(m30, seed=seed)
+            m1["Volume"] = 0
+            return m1
+        if minutes % 30 == 0:
+            bars = m30.resample(f"{minutes}min", on="Date").agg(
+                {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+            return bars.dropna(subset=["Open"]).reset_index()
+        raise ValueError(f"Synthetic candles come as M1 or multiples of M30, not M{minutes}")
+
+
+def open_source(spec: str) -> DataSource:
+    # "mt5" | "synthetic" | "synthetic:<years>" | file pattern with {symbol} (CSV or Parquet)
+    if spec == "mt5":
+        return default_session()
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        years = spec.partition(":")[2]
+        return SyntheticSource(float(years)) if years else SyntheticSource()
+    if "{symbol}" in spec:
+        return FileSource(spec)
+    raise ValueError(f"Unknown data source: {spec!r}")
@@ -0,0 +1,164 @@
+# Trading-day index over a CandleSeries: calendar day -> [start, end) offsets of the day and of every session,
+# plus the Asian high/low of each day. Built in one vectorized pass and extended as new bars arrive,
+# so "today's Asian range" or "today's London bars" is a dict lookup and a slice instead of a scan
+import numpy as np
+
+from modules.candle import CandleSeries
+from modules.sessions import OTHER
+
+_DAY_NS = 86_400_000_000_000
+
+
+def day_number(date) -> int:
+    # days since 1970-01-01 of a date / datetime / Timestamp (wall-clock date, tz ignored)
+    if hasattr(date, "tzinfo") and getattr(date, "tzinfo", None) is not None:
+        date = date.replace(tzinfo=None)
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+class DayIndex:
+
+    def __init__(self, candles: CandleSeries | None = None):
+        self.candles: CandleSeries | None = None  # series the offsets currently refer to
+        self.sessions: tuple = ()  # indexed session names (contiguous within a day, so "Other" is left out)
+        self.days = np.empty(0, dtype=np.int64)  # day number per row
+        self.day_bounds = np.empty((0, 2), dtype=np.int64)  # [start, end) per row
+        self.bounds = np.empty((0, 0, 2), dtype=np.int64)  # [start, end) per row and session
+        self.asian_high = np.empty(0)  # NaN on days without Asia bars
+        self.asian_low = np.empty(0)
+        self._rows: dict[int, int] = {}  # day number -> row
+        self._base = 0  # offsets are stored absolute; position in `candles` = offset - _base
+        self._redo_time = None  # open time of the last indexed day's first bar
+        if candles is not None:
+            self.update(candles)
+
+    def __len__(self):
+        return len(self.days)
+
+    # ---- building ----
+
+    def update(self, candles: CandleSeries):
+        # index a new version of the series: the same history with bars appended (and the tail revised),
+        # possibly with old bars trimmed off the front; only the last indexed day is rebuilt
+        if candles is self.candles:
+            return
+        names = tuple(n for n in candles.session_names if n != OTHER)
+        if len(self.days) == 0 or names != self.sessions or len(candles) == 0:
+            self._reset(names)
+            self._append(candles, 0, 0)
+            self.candles = candles
+            return
+
+        redo = int(self.day_bounds[-1, 0])  # first bar of the last indexed day, absolute
+        redo_time = self._redo_time
+        pos = int(np.searchsorted(candles.time, redo_time, "left"))
+        if pos >= len(candles) or candles.time[pos] != redo_time:
+            # the series does not contain the last indexed day any more: start over
+            self._reset(names)
+            self._append(candles, 0, 0)
+            self.candles = candles
+            return
+
+        self._truncate(len(self.days) - 1)
+        self._base = redo - pos
+        self._append(candles, pos, redo)
+        self.candles = candles
+
+    def _reset(self, names: tuple):
+        self.sessions = names
+        self.days = np.empty(0, dtype=np.int64)
+        self.day_bounds = np.empty((0, 2), dtype=np.int64)
+        self.bounds = np.empty((0, len(names), 2), dtype=np.int64)
+        self.asian_high = np.empty(0)
+        self.asian_low = np.empty(0)
+        self._rows = {}
+        self._base = 0
+
+    def _truncate(self, rows: int):
+        for day in self.days[rows:].tolist():
+            del self._rows[day]
+        self.days = self.days[:rows]
+        self.day_bounds = self.day_bounds[:rows]
+        self.bounds = self.bounds[:rows]
+        self.asian_high = self.asian_high[:rows]
+        self.asian_low = self.asian_low[:rows]
+
+    def _append(self, candles: CandleSeries, pos: int, offset: int):
+        # index candles[pos:] (offset = absolute position of candles[pos]) and append the rows
+        part = candles[pos:]
+        n = len(part)
+        if n == 0:
+            return
+        day = part.time.astype(np.int64) // _DAY_NS
+        starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+        ends = np.r_[starts[1:], n]
+        k = len(starts)
+
+        bounds = np.broadcast_to(starts[:, None, None], (k, len(self.sessions), 2)).copy()  # empty = [s, s)
+        high, low = np.full(k, np.nan), np.full(k, np.nan)
+        for j, name in enumerate(self.sessions):
+            idx = np.flatnonzero(part.session_codes == part.session_names.index(name))
+            if len(idx) == 0:
+                continue
+            row = np.searchsorted(starts, idx, "right") - 1
+            first = np.r_[True, row[1:] != row[:-1]]
+            last = np.r_[first[1:], True]
+            rows = row[first]
+            bounds[rows, j, 0] = idx[first]
+            bounds[rows, j, 1] = idx[last] + 1
+            if name == "Asia":
+                seg = np.flatnonzero(first)
+                high[rows] = np.maximum.reduceat(part.high[idx], seg)
+                low[rows] = np.minimum.reduceat(part.low[idx], seg)
+
+        first_row = len(self.days)
+        self.days = np.r_[self.days, day[starts]]
+        self.day_bounds = np.r_[self.day_bounds, np.stack([starts, ends], axis=1) + offset]
+        self.bounds = np.concatenate([self.bounds, bounds + offset])
+        self.asian_high = np.r_[self.asian_high, high]
+        self.asian_low = np.r_[self.asian_low, low]
+        self._rows.update(zip(day[starts].tolist(), range(first_row, first_row + k)))
+        self._redo_time = part.time[starts[-1]]
+
+    # ---- lookups (constant time) ----
+    # day() / session() take the series to slice; a newer one than the indexed series is indexed first.
+    # Days trimmed off the front of the series come back empty (or cut).
+
+    def row(self, date) -> int:
+        # row of a calendar day, -1 when it has no bars
+        return self._rows.get(day_number(date), -1)
+
+    def _slice(self, candles: CandleSeries, lo: int, hi: int) -> CandleSeries:
+        return candles[max(lo - self._base, 0):max(hi - self._base, 0)]
+
+    def day(self, candles: CandleSeries, date) -> CandleSeries:
+        # same bars as candles.day(date)
+        self.update(candles)
+        r = self.row(date)
+        if r < 0:
+            return candles[0:0]
+        lo, hi = self.day_bounds[r]
+        return self._slice(candles, int(lo), int(hi))
+
+    def session(self, candles: CandleSeries, date, name: str) -> CandleSeries:
+        # the bars of one session on one day (empty when there are none)
+        self.update(candles)
+        r = self.row(date)
+        if r < 0 or name not in self.sessions:
+            return candles[0:0]
+        lo, hi = self.bounds[r, self.sessions.index(name)]
+        return self._slice(candles, int(lo), int(hi))
+
+    def asian_range(self, date) -> tuple[float, float] | None:
+        # cached (high, low) of the day's Asia bars, None when there are none
+        r = self.row(date)
+        if r < 0 or np.isnan(self.asian_high[r]):
+            return None
+        return float(self.asian_high[r]), float(self.asian_low[r])
+
+    def count(self, date, name: str) -> int:
+        r = self.row(date)
+        if r < 0 or name not in self.sessions:
+            return 0
+        lo, hi = self.bounds[r, self.sessions.index(name)]
+        return int(hi - lo)
@@ -0,0 +1,203 @@
+# Flattened random forest for low-latency inference without sklearn
+# all trees live in one set of node arrays and the StandardScaler is folded into the split thresholds,
+# so raw (unscaled) feature vectors can be scored directly
+import json
+import os
+import time
+
+import numpy as np
+
+_LEAF = -2  # sklearn's TREE_UNDEFINED feature id
+
+
+def _float32_cut(threshold: np.ndarray) -> np.ndarray:
+    # sklearn tests float32(x) <= t; in float64 that is x below the midpoint between
+    # the largest float32 <= t and the next float32 up
+    t32 = threshold.astype(np.float32)
+    t32 = np.where(t32.astype(np.float64) > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+    up = np.nextafter(t32, np.float32(np.inf))
+    return (t32.astype(np.float64) + up.astype(np.float64)) / 2
+
+
+def export_forest(model, scaler=None) -> dict[str, np.ndarray]:
+    # fitted RandomForestClassifier (+ optional StandardScaler) -> plain NumPy arrays
+    features, thresholds, lefts, rights, values, missing_left, roots = [], [], [], [], [], [], []
+    offset = 0
+    for est in model.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        feature = tree.feature.astype(np.int32)
+        threshold = tree.threshold.astype(np.float64).copy()
+        inner = feature != _LEAF
+
+        threshold[inner] = _float32_cut(threshold[inner])
+        if scaler is not None:
+            # (x - mean) / scale <= t  <=>  x <= t * scale + mean  (scale > 0)
+            f = feature[inner]
+            threshold[inner] = threshold[inner] * scaler.scale_[f] + scaler.mean_[f]
+
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        left = np.where(inner, left + offset, -1)
+        right = np.where(inner, right + offset, -1)
+
+        value = tree.value[:, 0, :].astype(np.float64)
+        total = value.sum(axis=1, keepdims=True)
+        total[total == 0.0] = 1.0
+        value = value / total
+
+        miss = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(np.zeros(n, dtype=bool) if miss is None else miss.astype(bool))
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        roots.append(offset)
+        offset += n
+
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "missing_left": np.concatenate(missing_left),
+        "roots": np.array(roots, dtype=np.int32),
+        "classes": np.asarray(model.classes_),
+    }
+
+
+def tree_scores(arrays: dict, x, y) -> np.ndarray:
+    # accuracy of every single tree on (x, y)
+    forest = FlatForest(arrays)
+    votes = forest.classes[np.argmax(forest.value[forest.leaves(x)], axis=2)]  # (rows, trees)
+    return (votes == np.asarray(y)[:, None]).mean(axis=0)
+
+
+def prune_forest(arrays: dict, x, y, keep: float = 0.5) -> dict:
+    # keep the `keep` share of trees that score best on (x, y), ideally rows the forest was not fitted on
+    scores = tree_scores(arrays, x, y)
+    n_keep = max(1, int(round(len(scores) * keep)))
+    kept = np.sort(np.argsort(-scores, kind="stable")[:n_keep])
+    ends = np.r_[arrays["roots"][1:], len(arrays["feature"])]
+
+    out = {k: [] for k in ("feature", "threshold", "left", "right", "value", "missing_left")}
+    roots, offset = [], 0
+    for t in kept:
+        start, end = arrays["roots"][t], ends[t]
+        for k in out:
+            out[k].append(arrays[k][start:end])
+        shift = offset - start  # child ids are global, move them with the tree
+        out["left"][-1] = np.where(out["left"][-1] >= 0, out["left"][-1] + shift, -1).astype(np.int32)
+        out["right"][-1] = np.where(out["right"][-1] >= 0, out["right"][-1] + shift, -1).astype(np.int32)
+        roots.append(offset)
+        offset += end - start
+    pruned = {k: np.concatenate(v) for k, v in out.items()}
+    pruned["roots"] = np.array(roots, dtype=np.int32)
+    pruned["classes"] = arrays["classes"]
+    return pruned
+
+
+def to_float32(arrays: dict) -> dict:
+    # half the size of thresholds and leaf values; predictions can flip for values right at a split
+    return {**arrays, "threshold": arrays["threshold"].astype(np.float32),
+            "value": arrays["value"].astype(np.float32)}
+
+
+def save_forest(arrays: dict, path: str):
+    np.savez(path, **arrays)
+
+
+def load_forest(path: str) -> "FlatForest":
+    with np.load(path, allow_pickle=False) as data:
+        return FlatForest({k: data[k] for k in data.files})
+
+
+def write_arrays(arrays: dict, path: str, header: dict | None = None):
+    # one uncompressed .npy per array + header.json, so every array can be memory-mapped.
+    # Every save writes new, versioned file names and then swaps the header in atomically: processes that
+    # have the previous arrays mapped keep their (unlinked) inodes, nothing is ever overwritten under them
+    os.makedirs(path, exist_ok=True)
+    version = f"{time.time_ns():x}"
+    files = {}
+    for name, arr in arrays.items():
+        files[name] = f"{name}.{version}.npy"
+        np.save(os.path.join(path, files[name]), np.ascontiguousarray(arr))
+    header = {**(header or {}), "version": version, "files": files,
+              "arrays": {name: [str(arr.dtype), list(arr.shape)] for name, arr in arrays.items()}}
+    tmp = os.path.join(path, "header.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(header, f, indent=1)
+    os.replace(tmp, os.path.join(path, "header.json"))  # header last: a half-written version is never read
+    _remove_stale(path, set(files.values()))
+
+
+def _remove_stale(path: str, keep: set):
+    # array files of earlier versions; still-open maps survive the unlink (a lock on Windows leaves them for later)
+    for entry in os.listdir(path):
+        if entry.endswith(".npy") and entry not in keep:
+            try:
+                os.remove(os.path.join(path, entry))
+            except OSError:
+                pass
+
+
+def read_header(path: str) -> dict:
+    with open(os.path.join(path, "header.json")) as f:
+        return json.load(f)
+
+
+def open_forest(path: str, mmap: bool = True, retries: int = 3) -> "FlatForest":
+    # read-only memory maps: processes that open the same files share their pages
+    mode = "r" if mmap else None
+    for attempt in range(retries + 1):
+        header = read_header(path)
+        files = header.get("files") or {name: f"{name}.npy" for name in header["arrays"]}
+        try:
+            return FlatForest({name: np.load(os.path.join(path, file), mmap_mode=mode, allow_pickle=False)
+                               for name, file in files.items()})
+        except FileNotFoundError:
+            if attempt == retries:
+                raise  # a re-save replaced the version between reading the header and opening its files
+
+
+# Scores one row or a batch by walking every tree in lockstep
+class FlatForest:
+
+    def __init__(self, arrays: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.missing_left = arrays["missing_left"]
+        self.roots = arrays["roots"]
+        self.classes = arrays["classes"]
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def leaves(self, x) -> np.ndarray:
+        # leaf node id reached in every tree, shape (rows, trees)
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[None, :]
+        node = np.repeat(self.roots[None, :], len(x), axis=0)
+        rows = np.arange(len(x))[:, None]
+        while True:
+            feature = self.feature[node]
+            inner = feature != _LEAF
+            if not inner.any():
+                return node
+            values = x[rows, np.where(inner, feature, 0)]
+            go_left = (values <= self.threshold[node]) | (np.isnan(values) & self.missing_left[node])
+            node = np.where(inner, np.where(go_left, self.left[node], self.right[node]), node)
+
+    def predict_proba(self, x) -> np.ndarray:
+        # average of the per-tree class fractions, like RandomForestClassifier
+        return self.value[self.leaves(x)].sum(axis=1) / self.n_trees
+
+    def predict(self, x) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(x), axis=1)]
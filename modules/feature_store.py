@@ -0,0 +1,154 @@
+# Content-addressed cache of backtest feature rows
+# entries are keyed by symbol + strategy parameters + a hash of the price bars they were built from,
+# so a rerun after new bars arrived only recomputes the trading days that could have changed;
+# with intrabar resolution the M1 bars are part of the hash too
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import backtest
+from modules.candle import CandleSeries
+from modules.intrabar import IntrabarStore
+
+ROWS_VERSION = 1  # bump when the backtest rows (columns, encoding, simulation) change: old entries are ignored
+
+
+def params_key(params: dict) -> str:
+    blob = json.dumps({**params, "rows_version": ROWS_VERSION}, sort_keys=True, default=str).encode()
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+def price_hash(candles: CandleSeries, end: int | None = None, m1: IntrabarStore | None = None) -> str:
+    # hash of the first `end` bars (time, prices, sessions) and of the M1 bars opened before bar `end`
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (candles.time, candles.open, candles.high, candles.low, candles.close, candles.session_codes):
+        h.update(np.ascontiguousarray(arr[:end]).tobytes())
+    h.update(json.dumps(candles.session_names).encode())
+    if m1 is not None:
+        if not m1.exists():
+            h.update(b"no m1")
+            return h.hexdigest()
+        stop = None
+        if end is not None and end < len(candles):
+            t = m1.column("time")  # binary search: a few pages of the map
+            stop = int(np.searchsorted(t, candles.time[end:end + 1].astype("datetime64[ns]").astype(np.int64)[0]))
+        h.update(m1.fingerprint(stop).encode())  # block digests from the store's metadata
+    return h.hexdigest()
+
+
+def relink_previous(df: pd.DataFrame) -> pd.DataFrame:
+    # prev_* columns depend on the previous day's row, which may sit on the other side of a merge
+    if df.empty:
+        return df
+    days = pd.DatetimeIndex(df["date"]).tz_localize(None).to_numpy("datetime64[D]").astype(np.int64)
+    result = backtest.trade_results(df["tp1_hit"], df["tp2_hit"], df["sl_hit"])
+    direction = df["trade_direction"].to_numpy(dtype=object)
+    df["prev_result"], df["prev_direction"], df["prev_traded"] = backtest.link_previous(days, result, direction)
+    return df
+
+
+class FeatureStore:
+
+    def __init__(self, ticker: str, params: dict, root: str = "modules/data/features/cache", max_entries: int = 3,
+                 intrabar: IntrabarStore | None = None):
+        self.ticker = ticker
+        self.params = params
+        self.max_entries = max_entries
+        self.intrabar = intrabar  # M1 store the rows were resolved with, hashed along with the bars
+        self.dir = os.path.join(root, f"{ticker}_{params_key(params)}")
+        self.stats = {}  # what the last get() did: "hit", "extend" or "miss", plus timings
+
+    def _index_path(self) -> str:
+        return os.path.join(self.dir, "index.json")
+
+    def _load_index(self) -> list[dict]:
+        if not os.path.exists(self._index_path()):
+            return []
+        with open(self._index_path()) as f:
+            return json.load(f)
+
+    def _save(self, entries: list[dict], key: str, entry: dict, rows: pd.DataFrame):
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, f"{key}.pkl"), "wb") as f:
+            pickle.dump(rows, f)
+        entries = [e for e in entries if e["key"] != key] + [entry]
+        # keep only the newest few entries
+        entries.sort(key=lambda e: e["created"])
+        for old in entries[:-self.max_entries]:
+            try:
+                os.remove(os.path.join(self.dir, f"{old['key']}.pkl"))
+            except FileNotFoundError:
+                pass
+        with open(self._index_path(), "w") as f:
+            json.dump(entries[-self.max_entries:], f, indent=1)
+
+    def _load_rows(self, key: str) -> pd.DataFrame | None:
+        try:
+            with open(os.path.join(self.dir, f"{key}.pkl"), "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def get(self, candles: CandleSeries, compute) -> pd.DataFrame:
+        # compute(start_bar) must return backtest rows for trades entered at start_bar or later
+        t0 = time.perf_counter()
+        n = len(candles)
+        key = self._hash(candles)
+        entries = self._load_index()
+
+        for entry in entries:
+            if entry["key"] == key:
+                rows = self._load_rows(key)
+                if rows is not None:
+                    self.stats = {"mode": "hit", "rows": len(rows), "seconds": time.perf_counter() - t0}
+                    return rows
+
+        # longest cached entry whose stable bars are still a prefix of the current data
+        base, base_rows = None, None
+        for entry in sorted(entries, key=lambda e: e["stable"], reverse=True):
+            if 0 < entry["stable"] <= n and self._hash(candles, entry["stable"]) == entry["stable_hash"]:
+                base_rows = self._load_rows(entry["key"])
+                if base_rows is not None:
+                    base = entry
+                    break
+
+        if base is None:
+            rows = backtest.to_frame(compute(0))
+            mode, start = "miss", 0
+        else:
+            start = self._first_dirty_bar(candles, base_rows, base["stable"])
+            cutoff = candles.dates[start] if start < n else None
+            keep = base_rows if cutoff is None else base_rows[base_rows["date"] < cutoff.normalize()]
+            new = backtest.to_frame(compute(start))
+            rows = pd.concat([keep, new], ignore_index=True) if len(keep) else new
+            mode = "extend"
+        rows = relink_previous(rows)
+
+        # the last bar may still be forming, so it is not part of the stable prefix
+        stable = max(n - 1, 0)
+        entry = {"key": key, "bars": n, "stable": stable, "stable_hash": self._hash(candles, stable),
+                 "last_time": str(candles.dates[-1]) if n else None, "created": time.time()}
+        self._save(entries, key, entry, rows)
+        self.stats = {"mode": mode, "rows": len(rows), "start_bar": start, "seconds": time.perf_counter() - t0}
+        return rows
+
+    def _hash(self, candles: CandleSeries, end: int | None = None) -> str:
+        return price_hash(candles, end, self.intrabar)
+
+    def _first_dirty_bar(self, candles: CandleSeries, rows: pd.DataFrame, stable: int) -> int:
+        # first bar of the earliest day whose rows could differ with the new bars:
+        # the day of the last stable bar, or earlier if a cached trade's lookahead ran past it
+        lookahead = int(self.params.get("lookahead", 30))
+        first_day = candles.time[stable - 1].astype("datetime64[D]")
+        if len(rows):
+            times = pd.DatetimeIndex(rows["date"]).tz_localize(None).to_numpy("datetime64[ns]")
+            bars = np.searchsorted(candles.time, times)
+            open_trades = bars + lookahead >= stable
+            if open_trades.any():
+                first_day = min(first_day, times[open_trades].min().astype("datetime64[D]"))
+        return int(np.searchsorted(candles.time, first_day.astype("datetime64[ns]")))
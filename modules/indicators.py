@@ -0,0 +1,213 @@
+# Vectorized technical indicators shared by training (AsianRange) and live trading
+# every function takes contiguous float arrays and returns a NaN-padded array of the same length
+# windows, seeds and warm-up NaNs are those of the per-candle loops they replaced; the window sums, the EMA
+# recursion (pandas ewm) and np.round run in a different float order, so a value that sits on a rounding tie
+# can come out one unit of the last kept decimal (1e-5, RSI 0.01) away from the loop: a few rows in 10,000
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_array(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _window_mean(values: np.ndarray, period: int) -> np.ndarray:
+    # mean of each full window, aligned to the window's last element
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).sum(axis=1) / period
+    return out
+
+
+def true_range(high, low, close) -> np.ndarray:
+    # first bar has no previous close, so its TR is undefined
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    tr = np.full(len(close), np.nan)
+    if len(close) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum.reduce([
+            high[1:] - low[1:],
+            np.abs(high[1:] - prev_close),
+            np.abs(low[1:] - prev_close),
+        ])
+    return tr
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    # simple moving average of TR, first value at index `period`
+    tr = true_range(high, low, close)
+    out = np.full(len(tr), np.nan)
+    if len(tr) > period:
+        out[1:] = _window_mean(tr[1:], period)
+    return np.round(out, 5)
+
+
+def _ema_raw(close: np.ndarray, period: int) -> np.ndarray:
+    # seeded with the SMA of the first `period` closes, placed at index `period`
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out
+    k = 2 / (period + 1)
+    seeded = close[period:].copy()
+    seeded[0] = close[:period].sum() / period
+    # ewm(adjust=False) runs y = x*k + y_prev*(1-k) in one compiled pass
+    out[period:] = pd.Series(seeded).ewm(alpha=k, adjust=False).mean().to_numpy()
+    return out
+
+
+def ema(close, period: int = 20) -> np.ndarray:
+    return np.round(_ema_raw(_as_array(close), period), 5)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    # RSI over simple averages of gains/losses; a window with no losses gives 0
+    close = _as_array(close)
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    avg_gain = _window_mean(np.maximum(delta, 0), period)[period - 1:]
+    avg_loss = _window_mean(np.maximum(-delta, 0), period)[period - 1:]
+    safe_loss = np.where(avg_loss != 0, avg_loss, 1.0)
+    rs = np.where(avg_loss != 0, avg_gain / safe_loss, 0.0)
+    out[period:] = np.round(100 - (100 / (1 + rs)), 2)
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26) -> np.ndarray:
+    # difference of the two rounded EMAs, each computed once (an EMA off by 1e-5 carries over, see the top)
+    close = _as_array(close)
+    return np.round(ema(close, fast) - ema(close, slow), 5)
+
+
+def compute_all(high, low, close) -> dict[str, np.ndarray]:
+    # every indicator the feature set uses, keyed by its feature column
+    return {
+        "atr14": atr(high, low, close, 14),
+        "ema20": ema(close, 20),
+        "rsi14": rsi(close, 14),
+        "macd": macd(close),
+    }
+
+
+# Streaming version of compute_all for the live loop: seeded once from history,
+# then updated per closed candle in constant time
+class IndicatorState:
+
+    def __init__(self, atr_period: int = 14, rsi_period: int = 14, ema_periods=(20, 12, 26)):
+        self.atr_period = atr_period
+        self.rsi_period = rsi_period
+        self.ema_periods = tuple(ema_periods)
+        self.count = 0  # number of closed candles seen
+        self.last_time = None  # time of the last closed candle
+        self._prev_close: float | None = None
+        self._tr = deque(maxlen=atr_period)
+        self._gains = deque(maxlen=rsi_period)
+        self._losses = deque(maxlen=rsi_period)
+        self._closes = deque(maxlen=max(self.ema_periods))  # only needed to seed the EMAs
+        self._ema: dict[int, float | None] = {p: None for p in self.ema_periods}
+
+    @classmethod
+    def from_arrays(cls, high, low, close, last_time=None, **kwargs) -> "IndicatorState":
+        # seed from full history with the vectorized functions instead of replaying every bar
+        state = cls(**kwargs)
+        high, low, close = _as_array(high), _as_array(low), _as_array(close)
+        n = len(close)
+        state.count = n
+        state.last_time = last_time
+        if n == 0:
+            return state
+        state._prev_close = float(close[-1])
+        state._closes.extend(close[-state._closes.maxlen:].tolist())
+        tr = true_range(high, low, close)[1:]
+        state._tr.extend(tr[-state.atr_period:].tolist())
+        delta = np.diff(close)[-state.rsi_period:]
+        state._gains.extend(np.maximum(delta, 0).tolist())
+        state._losses.extend(np.maximum(-delta, 0).tolist())
+        for p in state.ema_periods:
+            if n > p:
+                state._ema[p] = float(_ema_raw(close, p)[-1])
+        return state
+
+    def update(self, high: float, low: float, close: float, time=None):
+        # add one closed candle
+        i = self.count
+        if self._prev_close is not None:
+            pc = self._prev_close
+            self._tr.append(max(high - low, abs(high - pc), abs(low - pc)))
+            delta = close - pc
+            self._gains.append(max(0, delta))
+            self._losses.append(max(0, -delta))
+
+        for p in self.ema_periods:
+            if i == p:
+                self._ema[p] = sum(list(self._closes)[-p:]) / p
+            elif i > p:
+                k = 2 / (p + 1)
+                self._ema[p] = close * k + self._ema[p] * (1 - k)
+
+        self._closes.append(close)
+        self._prev_close = close
+        self.count = i + 1
+        self.last_time = time
+
+    def values(self) -> dict[str, float]:
+        # indicator values at the last closed candle, NaN while warming up
+        # keys follow the periods (atr14, ema20, rsi14, macd by default); ema_periods = (trend, MACD fast, MACD slow)
+        i = self.count - 1
+        trend, *fast_slow = self.ema_periods
+        atr_key, ema_key, rsi_key = f"atr{self.atr_period}", f"ema{trend}", f"rsi{self.rsi_period}"
+        out = {atr_key: np.nan, ema_key: np.nan, rsi_key: np.nan}
+        if len(fast_slow) == 2:
+            out["macd"] = np.nan
+        if i >= self.atr_period:
+            out[atr_key] = round(sum(self._tr) / self.atr_period, 5)
+        if i >= self.rsi_period:
+            avg_gain = sum(self._gains) / self.rsi_period
+            avg_loss = sum(self._losses) / self.rsi_period
+            rs = avg_gain / avg_loss if avg_loss != 0 else 0
+            out[rsi_key] = round(100 - (100 / (1 + rs)), 2)
+        ema = {p: round(v, 5) if v is not None else None for p, v in self._ema.items()}
+        if ema[trend] is not None:
+            out[ema_key] = ema[trend]
+        if "macd" in out and all(ema[p] is not None for p in fast_slow):
+            out["macd"] = round(ema[fast_slow[0]] - ema[fast_slow[1]], 5)
+        return out
+
+    def preview(self, high: float, low: float, close: float) -> dict[str, float]:
+        # values as if a (still forming) candle was appended, without changing the state
+        probe = IndicatorState.restore(self.snapshot())
+        probe.update(high, low, close)
+        return probe.values()
+
+    def snapshot(self) -> dict:
+        # plain, JSON-friendly copy of the state
+        return {
+            "atr_period": self.atr_period,
+            "rsi_period": self.rsi_period,
+            "ema_periods": list(self.ema_periods),
+            "count": self.count,
+            "last_time": self.last_time,
+            "prev_close": self._prev_close,
+            "tr": list(self._tr),
+            "gains": list(self._gains),
+            "losses": list(self._losses),
+            "closes": list(self._closes),
+            "ema": {str(p): v for p, v in self._ema.items()},
+        }
+
+    @classmethod
+    def restore(cls, snap: dict) -> "IndicatorState":
+        state = cls(snap["atr_period"], snap["rsi_period"], snap["ema_periods"])
+        state.count = snap["count"]
+        state.last_time = snap["last_time"]
+        state._prev_close = snap["prev_close"]
+        state._tr.extend(snap["tr"])
+        state._gains.extend(snap["gains"])
+        state._losses.extend(snap["losses"])
+        state._closes.extend(snap["closes"])
+        state._ema = {int(p): v for p, v in snap["ema"].items()}
+        return state
@@ -0,0 +1,165 @@
+# Intrabar resolution of ambiguous backtest bars with M1 data
+# M1 bars are stored as one .npy file per column and memory-mapped, so only the pages
+# around the few M30 bars that touch both SL and TP1 are ever read from disk
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import backtest
+from modules.candle import CandleSeries
+
+_COLUMNS = ("time", "open", "high", "low", "close")
+BLOCK_ROWS = 1 << 16  # rows per block digest written with the store
+
+
+def m1_dir(ticker: str) -> str:
+    return f"modules/data/price/m1/{ticker}"
+
+
+class IntrabarStore:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cols: dict[str, np.ndarray] = {}
+        self._meta: dict | None = None
+
+    @classmethod
+    def for_ticker(cls, ticker: str) -> "IntrabarStore":
+        return cls(m1_dir(ticker))
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "meta.json"))
+
+    def write(self, df: pd.DataFrame, block_rows: int = BLOCK_ROWS):
+        # price DataFrame (Date, Open, High, Low, Close) -> one uncompressed .npy per column
+        # meta.json gets a chained digest per block of rows, so fingerprint() never has to read the columns
+        os.makedirs(self.path, exist_ok=True)
+        dates = df["Date"]
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+        arrays = {"time": dates.to_numpy("datetime64[ns]").astype(np.int64)}
+        for col in _COLUMNS[1:]:
+            arrays[col] = df[col.capitalize()].to_numpy(dtype=np.float64)
+        for col, arr in arrays.items():
+            np.save(os.path.join(self.path, f"{col}.npy"), np.ascontiguousarray(arr))
+        blocks, digest = [], b""
+        for start in range(block_rows, len(df) + 1, block_rows):
+            h = hashlib.blake2b(digest, digest_size=16)
+            for col in _COLUMNS:
+                h.update(arrays[col][start - block_rows:start].tobytes())
+            digest = h.digest()
+            blocks.append(digest.hex())
+        meta = {"rows": len(df), "first": str(dates.iloc[0]) if len(df) else None,
+                "last": str(dates.iloc[-1]) if len(df) else None, "block_rows": block_rows, "blocks": blocks}
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        self._cols = {}
+        self._meta = None
+
+    def meta(self) -> dict:
+        if self._meta is None:
+            with open(os.path.join(self.path, "meta.json")) as f:
+                self._meta = json.load(f)
+        return self._meta
+
+    def fingerprint(self, stop: int | None = None) -> str:
+        # digest of the first `stop` rows (all by default): whole blocks come from meta.json,
+        # only the rows after the last whole block are read
+        meta = self.meta()
+        rows = meta["rows"] if stop is None else min(stop, meta["rows"])
+        block_rows = meta.get("block_rows")
+        if block_rows is None:  # written before block digests existed: hash the rows themselves
+            k, block_rows, prefix = 0, 0, b""
+        else:
+            k = rows // block_rows
+            prefix = bytes.fromhex(meta["blocks"][k - 1]) if k else b""
+        h = hashlib.blake2b(prefix, digest_size=16)
+        h.update(str(rows).encode())
+        for col in _COLUMNS:
+            h.update(np.ascontiguousarray(self.column(col)[k * block_rows:rows]).tobytes())
+        return h.hexdigest()
+
+    def column(self, name: str) -> np.ndarray:
+        # read-only memory map; nothing is loaded until it is indexed
+        if name not in self._cols:
+            self._cols[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self._cols[name]
+
+    def __len__(self) -> int:
+        return len(self.column("time"))
+
+
+class IntrabarResolver:
+    # called by backtest.resolve_outcomes with the bars where SL and TP1 were touched together
+
+    def __init__(self, store: IntrabarStore, candles: CandleSeries, bar_minutes: int = 30):
+        self.store = store
+        self.starts = candles.time.astype("datetime64[ns]").astype(np.int64)
+        self.width = bar_minutes * 60 * 10**9
+        self.stats = {"ambiguous": 0, "resolved": 0, "tp1_first": 0, "m1_rows_read": 0}
+
+    def __call__(self, bars, short, entry, sl, tp1, tp2):
+        # returns (known, tp1_first, tp2_first): whether M1 data decided the bar, whether TP1 came
+        # strictly before SL, and whether TP2 then filled before price came back to entry
+        n = len(bars)
+        self.stats["ambiguous"] += n
+        if n == 0 or len(self.store) == 0:
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        t = self.store.column("time")
+        start = self.starts[bars]
+        lo = np.searchsorted(t, start)
+        hi = np.searchsorted(t, start + self.width)
+        per_bar = int(self.width // (60 * 10**9))
+
+        offs = lo[:, None] + np.arange(per_bar)[None, :]
+        inside = offs < hi[:, None]
+        offs = np.minimum(offs, len(t) - 1)
+        self.stats["m1_rows_read"] += int(inside.sum())
+        high = np.where(inside, self.store.column("high")[offs], np.nan)
+        low = np.where(inside, self.store.column("low")[offs], np.nan)
+
+        s = short[:, None]
+        sl_touch = np.where(s, high >= sl[:, None], low <= sl[:, None])
+        tp_touch = np.where(s, low <= tp1[:, None], high >= tp1[:, None])
+        tp2_touch = np.where(s, low <= tp2[:, None], high >= tp2[:, None])
+        be_touch = np.where(s, high >= entry[:, None], low <= entry[:, None])
+        first_sl = backtest._first(sl_touch)
+        first_tp = backtest._first(tp_touch)
+        # touched together inside one M1 bar still counts as SL, like the M30 rule
+        known = (hi > lo) & ((first_sl < per_bar) | (first_tp < per_bar))
+        tp1_first = known & (first_tp < first_sl)
+        # same rules as on M30 after TP1: TP2 may fill on the TP1 bar, BE only on a later one
+        col = np.arange(per_bar)[None, :]
+        first_tp2 = backtest._first(tp2_touch & (col >= first_tp[:, None]))
+        first_be = backtest._first(be_touch & (col > first_tp[:, None]))
+        tp2_first = tp1_first & (first_tp2 < first_be)
+        self.stats["resolved"] += int(known.sum())
+        self.stats["tp1_first"] += int(tp1_first.sum())
+        return known, tp1_first, tp2_first
+
+
+def compare(candles: CandleSeries, store: IntrabarStore, indicators: dict | None = None,
+            lookahead: int = 30) -> pd.DataFrame:
+    # M30-only vs M1-resolved labels and runtimes, side by side
+    t0 = time.perf_counter()
+    plain = backtest.run_backtest(candles, indicators, lookahead)
+    t_plain = time.perf_counter() - t0
+
+    resolver = IntrabarResolver(store, candles)
+    t0 = time.perf_counter()
+    resolved = backtest.run_backtest(candles, indicators, lookahead, resolver=resolver)
+    t_resolved = time.perf_counter() - t0
+
+    rows = []
+    for col in ("tp1_hit", "tp2_hit", "sl_hit", "be_hit"):
+        a, b = np.asarray(plain[col]), np.asarray(resolved[col])
+        rows.append({"metric": f"{col} rate", "m30": a.mean() if len(a) else np.nan,
+                     "m1_resolved": b.mean() if len(b) else np.nan, "changed_rows": int((a != b).sum())})
+    for metric, key in (("ambiguous bars", "ambiguous"), ("resolved with M1", "resolved"), ("M1 rows read", "m1_rows_read")):
+        rows.append({"metric": metric, "m30": np.nan, "m1_resolved": resolver.stats[key], "changed_rows": np.nan})
+    rows.append({"metric": "runtime ms", "m30": t_plain * 1000, "m1_resolved": t_resolved * 1000, "changed_rows": np.nan})
+    return pd.DataFrame(rows)
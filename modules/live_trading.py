@@ -1,77 +1,123 @@
-from modules.candle import Candlestick
-from modules.collect_data import MT5DataFetcher
-from modules.bot import Bot
-from datetime import datetime, time as dtime
+from modules.candle import CandleSeries
+from modules.day_index import DayIndex
+from modules.base_bot import BaseBot
+from modules.notifier import Notifier
+from modules.indicators import IndicatorState
+from modules.bundle import ModelBundle
+from modules.scheduler import BarScheduler, BarEvent
 import pandas as pd
 import time
-import pickle
-import numpy as np
-import os
 import warnings
-from modules.visualizer import Visualizer
+from modules.chart_worker import ChartRenderer
+from modules.metrics import Metrics, metrics_path
 
 # suppress sklearn warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
 
 # Class that handles the live signal detection process
 class LiveTrader:
-    def __init__(self, ticker):
+    def __init__(self, ticker, scheduler: BarScheduler | None = None, bot: BaseBot | None = None,
+                 metrics: Metrics | None = None, notifier: Notifier | None = None,
+                 charts: ChartRenderer | None = None, fetcher=None):
+        # notifier / charts / fetcher can be shared or injected (multi-symbol monitor, replays)
         self.ticker = ticker
-        self.model = None
+        # per-stage timings, exported to modules/data/metrics/<ticker>.prom
+        self.metrics = metrics or Metrics(path=metrics_path(ticker), labels={"ticker": ticker})
+        self.bundle: ModelBundle | None = None  # serving-only model: forest, label maps, column order
         self.asian_high = None
         self.asian_low = None
         self.asian_range_ready = False
         self.last_checked_date = None
         self.trade_done_today = False
-        self.Bot = Bot()  # init Telegram bot
+        if bot is None:
+            if notifier is not None:
+                bot = notifier.backend
+            else:
+                from modules.bot import Bot  # telegram is only imported when the real bot is used
+                bot = Bot()
+        self.Bot = bot
+        self.scheduler = scheduler or BarScheduler()  # wakes us at every bar close
+        # alerts go out from a background thread, which also checks the bar close -> delivered bound
+        self.notifier = notifier or Notifier(self.Bot, metrics=self.metrics,
+                                             max_latency=self.scheduler.max_signal_latency)
+        self.charts = charts or ChartRenderer(metrics=self.metrics)  # matplotlib lives in its own process
+        if fetcher is None:
+            from modules.collect_data import MT5DataFetcher  # long-lived MT5 session, connected on first fetch
+            fetcher = MT5DataFetcher(ticker, broker_offset=self.scheduler.broker_offset)
+        self.fetcher = fetcher  # kept between loops
         self.skip_today = False # if any London's candle closes outside of range - skip day
+        self.indicators: IndicatorState | None = None  # streaming ATR/EMA/RSI/MACD
+        self._candles: CandleSeries | None = None
+        self.days = DayIndex()  # per-day session offsets and Asian high/low, extended on every fetch
+        self.send_charts = True  # off in replays
+        self.signals: list[dict] = []  # every prediction made: date, direction, prediction, raw features
 
     def load_model(self):
-        # Load trained model from disk
-        model_path = f"modules/data/models/EURUSD_model.pkl"
-        if not os.path.exists(model_path):
-            raise FileNotFoundError("Trained model not found. Train and save first.")
+        # serving bundle from disk: JSON header + flattened forest (scaler folded in), no sklearn
+        self._set_bundle(ModelBundle.load(self.ticker))
+        print("Model + metadata loaded." + (" Using flattened forest." if self.bundle.forest else ""))
 
-        with open(model_path, "rb") as f:
-            bundle = pickle.load(f)
+    def use_model(self, model):
+        # take a trained modules.model.Model directly (replays, tests) instead of the bundle on disk
+        self._set_bundle(ModelBundle.from_model(model))
 
-        # Load everything into memory
-        self.model = bundle["model"]
-        self.scaler = bundle["scaler"]
-        self.label_maps = bundle["label_maps"]
-        self.feature_order = bundle["columns"]
-        print("Model + metadata loaded.")
+    def _set_bundle(self, bundle: ModelBundle):
+        self.bundle = bundle
+        self.label_maps = bundle.label_maps
+        self.feature_order = bundle.columns
 
     def fetch_candles(self):
-        # Download candles and convert to objects
-        fetcher = MT5DataFetcher(self.ticker)
-        fetcher.get_data()
-        df = pd.read_csv(f"modules/data/price/{self.ticker}.csv", parse_dates=["Date"])
-        candles = [Candlestick(row["Index"], row["Date"], row["Open"], row["High"], row["Low"], row["Close"],
-                               row["Volume"], row["Session"]) for _, row in df.iterrows()]
+        # Download new candles (delta since the last stored bar) into columnar arrays
+        with self.metrics.stage("fetch"):
+            if hasattr(self.fetcher, "get_candles"):
+                candles = self.fetcher.get_candles()  # replay source, already columnar
+            else:
+                candles = CandleSeries.from_frame(self.fetcher.get_data(incremental=True))
+        print(f"Fetched {self.fetcher.new_rows} new/revised bars")
+        self._candles = candles
+        with self.metrics.stage("indicators"):
+            self._sync_indicators(candles)
+        with self.metrics.stage("day_index"):
+            self.days.update(candles)
         return candles
 
+    def _sync_indicators(self, candles):
+        # feed newly closed candles into the indicator state (the last candle is still forming)
+        closed = candles[:-1]
+        if self.indicators is None:
+            self.indicators = IndicatorState.from_arrays(
+                closed.high, closed.low, closed.close,
+                last_time=closed[-1].date if len(closed) else None,
+            )
+            return
+
+        last = self.indicators.last_time
+        new = closed if last is None else closed.between(last + pd.Timedelta(1, "ns"))
+        for c in new:
+            self.indicators.update(c.high, c.low, c.close, c.date)
+
 
     def build_asian_range(self, candles, date=None):
         # Take candles for Asian session and define its high/low
         self.skip_today = False
         today = date or candles[-1].date.date()
 
-        asian_candles = [c for c in candles if c.date.date() == today and c.session == "Asia"]
-        print(f"Found {len(asian_candles)} Asian candles for {today}")
+        self.days.update(candles)
+        print(f"Found {self.days.count(today, 'Asia')} Asian candles for {today}")
 
-        if not asian_candles:
+        asia = self.days.asian_range(today)  # cached per day, no scan
+        if asia is None:
             print("No Asian candles found yet.")
             return False
 
-        self.asian_high = max(c.high for c in asian_candles)
-        self.asian_low = min(c.low for c in asian_candles)
+        self.asian_high, self.asian_low = asia
         self.asian_range_ready = True
         self.trade_done_today = False
         print(f"Asian Range built: High={self.asian_high}, Low={self.asian_low}")
         return True
 
-    def check_sweep_and_predict(self, last_candle):
+    def check_sweep_and_predict(self, last_candle, bar_close: float | None = None):
+        # bar_close: time.monotonic() of the bar close, so the notifier can time delivery against it
         # Check if price swept above or below Asian range
         if last_candle.high > self.asian_high:
             trade_dir = "Short"
@@ -84,20 +130,41 @@ class LiveTrader:
             return
 
         # Build features and run model prediction
-        features = self.build_features(last_candle, trade_dir)
-        prediction = self.model.predict([features])[0]
+        with self.metrics.stage("features"):
+            features = self.build_features(last_candle, trade_dir)
+        with self.metrics.stage("predict"):
+            prediction = self.predict(features)
+        self.metrics.inc("signals")
+        self.signals.append({"date": last_candle.date, "direction": trade_dir, "prediction": prediction,
+                             "asian_high": self.asian_high, "asian_low": self.asian_low, "features": features})
         print(f"Prediction (TP-1==1): {prediction}")
         self.trade_done_today = True
 
-        # Based on prediction send chart to Telegram
+        # Text goes out right away, the chart follows (merged into one post if the text is still queued)
+        key = (self.ticker, str(last_candle.date), trade_dir)
         if prediction == 1:
             print(f"TP-1 predicted → sending {trade_dir.upper()} screenshot to Telegram …")
-            self._send_visual_to_telegram()
-            self.Bot.send_message(f"{self.ticker}\n{trade_dir}\nTP prediction")
+            self.notifier.send_message(f"{self.ticker}\n{trade_dir}\nTP prediction", key=key, bar_close=bar_close)
+            self._send_visual_to_telegram(key, self._trade_levels(last_candle, trade_dir))
         elif prediction == 0:
             print(f"SL predicted → sending {trade_dir.upper()} screenshot to Telegram …")
-            self._send_visual_to_telegram()
-            self.Bot.send_message(f"{self.ticker}\n{trade_dir}\nSL prediction")
+            self.notifier.send_message(f"{self.ticker}\n{trade_dir}\nSL prediction", key=key, bar_close=bar_close)
+            self._send_visual_to_telegram(key, self._trade_levels(last_candle, trade_dir))
+        return prediction
+
+    def _trade_levels(self, candle, trade_dir: str) -> dict:
+        # the levels the backtest trades with: entry at close, SL beyond the wick, TP1 mid-range, TP2 far side
+        short = trade_dir == "Short"
+        return {
+            "asian_high": self.asian_high, "asian_low": self.asian_low,
+            "entry": candle.close, "sl": candle.high if short else candle.low,
+            "tp1": (self.asian_high + self.asian_low) / 2,
+            "tp2": self.asian_low if short else self.asian_high,
+        }
+
+    def predict(self, features: list[float]) -> int:
+        # score one raw feature vector
+        return self.bundle.predict(features)
 
     def build_features(self, candle, trade_dir: str) -> list[float]:
         # Basic R:R logic
@@ -110,35 +177,18 @@ class LiveTrader:
         rr_tp2 = (tp2 - candle.close) / (candle.close - sl) if trade_dir == "Long" else \
                  (candle.close - tp2) / (sl - candle.close)
 
-        # Calculate indicators from full candle set
-        df = pd.DataFrame([{"High": c.high, "Low": c.low, "Close": c.close} for c in self.fetch_candles()])
-
-        # ATR calc
-        tr = pd.concat([
-            df["High"] - df["Low"],
-            (df["High"] - df["Close"].shift()).abs(),
-            (df["Low"] - df["Close"].shift()).abs()
-        ], axis=1).max(axis=1)
-        atr14 = tr.rolling(14).mean().iloc[-1]
-
-        # EMA, RSI, MACD
-        ema20 = df["Close"].ewm(span=20, adjust=False).mean().iloc[-1]
-        delta = df["Close"].diff()
-        up, dn = delta.clip(lower=0), -delta.clip(upper=0)
-        gain = up.rolling(14).mean()
-        loss = dn.rolling(14).mean()
-        rs = gain / loss.replace(0, np.nan)
-        rsi14 = 100 - 100 / (1 + rs.iloc[-1])
-        ema12 = df["Close"].ewm(span=12, adjust=False).mean().iloc[-1]
-        ema26 = df["Close"].ewm(span=26, adjust=False).mean().iloc[-1]
-        macd = ema12 - ema26
+        # Indicator values from the streaming state (same engine as training)
+        if self.indicators.last_time is not None and candle.date <= self.indicators.last_time:
+            values = self.indicators.values()
+        else:
+            values = self.indicators.preview(candle.high, candle.low, candle.close)
+        atr14, ema20, rsi14, macd = values["atr14"], values["ema20"], values["rsi14"], values["macd"]
 
         # Additional stats for the day
         asia_vol = self.asian_high - self.asian_low
-        london_cs = [c for c in self.fetch_candles()
-                     if c.session == "London" and c.date.date() == candle.date.date()]
-        london_h = max(c.high for c in london_cs)
-        london_l = min(c.low for c in london_cs)
+        london = self.days.session(self._candles, candle.date.date(), "London")
+        london_h = london.high.max()
+        london_l = london.low.min()
         london_vol = london_h - london_l
 
         # Bundle into a raw dict of values
@@ -167,74 +217,91 @@ class LiveTrader:
             if col in raw:
                 raw[col] = mapping.get(raw[col], -1)
 
-        # Respect original training column order
-        vec = [raw[col] for col in self.feature_order]
-        vec_scaled = self.scaler.transform([vec])[0]
-        return vec_scaled.tolist()
-
-    def check_london_candle_breakout(self, candles):
-        today = datetime.now().date()
-        london_candles = [c for c in candles if c.session == "London" and c.date.date() == today]
-
-        for candle in london_candles:
-            if candle.close > self.asian_high or candle.close < self.asian_low:
-                print(f"LONDON candle at {candle.date} closed OUTSIDE Asian Range → skipping day.")
-                self.skip_today = True
-                return True
+        # Respect original training column order (unscaled, predict() handles scaling)
+        return [raw[col] for col in self.feature_order]
+
+    def check_london_candle_breakout(self, candles, today=None, until=None):
+        today = today or candles[-1].date.date()
+        london = self.days.session(candles, today, "London")
+        if until is not None:
+            london = london.between(end=until)
+
+        outside = (london.close > self.asian_high) | (london.close < self.asian_low)
+        if outside.any():
+            candle = london[int(outside.argmax())]
+            print(f"LONDON candle at {candle.date} closed OUTSIDE Asian Range → skipping day.")
+            self.skip_today = True
+            return True
         return False
 
-    def _send_visual_to_telegram(self):
+    def _send_visual_to_telegram(self, key=None, levels=None):
+        # hand the chart to the render worker; it reaches the notifier whenever it is ready
+        if self._candles is None or not self.send_charts:
+            return
         try:
-            vis = Visualizer(self.ticker)
-            vis.plot()
-            path = vis.save_plot()
-            self.Bot.send_photo(path)
+            levels = levels or {"asian_high": self.asian_high, "asian_low": self.asian_low}
+            self.charts.submit(self.ticker, self._candles, levels,
+                               on_done=lambda png: self.notifier.send_photo(png, key=key))
         except Exception as e:
             print("Error in _send_visual_to_telegram:", e)
 
-    def run(self):
-        print("Starting live trading monitor...")
-        self.load_model()
-
-        while True:
-            now = datetime.now()
-            candles = self.fetch_candles()
-
-            if now.time() < dtime(9, 0):
-                print("Asian session not finished yet. Waiting...")
-                time.sleep(300)
-                continue
-
-            today = now.date()
-            if not self.asian_range_ready or self.last_checked_date != today:
-                built = self.build_asian_range(candles)
-                self.last_checked_date = today
-
-                if not built:
-                    print("Asian session not finished yet. Waiting...")
-                else:
-                    print("Asian range built. Waiting for London session to begin...")
-
-                time.sleep(60)
-                continue
-
-            last_candle = candles[-1]
-            if last_candle.session != "London":
-                print("Waiting for London session candle...")
-                time.sleep(1800)
-                continue
-
-            print(f"Checking candle at {last_candle.date}")
-
-            # Check if London broke the range
-            if not self.skip_today:
-                self.check_london_candle_breakout(candles)
+    def on_bar_close(self, event: BarEvent, candles: CandleSeries):
+        # one step of the session state machine, driven by the scheduler
+        if "new_day" in event:
+            self.asian_range_ready = False
+            self.trade_done_today = False
+            self.skip_today = False
+
+        # normally built when Asia ends; the fallback covers a start in the middle of the day
+        if "asia_done" in event or (not self.asian_range_ready and event.closed_session not in ("Asia", "Other")
+                                    and self.last_checked_date != event.day):
+            with self.metrics.stage("asian_range"):
+                built = self.build_asian_range(candles, date=event.day)
+            self.last_checked_date = event.day
+            if built:
+                print("Asian range built. Waiting for London session to begin...")
+
+        if "london_open" in event:
+            print("London session open.")
+        if "london_close" in event:
+            print("London session closed.")
+
+        if event.closed_session != "London" or not self.asian_range_ready:
+            return
+        if self.trade_done_today or self.skip_today:
+            return
 
-            if self.skip_today:
-                print("Day is marked to be skipped due to London candle closing outside Asian Range.")
-                time.sleep(1800)
-                continue
-            self.check_sweep_and_predict(last_candle)
+        closed = candles.between(event.bar_open, event.bar_close)
+        if len(closed) == 0:
+            print(f"Bar {event.bar_open} not published yet.")
+            return
+        last_candle = closed[-1]
+        print(f"Checking candle at {last_candle.date}")
+
+        # Check if London broke the range
+        with self.metrics.stage("breakout"):
+            self.check_london_candle_breakout(candles, event.day, until=event.bar_close)
+        if self.skip_today:
+            print("Day is marked to be skipped due to London candle closing outside Asian Range.")
+            return
 
+        closed_at = time.monotonic() - self.scheduler.since_close(event)  # bar close on the notifier's clock
+        if self.check_sweep_and_predict(last_candle, closed_at) is not None:
+            # only queued here; the notifier measures bar close -> delivered
+            queued = time.monotonic() - closed_at
+            self.metrics.observe("signal_queued", queued)
+            print(f"Signal queued {queued:.2f}s after bar close.")
 
-            time.sleep(180)  # check again in 3 minutes
+    def run(self):
+        print("Starting live trading monitor...")
+        self.load_model()
+        self.charts.start()  # pre-warm matplotlib before the first signal
+        self.fetch_candles()  # seed history and indicators before the first bar close
+
+        for event in self.scheduler.events():
+            print(event)
+            with self.metrics.stage("cycle"):
+                candles = self.fetch_candles()
+                self.on_bar_close(event, candles)
+            self.metrics.inc("bars")
+            self.metrics.maybe_export()
@@ -0,0 +1,172 @@
+# Per-stage timings, counts and errors for the live monitor
+# histograms live in memory and are written out periodically as a Prometheus text file or JSON lines;
+# a disabled Metrics hands out one shared no-op timer, so instrumented code costs almost nothing
+import bisect
+import json
+import os
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def metrics_path(ticker: str, fmt: str = "prom") -> str:
+    return f"modules/data/metrics/{ticker}.{fmt}"
+
+
+class Histogram:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> list[int]:
+        out, total = [], 0
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> float:
+        # upper bucket bound that covers a q share of the observations
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        for bound, total in zip(self.buckets + (self.max,), self.cumulative()):
+            if total >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class _NullTimer:
+    # shared no-op context manager handed out when metrics are off
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+
+    __slots__ = ("_metrics", "_name", "_t0")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.observe(self._name, time.perf_counter() - self._t0, error=exc_type is not None)
+        return False
+
+
+class Metrics:
+
+    def __init__(self, enabled: bool = True, path: str | None = None, fmt: str = "prom",
+                 interval: float = 60.0, labels: dict | None = None, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.path = path  # nothing is written when None
+        self.fmt = fmt  # "prom" (file rewritten each export) or "jsonl" (one line appended per export)
+        self.interval = interval  # seconds between exports
+        self.labels = labels or {}
+        self.buckets = buckets
+        self.histograms: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_export = time.monotonic()
+
+    def stage(self, name: str):
+        # with metrics.stage("fetch"): ...  -> duration, count and errors of that stage
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def observe(self, name: str, seconds: float, error: bool = False):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(self.buckets)
+            hist.observe(seconds)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def inc(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict:
+        # count / mean / p50 / p95 / max per stage, plus counters
+        with self._lock:
+            stages = {
+                name: {"count": h.count, "errors": self.errors.get(name, 0),
+                       "mean": h.sum / h.count if h.count else 0.0,
+                       "p50": h.quantile(0.5), "p95": h.quantile(0.95), "max": h.max}
+                for name, h in self.histograms.items()
+            }
+            return {"stages": stages, "counters": dict(self.counters)}
+
+    def _label_str(self, **extra) -> str:
+        labels = {**self.labels, **extra}
+        return ",".join(f'{k}="{v}"' for k, v in labels.items())
+
+    def to_prometheus(self) -> str:
+        lines = ["# TYPE asianrange_stage_seconds histogram"]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                for bound, total in zip(self.buckets + ("+Inf",), h.cumulative()):
+                    lines.append(f"asianrange_stage_seconds_bucket{{{self._label_str(stage=name, le=bound)}}} {total}")
+                lines.append(f"asianrange_stage_seconds_sum{{{self._label_str(stage=name)}}} {h.sum:.6f}")
+                lines.append(f"asianrange_stage_seconds_count{{{self._label_str(stage=name)}}} {h.count}")
+            lines.append("# TYPE asianrange_stage_errors_total counter")
+            for name in sorted(self.histograms):
+                lines.append(f"asianrange_stage_errors_total{{{self._label_str(stage=name)}}} {self.errors.get(name, 0)}")
+            lines.append("# TYPE asianrange_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"asianrange_events_total{{{self._label_str(event=name)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        # write the current state to `path` (atomically for the Prometheus file)
+        if not self.enabled or self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.fmt == "jsonl":
+            record = {"time": time.time(), **self.labels, **self.summary()}
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        else:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, self.path)
+        self._last_export = time.monotonic()
+
+    def maybe_export(self):
+        # call once per loop iteration; writes at most every `interval` seconds
+        if self.enabled and time.monotonic() - self._last_export >= self.interval:
+            self.export()
+
+
+NULL_METRICS = Metrics(enabled=False)
@@ -1,61 +1,186 @@
 import os
 import pickle
+import shutil
+import time
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
+from modules.bundle import SCHEMA_VERSION, ModelBundle, artifact_path, forest_path, model_path, save_artifact
+
 
 # Handles training and evaluation of the ML model
+# sklearn and the training helpers are imported where they are used, so load_model() stays cheap
 class Model:
-    def __init__(self, ticker: str):
+    def __init__(self, ticker: str, df: pd.DataFrame | None = None):
         self.ticker = ticker
-        # load pre-made features from file
-        self.df = pd.read_csv(f"modules/data/features/asian_range_{ticker}.csv")
+        # pre-made features (from file unless given, e.g. synthetic data) are only read and encoded
+        # on first use of df/x/y, so load_model() alone never touches the training data
+        self._df = df.copy() if df is not None else None
+        self._encoded = False
+        self._xy = None
         self.label_maps = {}
-        self.scaler = None
-        self._encode_labels()  # turn categorical labels into numbers
-        self.x, self.y = self._select_features()  # input and output columns
-        self.model = RandomForestClassifier()  # can change later
+        self._model = None
+        self._scaler = None
+        self._bundle = None  # set by load_model(); the estimator and scaler are unpickled on first use
+        self._holdout_cache = None  # (scaler, x_test, y_test) for evaluate()
+        self._folds = {}  # (n_folds, test_size) -> cached walk-forward folds
+
+    @property
+    def model(self):
+        if self._model is None:
+            if self._bundle is not None:
+                self._model = self._bundle.estimator
+            else:
+                # tuned hyperparameters when a search was saved for this symbol (see tune()), defaults otherwise
+                from sklearn.ensemble import RandomForestClassifier
+                from modules import tuning
+                self._model = RandomForestClassifier(**tuning.load_params(self.ticker))
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+
+    @property
+    def scaler(self):
+        if self._scaler is None and self._bundle is not None:
+            self._scaler = self._bundle.scaler
+        return self._scaler
+
+    @scaler.setter
+    def scaler(self, value):
+        self._scaler = value
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if not self._encoded:
+            if self._df is None:
+                self._df = pd.read_csv(f"modules/data/features/asian_range_{self.ticker}.csv")
+            self._encoded = True
+            self._encode_labels()  # turn categorical labels into numbers
+        return self._df
+
+    @property
+    def x(self) -> pd.DataFrame:
+        if self._xy is None:
+            self._xy = self._select_features()  # input and output columns
+        return self._xy[0]
 
-    def train(self):
+    @property
+    def y(self) -> pd.Series:
+        if self._xy is None:
+            self._xy = self._select_features()
+        return self._xy[1]
+
+    def train(self, save: bool = True, keep_trees: float | None = None, float32: bool = False):
         # split and normalize data, then fit the model
         x_tr, x_te, y_tr, y_te, scaler = self._split_and_scale(self.x, self.y)
         self.scaler = scaler
+        self._holdout_cache = (scaler, x_te, y_te)
         self.model.fit(x_tr, y_tr)
-        self.save_model()
+        if save:
+            self.save_model(keep_trees, float32)
         print(self.evaluate(x_te, y_te))
 
     def evaluate(self, x=None, y=None):
-        # return precision/recall/f1 report
+        # return precision/recall/f1 report (on the held-out rows by default)
+        from sklearn.metrics import classification_report
         if x is None and y is None:
-            x, _, y, _ = self._split_and_scale(self.x, self.y)[:4]
+            x, y = self._holdout()
         y_pred = self.model.predict(x)
         return classification_report(y, y_pred)
 
-    def save_model(self):
-        # save model and metadata to disk
+    def _holdout(self):
+        # the last 20% of rows that train() held out, scaled with the fitted scaler (not a new one)
+        if self._holdout_cache is None or self._holdout_cache[0] is not self.scaler:
+            from sklearn.model_selection import train_test_split
+            _, x_te, _, y_te = train_test_split(self.x, self.y, test_size=0.2, shuffle=False)
+            x_te = self.scaler.transform(x_te) if self.scaler is not None else x_te
+            self._holdout_cache = (self.scaler, x_te, y_te)
+        return self._holdout_cache[1], self._holdout_cache[2]
+
+    def folds(self, n_folds: int = 5, test_size: int | None = None) -> list:
+        # walk-forward folds with per-fold scaled matrices, built once per fold layout
+        key = (n_folds, test_size)
+        if key not in self._folds:
+            from modules import cross_validation
+            self._folds[key] = cross_validation.build_folds(self.x, self.y, n_folds, test_size)
+        return self._folds[key]
+
+    def cross_validate(self, n_folds: int = 5, workers: int | None = None, estimator=None):
+        # expanding-window CV of the (unfitted) estimator; returns (per-fold table, aggregate)
+        from modules import cross_validation
+        per_fold = cross_validation.cross_validate(estimator or self.model, self.folds(n_folds), workers)
+        return per_fold, cross_validation.aggregate(per_fold)
+
+    def tune(self, budget: float = 300.0, n_configs: int = 27, n_folds: int = 5, workers: int | None = None,
+             metric: str = "f1", space: dict | None = None) -> dict:
+        # successive-halving search on the cached walk-forward folds; the winner becomes self.model
+        from sklearn.ensemble import RandomForestClassifier
+        from modules import tuning
+        t0 = time.perf_counter()
+        search = tuning.SuccessiveHalving(self.folds(n_folds), space, n_configs=n_configs, metric=metric,
+                                          budget=budget, workers=workers)
+        params, log = search.run()
+        tuning.save_search(self.ticker, search, params, log, time.perf_counter() - t0)
+        if params:  # {} when no rung finished: the current estimator stays
+            self.model = RandomForestClassifier(**params)
+        return params
+
+    def save_model(self, keep_trees: float | None = None, float32: bool = False):
+        # save model and metadata to disk (pickle for training/evaluation, mmap-able artifact for serving)
         bundle = {
             "model": self.model,
             "scaler": self.scaler,
             "label_maps": self.label_maps,
             "columns": self.x.columns.tolist(),
+            "schema_version": SCHEMA_VERSION,
         }
         os.makedirs("modules/data/models", exist_ok=True)
-        with open(f"modules/data/models/{self.ticker}_model.pkl", "wb") as f:
+        with open(model_path(self.ticker), "wb") as f:
             pickle.dump(bundle, f)
+        self.export_forest(keep_trees, float32)
+
+    def export_forest(self, keep_trees: float | None = None, float32: bool = False):
+        # flattened copy of the forest (scaler folded in) for the sklearn-free live predictor
+        # keep_trees: share of the trees to keep, ranked on the held-out rows; float32: smaller arrays
+        from modules import fast_forest
+        arrays = fast_forest.export_forest(self.model, self.scaler)
+        forest = fast_forest.FlatForest(arrays)
+        x = self.x.to_numpy(dtype=float)
+        x_scaled = self.scaler.transform(self.x) if self.scaler is not None else x
+        expected = self.model.predict(x_scaled)
+        if not (np.array_equal(forest.predict(x), expected)
+                and np.allclose(forest.predict_proba(x), self.model.predict_proba(x_scaled))):
+            # a serving copy from an earlier save would be loaded instead of the pickle just written
+            shutil.rmtree(artifact_path(self.ticker), ignore_errors=True)
+            if os.path.exists(forest_path(self.ticker)):
+                os.remove(forest_path(self.ticker))
+            print("Flattened forest does not match the sklearn model, not exported.")
+            return
+
+        if keep_trees is not None:
+            split = len(x) - len(self._holdout()[1])
+            arrays = fast_forest.prune_forest(arrays, x[split:], self.y.to_numpy()[split:], keep_trees)
+        if float32:
+            arrays = fast_forest.to_float32(arrays)
+        agreement = 1.0
+        if keep_trees is not None or float32:
+            agreement = float((fast_forest.FlatForest(arrays).predict(x) == expected).mean())
+            print(f"Compacted forest: {len(arrays['roots'])} trees, agrees with the full model on {agreement:.1%} of rows")
+        save_artifact(self.ticker, arrays, self.label_maps, self.x.columns.tolist(), self.scaler,
+                      keep_trees=keep_trees, float32=float32, agreement=agreement)
 
     def load_model(self):
-        # load model and metadata from disk
-        with open(f"modules/data/models/{self.ticker}_model.pkl", "rb") as f:
-            bundle = pickle.load(f)
-        self.model = bundle["model"]
-        self.scaler = bundle["scaler"]
-        self.label_maps = bundle["label_maps"]
-        self.feature_order = bundle["columns"]
+        # load metadata from disk (the serving header when there is one); the pickled estimator and
+        # scaler, and sklearn with them, are only read when model/scaler are first used
+        self._bundle = ModelBundle.load(self.ticker)
+        self._model = self._scaler = None
+        self.label_maps = self._bundle.label_maps
+        self.feature_order = self._bundle.columns
 
     def _encode_labels(self):
         # manually encode specific categorical columns
+        from sklearn.preprocessing import LabelEncoder
         cat_cols = [
             "session", "trade_direction", "prev_result",
             "prev_direction", "day_type",
@@ -79,6 +204,8 @@ class Model:
     @staticmethod
     def _split_and_scale(x, y):
         # split into train/test, and normalize
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
         x_tr, x_te, y_tr, y_te = train_test_split(
             x, y, test_size=0.2, shuffle=False
         )
@@ -0,0 +1,143 @@
+# Many symbols in one process: one event loop, one data connection, one notifier and chart worker
+# at every bar close all symbols are fetched in one batch over a shared connection, then each symbol's
+# session state machine (LiveTrader.on_bar_close) runs as a task on a bounded thread pool
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from modules.base_bot import BaseBot
+from modules.candle import CandleSeries
+from modules.chart_worker import ChartRenderer
+from modules.collect_data import MT5DataFetcher
+from modules.data_source import DataSource, default_session
+from modules.live_trading import LiveTrader
+from modules.metrics import Metrics, metrics_path
+from modules.notifier import Notifier
+from modules.scheduler import BarEvent, BarScheduler
+
+
+# One symbol's part of the batch download: incremental fetch, only the recent tail stays in memory
+class FetcherFeed:
+
+    def __init__(self, ticker: str, keep: int = 500, broker_offset: timedelta | None = None,
+                 source: DataSource | None = None):
+        self.fetcher = MT5DataFetcher(ticker, broker_offset=broker_offset, source=source)
+        self.keep = keep  # bars kept after the first fetch (chart window + today's bars)
+        self.candles: CandleSeries | None = None
+        self.new_rows = 0
+
+    def advance(self, until=None) -> int:
+        # the source only has bars up to now (or its replay cursor), so `until` is ignored here
+        df = self.fetcher.get_data(incremental=True)
+        self.candles = CandleSeries.from_frame(df)  # the first one is the full history (seeds the indicators)
+        self.fetcher.trim(self.keep)
+        self.new_rows = self.fetcher.new_rows
+        return self.new_rows
+
+    def get_candles(self) -> CandleSeries:
+        return self.candles
+
+
+class Monitor:
+
+    def __init__(self, feeds: dict, scheduler: BarScheduler | None = None, bot: BaseBot | None = None,
+                 workers: int = 4, connection=None, metrics: Metrics | None = None, send_charts: bool = True):
+        # feeds: ticker -> feed with advance(until) / get_candles() / new_rows (FetcherFeed, ReplaySource)
+        self.scheduler = scheduler or BarScheduler()  # one clock for every symbol
+        self.metrics = metrics or Metrics(path=metrics_path("monitor"), labels={"ticker": "monitor"})
+        if bot is None:
+            from modules.bot import Bot  # telegram is only imported when the real bot is used
+            bot = Bot()
+        self.notifier = Notifier(bot, metrics=self.metrics, max_latency=self.scheduler.max_signal_latency)
+        self.charts = ChartRenderer(metrics=self.metrics)
+        self.feeds = feeds
+        self.connection = connection or contextlib.nullcontext  # wraps each batch fetch (DataSource.batch)
+        self.traders = {
+            ticker: LiveTrader(ticker, scheduler=self.scheduler, metrics=self.metrics, notifier=self.notifier,
+                               charts=self.charts, fetcher=feed)
+            for ticker, feed in feeds.items()
+        }
+        for trader in self.traders.values():
+            trader.send_charts = send_charts
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="symbol")  # bounded per-symbol work
+        self._io = ThreadPoolExecutor(1, thread_name_prefix="fetch")  # the MT5 API is not thread-safe
+
+    def load_models(self, models: dict | None = None):
+        # bundles from disk, or trained Model objects per ticker (replays, tests)
+        for ticker, trader in self.traders.items():
+            if models and ticker in models:
+                trader.use_model(models[ticker])
+            else:
+                trader.load_model()
+
+    def _fetch_all(self, until):
+        # one connection, every symbol's delta
+        with self.metrics.stage("fetch_batch"), self.connection():
+            for ticker, feed in self.feeds.items():
+                try:
+                    feed.advance(until)
+                except Exception as e:
+                    self.metrics.inc("fetch_errors")
+                    print(f"{ticker}: fetch failed: {e}")
+
+    def _step(self, trader: LiveTrader, event: BarEvent | None):
+        # one symbol at one bar close; a failing symbol never stops the others
+        try:
+            with self.metrics.stage("cycle"):
+                candles = trader.fetch_candles()
+                if event is not None:
+                    trader.on_bar_close(event, candles)
+        except Exception as e:
+            self.metrics.inc("symbol_errors")
+            print(f"{trader.ticker}: {type(e).__name__}: {e}")
+
+    async def _dispatch(self, until, event: BarEvent | None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._io, self._fetch_all, until)
+        ready = [t for t in self.traders.values() if t.fetcher.get_candles() is not None]
+        await asyncio.gather(*(loop.run_in_executor(self._pool, self._step, t, event) for t in ready))
+
+    async def seed(self):
+        # history and indicators for every symbol before the first bar close
+        await self._dispatch(self.scheduler.broker_now(), None)
+
+    async def on_bar_close(self, event: BarEvent):
+        await self._dispatch(event.bar_close, event)
+        self.metrics.inc("bars")
+        self.metrics.maybe_export()
+
+    async def process(self, events):
+        # a finite list of bar closes (replays, tests)
+        for event in events:
+            await self.on_bar_close(event)
+
+    async def run(self):
+        print(f"Starting live monitor for {len(self.traders)} symbols...")
+        self.load_models()
+        self.charts.start()  # pre-warm matplotlib before the first signal
+        await self.seed()
+        try:
+            async for event in self.scheduler.aevents():
+                print(event)
+                await self.on_bar_close(event)
+        finally:
+            self.close()
+
+    @property
+    def signals(self) -> list[dict]:
+        return [{"ticker": ticker, **s} for ticker, trader in self.traders.items() for s in trader.signals]
+
+    def close(self):
+        self._io.shutdown(wait=True)
+        self._pool.shutdown(wait=True)
+        self.notifier.close()
+        self.charts.close()
+
+
+def live_monitor(tickers: list[str], workers: int = 4, keep: int = 500, source: DataSource | None = None) -> Monitor:
+    # every ticker fetched over one source (the long-lived MT5 session by default), checked once per bar close
+    source = source or default_session()
+    scheduler = BarScheduler()
+    feeds = {ticker: FetcherFeed(ticker, keep, scheduler.broker_offset, source) for ticker in tickers}
+    return Monitor(feeds, scheduler=scheduler, workers=workers, connection=source.batch)
@@ -0,0 +1,177 @@
+# Non-blocking outbound notifications
+# the live loop only puts jobs on a bounded queue; one worker thread talks to the bot backend,
+# spacing sends out (rate limit), retrying failed ones and merging the chart and text of one signal
+import queue
+import threading
+import time
+
+from modules.base_bot import BaseBot
+from modules.metrics import NULL_METRICS
+
+
+# One outgoing post: text, photos or both (photos + text go out as a caption)
+class Notification:
+
+    def __init__(self, text=None, photos=None, key=None, bar_close: float | None = None):
+        self.text = text
+        self.photos = list(photos or [])
+        self.key = key  # jobs with the same key are merged while still waiting
+        self.bar_close = bar_close  # time.monotonic() of the bar close a signal is about (None = no bound)
+        self.started = False
+        self.created = time.monotonic()
+
+    def merge(self, text=None, photos=None):
+        if text:
+            self.text = f"{self.text}\n{text}" if self.text else text
+        self.photos.extend(photos or [])
+
+    def send(self, backend: BaseBot):
+        if not self.photos:
+            backend.send_message(self.text)
+        elif len(self.photos) == 1:
+            backend.send_photo(self.photos[0], caption=self.text)
+        else:
+            backend.send_album(self.photos, caption=self.text)
+
+
+class Notifier:
+
+    def __init__(self, backend: BaseBot, maxsize: int = 100, rate: float = 1.0, burst: int = 5,
+                 retries: int = 3, backoff: float = 1.0, metrics=NULL_METRICS, max_latency: float = 10.0):
+        self.backend = backend
+        self.metrics = metrics
+        self.max_latency = max_latency  # seconds from bar close to delivered signal before a warning
+        self.latencies: list[float] = []  # bar close -> signal delivered, seconds
+        self.rate = rate  # sends per second once the burst is used up
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff  # first retry delay in seconds, doubled each attempt
+        self.stats = {"queued": 0, "sent": 0, "coalesced": 0, "dropped": 0, "retried": 0, "failed": 0}
+
+        self._queue = queue.Queue(maxsize)
+        self._pending = {}  # key -> job that has not been picked up yet
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="notifier", daemon=True)
+        self._thread.start()
+
+    # ---- producer side: never waits on the network ----
+
+    def send_message(self, text: str, key=None, bar_close: float | None = None) -> bool:
+        return self.submit(text=text, key=key, bar_close=bar_close)
+
+    def send_photo(self, data, caption: str | None = None, key=None) -> bool:
+        # data: image bytes or a file path
+        return self.submit(text=caption, photos=[data], key=key)
+
+    def submit(self, text=None, photos=None, key=None, bar_close: float | None = None) -> bool:
+        # queue a post (or merge it into a waiting one with the same key); never blocks
+        with self._lock:
+            job = self._pending.get(key) if key is not None else None
+            if job is not None and not job.started:
+                job.merge(text, photos)
+                if bar_close is not None and job.bar_close is None:
+                    job.bar_close = bar_close
+                self.stats["coalesced"] += 1
+                self.metrics.inc("notify_coalesced")
+                return True
+            job = Notification(text, photos, key, bar_close)
+            if key is not None:
+                self._pending[key] = job
+        self._put(job)
+        return True
+
+    def _put(self, job: Notification):
+        # a full queue drops the oldest waiting post rather than blocking the caller
+        while True:
+            try:
+                self._queue.put_nowait(job)
+                self.stats["queued"] += 1
+                return
+            except queue.Full:
+                try:
+                    old = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                with self._lock:
+                    if self._pending.get(old.key) is old:
+                        del self._pending[old.key]
+                self.stats["dropped"] += 1
+                self.metrics.inc("notify_dropped")
+                self._queue.task_done()
+
+    # ---- worker side ----
+
+    def _take_token(self):
+        # token bucket: up to `burst` sends at once, then `rate` per second
+        while not self._stop.is_set():
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            time.sleep((1 - self._tokens) / self.rate)
+
+    def _deliver(self, job: Notification):
+        self.metrics.observe("notify_queue_wait", time.monotonic() - job.created)
+        for attempt in range(self.retries + 1):
+            self._take_token()
+            try:
+                with self.metrics.stage("telegram_send"):
+                    job.send(self.backend)
+                self.stats["sent"] += 1
+                if job.bar_close is not None:
+                    self._observe_latency(time.monotonic() - job.bar_close)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    self.stats["failed"] += 1
+                    self.metrics.inc("notify_failed")
+                    print("Notification failed:", e)
+                    return
+                self.stats["retried"] += 1
+                self.metrics.inc("notify_retried")
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _observe_latency(self, latency: float):
+        # bar close -> delivered, the bound the live loop is held to
+        self.latencies.append(latency)
+        self.metrics.observe("signal_latency", latency)
+        if latency > self.max_latency:
+            print(f"Signal latency {latency:.1f}s exceeded {self.max_latency:.1f}s")
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            with self._lock:
+                job.started = True
+                if self._pending.get(job.key) is job:
+                    del self._pending[job.key]
+            try:
+                self._deliver(job)
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        # wait until everything queued so far is sent (or given up on)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout: float | None = 5.0):
+        self.flush(timeout)
+        self._stop.set()
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return  # daemon worker, dies with the process
+        self._thread.join(timeout)
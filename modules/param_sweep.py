@@ -0,0 +1,152 @@
+# Parallel parameter sweep for the Asian range sweep strategy
+# price arrays are put into shared memory once; workers only receive small config dicts
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from modules import backtest
+from modules.candle import CandleSeries
+from modules.sessions import SESSION_HOURS
+
+# the values the strategy has used so far
+DEFAULT_PARAMS = {
+    "lookahead": 30,
+    "asia_hours": SESSION_HOURS["Asia"],
+    "london_hours": SESSION_HOURS["London"],
+    "tp1_frac": 0.5,
+    "one_trade_per_day": True,
+}
+
+# a reasonable space to start from
+DEFAULT_SPACE = {
+    "lookahead": [10, 20, 30, 45, 60],
+    "asia_hours": [(1, 9), (2, 9), (2, 8), (3, 9)],
+    "london_hours": [(10, 15), (10, 13), (10, 17)],
+    "tp1_frac": [0.3, 0.5, 0.7],
+    "one_trade_per_day": [True, False],
+}
+
+_FIELDS = ("index", "time", "open", "high", "low", "close")
+
+# per worker process: the shared candle arrays and relabelled copies per session window
+_worker_candles: CandleSeries | None = None
+_worker_shm: list = []
+_worker_relabelled: dict = {}
+
+
+def grid(space: dict) -> list[dict]:
+    # every combination of the given values
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_sample(space: dict, n: int, seed: int = 0) -> list[dict]:
+    # n distinct random combinations (fewer if the grid is smaller)
+    rng = random.Random(seed)
+    configs, seen = [], set()
+    total = int(np.prod([len(v) for v in space.values()]))
+    while len(configs) < min(n, total):
+        config = {k: rng.choice(v) for k, v in space.items()}
+        key = tuple(config.items())
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def _windows(params: dict) -> dict:
+    # Asia/London first so a widened window wins over the neighbouring session
+    windows = {"Asia": tuple(params["asia_hours"]), "London": tuple(params["london_hours"])}
+    windows.update({k: v for k, v in SESSION_HOURS.items() if k not in windows})
+    return windows
+
+
+def summarize(data: dict) -> dict:
+    # hit rates and R:R distribution of one backtest result
+    trades = len(data["index"])
+    row = {"trades": trades}
+    for col in ("tp1_hit", "tp2_hit", "sl_hit", "be_hit"):
+        row[col.replace("_hit", "_rate")] = float(np.mean(data[col])) if trades else np.nan
+    for col in ("rr_tp1", "rr_tp2"):
+        rr = np.asarray(data[col], dtype=np.float64)
+        q = np.percentile(rr, [10, 25, 50, 75, 90]) if trades else [np.nan] * 5
+        row[f"{col}_mean"] = float(rr.mean()) if trades else np.nan
+        for name, value in zip(("p10", "p25", "p50", "p75", "p90"), q):
+            row[f"{col}_{name}"] = float(value)
+    return row
+
+
+def evaluate(candles: CandleSeries, params: dict, relabelled: dict | None = None) -> dict:
+    # one backtest for one configuration
+    params = {**DEFAULT_PARAMS, **params}
+    windows = _windows(params)
+    key = tuple(windows.items())
+    if relabelled is not None and key in relabelled:
+        series = relabelled[key]
+    else:
+        series = candles.relabel(windows)
+        if relabelled is not None:
+            relabelled[key] = series
+    data = backtest.run_backtest(series, lookahead=int(params["lookahead"]), tp1_frac=float(params["tp1_frac"]),
+                                 one_trade_per_day=bool(params["one_trade_per_day"]))
+    return {**params, **summarize(data)}
+
+
+def _attach(specs: list, tz):
+    # worker initializer: map the parent's shared arrays, read-only
+    global _worker_candles
+    arrays = {}
+    for field, name, dtype, length in specs:
+        shm = shared_memory.SharedMemory(name=name)  # pool workers share the parent's resource tracker
+        _worker_shm.append(shm)
+        arr = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+        arr.flags.writeable = False
+        arrays[field] = arr
+    n = len(arrays["close"])
+    _worker_candles = CandleSeries(arrays["index"], arrays["time"], arrays["open"], arrays["high"],
+                                   arrays["low"], arrays["close"], np.zeros(n, dtype=np.int64),
+                                   np.zeros(n, dtype=np.int8), ["Other"], tz)
+
+
+def _run_chunk(configs: list) -> list:
+    return [evaluate(_worker_candles, config, _worker_relabelled) for config in configs]
+
+
+class SweepRunner:
+
+    def __init__(self, candles: CandleSeries, workers: int | None = None, chunk_size: int = 8):
+        self.candles = candles
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def run(self, configs: list[dict]) -> pd.DataFrame:
+        # evaluate every configuration and return one summary row each (in input order)
+        if self.workers <= 1 or len(configs) <= 1:
+            cache = {}
+            rows = [evaluate(self.candles, config, cache) for config in configs]
+            return pd.DataFrame(rows)
+
+        blocks, specs = [], []
+        try:
+            for field in _FIELDS:
+                arr = np.ascontiguousarray(getattr(self.candles, field))
+                if field == "time":
+                    arr = arr.astype("datetime64[ns]")
+                shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+                blocks.append(shm)
+                np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+                specs.append((field, shm.name, arr.dtype.str, len(arr)))
+
+            chunks = [configs[i:i + self.chunk_size] for i in range(0, len(configs), self.chunk_size)]
+            with ProcessPoolExecutor(self.workers, initializer=_attach, initargs=(specs, self.candles.tz)) as pool:
+                rows = [row for chunk in pool.map(_run_chunk, chunks) for row in chunk]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+        return pd.DataFrame(rows)
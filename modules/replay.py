@@ -0,0 +1,143 @@
+# Accelerated historical replay of the live decision path
+# stored candles are fed to LiveTrader bar by bar through a fake data source and a virtual clock,
+# every would-be signal is captured and compared with the rows AsianRange builds for the same days
+import contextlib
+import io
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules import backtest, indicators
+from modules.base_bot import LocalBot
+from modules.candle import CandleSeries
+from modules.metrics import Metrics
+from modules.scheduler import BarEvent, BarScheduler, FakeClock
+from modules.sessions import label_sessions
+
+
+# Stands in for MT5DataFetcher: hands out the stored candles up to the replay cursor
+class ReplaySource:
+
+    def __init__(self, candles: CandleSeries):
+        self.candles = candles
+        self.cursor = 0  # bars visible so far
+        self.new_rows = 0
+
+    def advance(self, until) -> int:
+        # make every bar that opened before `until` visible
+        cursor = int(np.searchsorted(self.candles.time, self.candles._to_naive(until), "left"))
+        self.new_rows = cursor - self.cursor
+        self.cursor = cursor
+        return self.new_rows
+
+    def get_candles(self) -> CandleSeries:
+        return self.candles[:self.cursor]  # zero-copy
+
+
+def bar_events(candles: CandleSeries, timeframe_minutes: int = 30, session_hours: dict | None = None) -> list[BarEvent]:
+    # every bar close between the first and last stored bar, like the live scheduler would see them
+    step = pd.Timedelta(minutes=timeframe_minutes)
+    opens = pd.date_range(pd.Timestamp(candles.time[0]), pd.Timestamp(candles.time[-1]), freq=step)
+    closes = opens + step
+    kwargs = {} if session_hours is None else {"windows": session_hours}
+    labels = label_sessions(pd.Series(opens.append(closes)), **kwargs).astype(str).to_numpy()
+    closed, upcoming = labels[:len(opens)], labels[len(opens):]
+    return [BarEvent(o, c, s, n) for o, c, s, n in
+            zip(opens.to_pydatetime(), closes.to_pydatetime(), closed, upcoming)]
+
+
+def encode_rows(rows: pd.DataFrame, label_maps: dict, columns: list) -> pd.DataFrame:
+    # backtest rows -> the raw feature vectors the live path builds (same label maps and column order)
+    encoded = rows.copy()
+    for col, mapping in label_maps.items():
+        if col in encoded.columns:
+            encoded[col] = encoded[col].map(lambda v: mapping.get(v, -1))
+    return encoded[columns]
+
+
+class Replay:
+
+    def __init__(self, trader, candles: CandleSeries, latency: float = 2.0, quiet: bool = True):
+        # trader: a LiveTrader with a model loaded (load_model() or use_model())
+        self.trader = trader
+        self.candles = candles
+        self.quiet = quiet  # swallow the per-bar prints of the live path
+        self.source = ReplaySource(candles)
+        self.clock = FakeClock(pd.Timestamp(candles.time[0]).to_pydatetime())
+        trader.fetcher = self.source
+        trader.scheduler = BarScheduler(clock=self.clock, latency_offset=latency,
+                                        broker_offset=trader.scheduler.broker_offset,
+                                        session_hours=trader.scheduler.session_hours)
+        trader.send_charts = False
+        self.stats = {}
+
+    def run(self) -> pd.DataFrame:
+        # replay every bar close; returns the captured signals
+        trader, scheduler = self.trader, self.trader.scheduler
+        events = bar_events(self.candles, session_hours=scheduler.session_hours)
+        trader.signals = []
+        out = io.StringIO() if self.quiet else None
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(out) if out is not None else contextlib.nullcontext():
+            for event in events:
+                self.clock.set(scheduler.to_utc(event.bar_close) + timedelta(seconds=scheduler.latency_offset))
+                self.source.advance(event.bar_close)
+                with trader.metrics.stage("cycle"):
+                    candles = trader.fetch_candles()
+                    trader.on_bar_close(event, candles)
+        elapsed = time.perf_counter() - t0
+        self.stats = {"events": len(events), "bars": len(self.candles), "signals": len(trader.signals),
+                      "seconds": elapsed, "bars_per_second": len(self.candles) / elapsed if elapsed else np.inf}
+        return self.signals()
+
+    def signals(self) -> pd.DataFrame:
+        return pd.DataFrame([{k: v for k, v in s.items() if k != "features"} for s in self.trader.signals])
+
+    def compare(self, rows: pd.DataFrame | None = None, tolerance: float = 1e-9) -> dict:
+        # live signals vs backtest rows of the same days: which days, which direction, which features differ
+        trader = self.trader
+        if rows is None:
+            values = indicators.compute_all(self.candles.high, self.candles.low, self.candles.close)
+            rows = backtest.to_frame(backtest.run_backtest(self.candles, values))
+        live = {pd.Timestamp(s["date"]).date(): s for s in trader.signals}
+        days = pd.DatetimeIndex(rows["date"]).date
+        bt = {d: i for i, d in enumerate(days)}
+
+        matched = sorted(set(live) & set(bt))
+        encoded = encode_rows(rows, trader.label_maps, trader.feature_order).to_numpy(dtype=np.float64)
+        live_x = np.array([live[d]["features"] for d in matched], dtype=np.float64).reshape(len(matched), -1)
+        bt_x = encoded[[bt[d] for d in matched]] if matched else np.empty((0, len(trader.feature_order)))
+        diff = np.abs(live_x - bt_x)
+        both_nan = np.isnan(live_x) & np.isnan(bt_x)
+        diff = np.where(both_nan, 0.0, np.where(np.isnan(diff), np.inf, diff))  # NaN on one side only = mismatch
+        per_feature = pd.DataFrame({
+            "feature": trader.feature_order,
+            "mismatches": (diff > tolerance).sum(axis=0) if matched else 0,
+            "max_abs_diff": diff.max(axis=0) if matched else 0.0,
+        })
+        same_entry = [pd.Timestamp(live[d]["date"]) == pd.Timestamp(rows["date"].iloc[bt[d]]) for d in matched]
+        same_dir = [live[d]["direction"] == rows["trade_direction"].iloc[bt[d]] for d in matched]
+        return {
+            "live_signals": len(live),
+            "backtest_rows": len(bt),
+            "matched_days": len(matched),
+            "only_live": sorted(set(live) - set(bt)),
+            "only_backtest": sorted(set(bt) - set(live)),
+            "same_entry_bar": int(np.sum(same_entry)),
+            "same_direction": int(np.sum(same_dir)),
+            "features": per_feature,
+        }
+
+
+def replay_trader(ticker: str, model=None):
+    # LiveTrader wired for replay: local bot, in-memory metrics, no chart rendering
+    from modules.live_trading import LiveTrader
+    trader = LiveTrader(ticker, bot=LocalBot(), metrics=Metrics(path=None),
+                        fetcher=ReplaySource(None))  # no MT5 import; Replay hands in the real candles
+    if model is None:
+        trader.load_model()
+    else:
+        trader.use_model(model)
+    return trader
@@ -0,0 +1,147 @@
+# Wakes the live loop exactly at bar closes and turns session changes into explicit events
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from modules.sessions import SESSION_HOURS, broker_to_utc, label_sessions, utc_to_broker
+
+
+# Real wall clock (UTC)
+class SystemClock:
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    async def asleep(self, seconds: float):
+        # same for an event loop: other tasks keep running meanwhile
+        await asyncio.sleep(max(0.0, seconds))
+
+
+# Clock for tests and replays: sleeping just moves time forward
+class FakeClock:
+
+    def __init__(self, start: datetime):
+        self._now = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        self.sleeps: list[float] = []
+
+    def now(self) -> datetime:
+        return self._now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.advance(seconds)
+
+    async def asleep(self, seconds: float):
+        self.sleep(seconds)
+        await asyncio.sleep(0)
+
+    def advance(self, seconds: float):
+        self._now += timedelta(seconds=max(0.0, seconds))
+
+    def set(self, when: datetime):
+        # jump to an absolute time (naive = UTC), backwards too
+        self._now = when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+    def advance_to(self, when: datetime):
+        # move forward to `when`; a time already passed leaves the clock where it is
+        when = when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+        self._now = max(self._now, when)
+
+
+# What happened at one bar close (times are broker wall-clock, naive)
+class BarEvent:
+
+    def __init__(self, bar_open: datetime, bar_close: datetime, closed_session: str, next_session: str):
+        self.bar_open = bar_open
+        self.bar_close = bar_close
+        self.closed_session = closed_session
+        self.next_session = next_session
+        self.events = ["bar_close"]
+        if bar_open.date() != bar_close.date():
+            self.events.append("new_day")
+        if closed_session == "Asia" and next_session != "Asia":
+            self.events.append("asia_done")
+        if next_session == "London" and closed_session != "London":
+            self.events.append("london_open")
+        if closed_session == "London" and next_session != "London":
+            self.events.append("london_close")
+
+    @property
+    def day(self):
+        return self.bar_open.date()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.events
+
+    def __repr__(self):
+        return f"BarEvent({self.bar_open:%Y-%m-%d %H:%M} {self.closed_session} -> {self.next_session}, {self.events})"
+
+
+class BarScheduler:
+
+    def __init__(self, timeframe_minutes: int = 30, latency_offset: float = 2.0,
+                 broker_offset: timedelta | None = None, clock=None,
+                 session_hours: dict = SESSION_HOURS, max_signal_latency: float = 10.0):
+        self.timeframe = timedelta(minutes=timeframe_minutes)
+        self.latency_offset = latency_offset  # seconds to wait after the close for the broker to publish the bar
+        self.broker_offset = broker_offset  # fixed broker-minus-UTC offset; None = EET/EEST with EU DST
+        self.clock = clock or SystemClock()
+        self.session_hours = session_hours
+        self.max_signal_latency = max_signal_latency  # bar close -> alert delivered, checked by the Notifier
+
+    def broker_now(self) -> datetime:
+        return utc_to_broker(self.clock.now(), self.broker_offset)
+
+    def next_close(self, now: datetime | None = None) -> datetime:
+        # first bar boundary strictly after `now` (broker time)
+        now = now or self.broker_now()
+        epoch = datetime(1970, 1, 1)
+        bars = (now - epoch) // self.timeframe
+        return epoch + (bars + 1) * self.timeframe
+
+    def _sessions(self, *opens: datetime) -> list[str]:
+        labels = label_sessions(pd.Series(pd.to_datetime(list(opens))), self.session_hours)
+        return labels.astype(str).tolist()
+
+    def _upcoming(self) -> tuple[float, datetime]:
+        # seconds to sleep and the bar close we wake up for
+        close = self.next_close()
+        wake = close + timedelta(seconds=self.latency_offset)
+        return (wake - self.broker_now()).total_seconds(), close
+
+    def _event(self, close: datetime) -> BarEvent:
+        closed, upcoming = self._sessions(close - self.timeframe, close)
+        return BarEvent(close - self.timeframe, close, closed, upcoming)
+
+    def wait_next(self) -> BarEvent:
+        # sleep until the next bar close (+ latency offset) and describe it
+        delay, close = self._upcoming()
+        self.clock.sleep(delay)
+        return self._event(close)
+
+    async def wait_next_async(self) -> BarEvent:
+        # wait_next() without blocking the event loop
+        delay, close = self._upcoming()
+        await self.clock.asleep(delay)
+        return self._event(close)
+
+    def events(self):
+        while True:
+            yield self.wait_next()
+
+    async def aevents(self):
+        while True:
+            yield await self.wait_next_async()
+
+    def to_utc(self, broker_time: datetime) -> datetime:
+        return broker_to_utc(broker_time, self.broker_offset)
+
+    def since_close(self, event: BarEvent) -> float:
+        # seconds from the bar close to now
+        return (self.clock.now() - self.to_utc(event.bar_close)).total_seconds()
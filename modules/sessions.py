@@ -0,0 +1,144 @@
+# Trading session labels (Asia, Frankfurt, London, New-York, Other) for broker timestamps
+from datetime import datetime, timedelta, timezone
+from calendar import monthrange
+import numpy as np
+import pandas as pd
+
+# local (EU) hour windows [start, end) per session, checked in this order; anything else is "Other"
+SESSION_HOURS: dict[str, tuple[int, int]] = {
+    "Asia": (2, 9),
+    "Frankfurt": (9, 10),
+    "London": (10, 15),
+    "New-York": (15, 23),
+}
+OTHER = "Other"
+
+_HOUR_NS = 3_600_000_000_000
+
+
+def session_dtype(windows: dict = SESSION_HOURS) -> pd.CategoricalDtype:
+    return pd.CategoricalDtype(list(windows) + [OTHER])
+
+
+def _last_sunday(year: int, month: int) -> datetime:
+    # find last Sunday in given month (used for DST rules)
+    d = datetime(year, month, monthrange(year, month)[1])
+    while d.weekday() != 6:
+        d -= timedelta(days=1)
+    return d
+
+
+def _first_sunday(year: int, month: int) -> datetime:
+    # first Sunday of a month
+    d = datetime(year, month, 1)
+    while d.weekday() != 6:
+        d += timedelta(days=1)
+    return d
+
+
+def session_of(ts: pd.Timestamp) -> str:
+    # figure out what session a candle belongs to (Asia, London, etc)
+    year = ts.year
+    eu_dst_start = _last_sunday(year, 3)
+    eu_dst_end = _last_sunday(year, 10)
+    dt_broker = ts.replace(tzinfo=None)
+
+    # Adjust for local time based on DST
+    if eu_dst_start <= dt_broker < eu_dst_end:
+        local_time = dt_broker
+    else:
+        local_time = dt_broker - timedelta(hours=1)
+
+    h = local_time.hour
+    if 2 <= h < 9:
+        return "Asia"
+    if 9 <= h < 10:
+        return "Frankfurt"
+    if 10 <= h < 15:
+        return "London"
+    if 15 <= h < 23:
+        return "New-York"
+    return "Other"
+
+
+# broker server clock: EET/EEST, i.e. UTC+2 in winter and UTC+3 during EU summer time
+WINTER_OFFSET = timedelta(hours=2)
+SUMMER_OFFSET = timedelta(hours=3)
+
+
+def eu_summer_time(utc: datetime) -> bool:
+    # EU summer time runs from 01:00 UTC on the last Sunday of March to 01:00 UTC on the last Sunday of October
+    utc = utc.astimezone(timezone.utc).replace(tzinfo=None) if utc.tzinfo else utc
+    start = _last_sunday(utc.year, 3) + timedelta(hours=1)
+    end = _last_sunday(utc.year, 10) + timedelta(hours=1)
+    return start <= utc < end
+
+
+def broker_offset_at(utc: datetime, fixed: timedelta | None = None) -> timedelta:
+    # broker wall clock minus UTC at a given UTC instant; `fixed` overrides the DST rule
+    if fixed is not None:
+        return fixed
+    return SUMMER_OFFSET if eu_summer_time(utc) else WINTER_OFFSET
+
+
+def utc_to_broker(utc: datetime, fixed: timedelta | None = None) -> datetime:
+    # aware or naive UTC -> naive broker wall clock
+    utc = utc.astimezone(timezone.utc).replace(tzinfo=None) if utc.tzinfo else utc
+    return utc + broker_offset_at(utc, fixed)
+
+
+def broker_to_utc(broker: datetime, fixed: timedelta | None = None) -> datetime:
+    # naive broker wall clock -> aware UTC (the repeated hour in October resolves to summer time)
+    if fixed is not None:
+        return (broker - fixed).replace(tzinfo=timezone.utc)
+    utc = broker - SUMMER_OFFSET
+    if not eu_summer_time(utc):
+        utc = broker - WINTER_OFFSET
+    return utc.replace(tzinfo=timezone.utc)
+
+
+def dst_table(first_year: int, last_year: int) -> tuple[np.ndarray, np.ndarray]:
+    # EU DST start/end (last Sunday of March/October) per year, as int64 ns
+    starts, ends = [], []
+    for year in range(first_year, last_year + 1):
+        for month, out in ((3, starts), (10, ends)):
+            d = datetime(year, month, monthrange(year, month)[1])
+            d -= timedelta(days=(d.weekday() + 1) % 7)
+            out.append(np.datetime64(d, "ns").astype(np.int64))
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+def local_hours(dates) -> np.ndarray:
+    # broker wall-clock hour shifted to EU local time (one hour back outside DST)
+    dates = pd.Series(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    ns = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    if len(ns) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    years = dates.dt.year.to_numpy()
+    first_year = int(years.min())
+    starts, ends = dst_table(first_year, int(years.max()))
+    y = years - first_year
+    in_dst = (ns >= starts[y]) & (ns < ends[y])
+    local = ns - np.where(in_dst, 0, _HOUR_NS)
+    return (local // _HOUR_NS) % 24
+
+
+def label_sessions(dates, windows: dict = SESSION_HOURS) -> pd.Series:
+    # vectorized session_of() for a whole column; returns a categorical Series
+    index = dates.index if isinstance(dates, pd.Series) else None
+    h = local_hours(dates)
+    codes = np.full(len(h), len(windows), dtype=np.int8)  # "Other" by default
+    free = np.ones(len(h), dtype=bool)
+    for code, (start, end) in enumerate(windows.values()):
+        if start <= end:
+            hit = (h >= start) & (h < end)
+        else:  # window wraps around midnight
+            hit = (h >= start) | (h < end)
+        hit &= free
+        codes[hit] = code
+        free &= ~hit
+    labels = pd.Categorical.from_codes(codes, dtype=session_dtype(windows))
+    return pd.Series(labels, index=index, name="Session")
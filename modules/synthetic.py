@@ -0,0 +1,113 @@
+# Deterministic synthetic M30 FX candles for tests and benchmarks (no MT5 needed)
+# session-dependent volatility, weekend/holiday gaps and London sweeps of the Asian range
+import numpy as np
+import pandas as pd
+
+from modules.sessions import label_sessions
+
+# per-bar return volatility by session (fraction of price)
+SESSION_VOL = {"Asia": 0.00035, "Frankfurt": 0.0006, "London": 0.0008, "New-York": 0.0007, "Other": 0.0003}
+SESSION_VOLUME = {"Asia": 300, "Frankfurt": 700, "London": 1000, "New-York": 900, "Other": 150}
+HOLIDAYS = ((1, 1), (12, 25))  # (month, day) with no trading
+
+
+def trading_dates(years: float, start: str = "2005-01-03") -> pd.DatetimeIndex:
+    # weekday M30 bar opens (UTC) without Christmas and New Year
+    end = pd.Timestamp(start) + pd.DateOffset(days=int(round(years * 365.25)))
+    dates = pd.date_range(start, end, freq="30min", inclusive="left", tz="UTC")
+    holiday = np.zeros(len(dates), dtype=bool)
+    for month, day in HOLIDAYS:
+        holiday |= (dates.month == month) & (dates.day == day)
+    return dates[(dates.dayofweek < 5) & ~holiday]
+
+
+def _inject_sweeps(df: pd.DataFrame, rng: np.random.Generator, probability: float):
+    # on some days stretch one early London wick beyond the Asian high/low while the close stays inside
+    day = df["Date"].dt.floor("D")
+    asia = df["Session"] == "Asia"
+    ah = df["High"].where(asia).groupby(day).transform("max")
+    al = df["Low"].where(asia).groupby(day).transform("min")
+
+    london = df["Session"] == "London"
+    first_bars = london & (london.groupby(day).cumsum() <= 4)
+    inside = (df["Close"] < ah) & (df["Close"] > al)
+    candidates = np.flatnonzero((first_bars & inside).to_numpy())
+    if len(candidates) == 0:
+        return
+    # one random candidate bar per day, then keep a share of the days
+    order = rng.permutation(len(candidates))
+    picked = pd.Series(candidates[order]).groupby(day.to_numpy()[candidates[order]]).first().to_numpy()
+    picked = picked[rng.random(len(picked)) < probability]
+
+    rng_width = (ah - al).to_numpy()[picked]
+    excess = np.round(rng_width * rng.uniform(0.05, 0.4, len(picked)), 5)
+    up = rng.random(len(picked)) < 0.5
+    high, low = df["High"].to_numpy().copy(), df["Low"].to_numpy().copy()
+    high[picked[up]] = np.maximum(high[picked[up]], ah.to_numpy()[picked[up]] + excess[up])
+    low[picked[~up]] = np.minimum(low[picked[~up]], al.to_numpy()[picked[~up]] - excess[~up])
+    df["High"], df["Low"] = high, low
+
+
+def generate_candles(years: float = 1, seed: int = 0, start: str = "2005-01-03", price: float = 1.1,
+                     sweep_probability: float = 0.5, gap_vol: float = 0.002) -> pd.DataFrame:
+    # price DataFrame in the same layout as the MT5 CSVs (Index, Date, OHLCV, Session)
+    rng = np.random.default_rng(seed)
+    dates = trading_dates(years, start)
+    n = len(dates)
+    sessions = label_sessions(pd.Series(dates))
+    names = sessions.astype(str).to_numpy()
+    vol = pd.Series(names).map(SESSION_VOL).to_numpy()
+
+    # returns inside bars, plus a jump at the first bar after a weekend or holiday
+    ret = rng.standard_normal(n) * vol
+    gap = np.r_[False, np.diff(dates.asi8) > 30 * 60 * 10**9]
+    jump = np.where(gap, rng.standard_normal(n) * gap_vol, 0.0)
+    log_close = np.cumsum(jump + ret)
+    close = price * np.exp(log_close)
+    open_ = price * np.exp(log_close - ret)
+
+    wick = np.abs(rng.standard_normal((2, n))) * vol * 0.6 * price
+    df = pd.DataFrame({
+        "Index": np.arange(n),
+        "Date": dates,
+        "Open": np.round(open_, 5),
+        "High": np.round(np.maximum(open_, close) + wick[0], 5),
+        "Low": np.round(np.minimum(open_, close) - wick[1], 5),
+        "Close": np.round(close, 5),
+        "Volume": rng.poisson(pd.Series(names).map(SESSION_VOLUME).to_numpy()),
+        "Session": sessions.array,
+    })
+    _inject_sweeps(df, rng, sweep_probability)
+    return df
+
+
+def m1_from_m30(df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    # 30 M1 bars per M30 bar: a piecewise-linear path open -> high/low (random order and minutes) -> close,
+    # so the M1 bars aggregate back to exactly the given M30 bar
+    rng = np.random.default_rng(seed)
+    n = len(df)
+    o, h, l, c = (df[col].to_numpy(dtype=np.float64) for col in ("Open", "High", "Low", "Close"))
+    # knots 0..30 are the M1 opens/closes; the extremes sit on two distinct inner knots
+    first = rng.integers(1, 29, n)
+    second = first + rng.integers(1, 30 - first)
+    high_first = rng.random(n) < 0.5
+    pos = np.stack([np.zeros(n), first, second, np.full(n, 30)], axis=1)
+    val = np.stack([o, np.where(high_first, h, l), np.where(high_first, l, h), c], axis=1)
+
+    knots = np.arange(31)[None, :]
+    seg = np.clip((knots[:, :, None] >= pos[:, None, 1:3]).sum(axis=2), 0, 2)  # anchor segment of every knot
+    rows = np.arange(n)[:, None]
+    x0, x1 = pos[rows, seg], pos[rows, seg + 1]
+    y0, y1 = val[rows, seg], val[rows, seg + 1]
+    path = np.round(y0 + (y1 - y0) * (knots - x0) / (x1 - x0), 5)
+
+    start = df["Date"].to_numpy("datetime64[ns]")
+    dates = (start[:, None] + np.arange(30)[None, :] * np.timedelta64(1, "m")).ravel()
+    m1_open, m1_close = path[:, :-1], path[:, 1:]
+    return pd.DataFrame({
+        "Date": pd.DatetimeIndex(dates, tz="UTC"),
+        "Open": m1_open.ravel(),
+        "High": np.maximum(m1_open, m1_close).ravel(),
+        "Low": np.minimum(m1_open, m1_close).ravel(),
+        "Close": m1_close.ravel(),
+    })
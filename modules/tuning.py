@@ -0,0 +1,149 @@
+# Successive-halving hyperparameter search for the classifier on walk-forward folds
+# every configuration starts on the earliest (cheapest) fold; only the best 1/eta of them
+# get more folds. Workers receive the cached fold matrices once, trials only send params
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from modules import cross_validation
+from modules.param_sweep import grid, random_sample
+
+DEFAULT_SPACE = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 4, 8, 12, 16],
+    "min_samples_leaf": [1, 2, 5, 10, 20],
+    "max_features": ["sqrt", 0.5, 1.0],
+    "class_weight": [None, "balanced"],
+}
+
+# per worker process: the folds, sent once by the initializer
+_worker_folds: list = []
+
+
+def tuning_path(ticker: str) -> str:
+    return f"modules/data/models/{ticker}_tuning.json"
+
+
+def tuning_log_path(ticker: str) -> str:
+    return f"modules/data/models/{ticker}_tuning_log.csv"
+
+
+def load_params(ticker: str) -> dict:
+    # best estimator params saved by a previous search ({} when there is none)
+    path = tuning_path(ticker)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("best_params", {})
+
+
+def _attach(folds):
+    global _worker_folds
+    _worker_folds = folds
+
+
+def _trial(task):
+    # one configuration on one fold
+    config_id, params, fold_no, seed = task
+    estimator = RandomForestClassifier(random_state=seed, **params)
+    row = cross_validation.fit_fold(estimator, _worker_folds[fold_no])
+    return config_id, fold_no, row
+
+
+class SuccessiveHalving:
+
+    def __init__(self, folds: list, space: dict | None = None, n_configs: int = 27, eta: int = 3,
+                 metric: str = "f1", budget: float = 300.0, workers: int | None = None, seed: int = 0):
+        self.folds = folds
+        self.space = space or DEFAULT_SPACE
+        self.n_configs = n_configs
+        self.eta = eta  # keep the best 1/eta of the configurations per rung
+        self.metric = metric
+        self.budget = budget  # wall-clock seconds for the whole search
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.log: list[dict] = []
+        self.stopped_early = False
+        self.best_score = np.nan  # mean metric of the winner over the folds it was scored on
+        self.best_folds = 0  # number of folds behind best_score (0 = no rung finished)
+
+    def _rungs(self) -> list[int]:
+        # folds per rung: 1, eta, eta^2, ... capped at all folds
+        rungs, k = [], 1
+        while k < len(self.folds):
+            rungs.append(k)
+            k *= self.eta
+        return rungs + [len(self.folds)]
+
+    def run(self) -> tuple[dict, pd.DataFrame]:
+        # returns (best params, search log)
+        deadline = time.monotonic() + self.budget
+        configs = random_sample(self.space, self.n_configs, self.seed) if self.n_configs else grid(self.space)
+        alive = list(range(len(configs)))
+        scores: dict[tuple, float] = {}  # (config, fold) -> metric
+        best = (None, -np.inf, 0)  # config id, score, folds it was scored on
+
+        pool = ProcessPoolExecutor(self.workers, initializer=_attach, initargs=(self.folds,))
+        try:
+            for rung, n_folds in enumerate(self._rungs()):
+                tasks = [(c, configs[c], f, self.seed) for c in alive for f in range(n_folds) if (c, f) not in scores]
+                pending = {pool.submit(_trial, task) for task in tasks}
+                while pending:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        config_id, fold_no, row = future.result()
+                        value = row[self.metric]
+                        scores[(config_id, fold_no)] = 0.0 if np.isnan(value) else value
+                        self.log.append({"config": config_id, "rung": rung, **configs[config_id], **row})
+                if pending:
+                    self.stopped_early = True
+
+                # mean over the folds each configuration has finished in this rung
+                ranked = []
+                for c in alive:
+                    values = [scores[(c, f)] for f in range(n_folds) if (c, f) in scores]
+                    if len(values) == n_folds:
+                        ranked.append((float(np.mean(values)), c))
+                ranked.sort(reverse=True)
+                if ranked and (n_folds > best[2] or (n_folds == best[2] and ranked[0][0] > best[1])):
+                    best = (ranked[0][1], ranked[0][0], n_folds)
+                if self.stopped_early or n_folds == len(self.folds) or not ranked:
+                    break
+                alive = [c for _, c in ranked[:max(1, len(ranked) // self.eta)]]
+        finally:
+            if self.stopped_early:
+                # leaving a `with` block would wait for the running trials: drop the queue, stop the workers
+                workers = list((pool._processes or {}).values())
+                pool.shutdown(wait=False, cancel_futures=True)
+                for process in workers:
+                    process.terminate()
+            else:
+                pool.shutdown()
+
+        _, self.best_score, self.best_folds = best
+        params = configs[best[0]] if best[0] is not None else {}
+        return params, pd.DataFrame(self.log)
+
+
+def save_search(ticker: str, search: SuccessiveHalving, params: dict, log: pd.DataFrame, seconds: float):
+    # best config + summary as JSON, every trial as CSV, both next to the model bundle
+    if search.best_folds == 0:
+        # the budget ran out before any rung finished: keep the previous search's params
+        print("Search stopped before any configuration was scored on a full rung, nothing saved.")
+        return
+    os.makedirs("modules/data/models", exist_ok=True)
+    summary = {"best_params": params, "metric": search.metric, "trials": len(log), "seconds": round(seconds, 2),
+               "stopped_early": search.stopped_early,
+               "best_score": None if np.isinf(search.best_score) else float(search.best_score),
+               "best_folds": search.best_folds}
+    with open(tuning_path(ticker), "w") as f:
+        json.dump(summary, f, indent=1)
+    log.to_csv(tuning_log_path(ticker), index=False)
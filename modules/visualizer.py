@@ -1,41 +1,131 @@
 from pathlib import Path
 from datetime import datetime
+import io
+import threading
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from modules.candle import CandleSeries
+
+_BAR_DAYS = 30 / (24 * 60)  # one M30 bar in matplotlib date units
+_LEVEL_COLORS = {"asian_high": "blue", "asian_low": "blue", "entry": "black", "sl": "red", "tp1": "green", "tp2": "green"}
+
+
+# One figure + axes kept per process and reused for every chart (Agg canvas, no pyplot state)
+class _Template:
+
+    def __init__(self, figsize=(12, 6)):
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+        self.ax.grid(True)
+        self.artists = []
+        self.lock = threading.Lock()
+
+    def clear(self):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+
+    def add(self, artist):
+        self.ax.add_collection(artist, autolim=False)
+        self.artists.append(artist)
+
+
+_template: _Template | None = None
+
+
+def _get_template() -> _Template:
+    global _template
+    if _template is None:
+        _template = _Template()
+    return _template
+
+
+def asia_spans(x: np.ndarray, is_asia: np.ndarray) -> list[tuple[float, float]]:
+    # contiguous Asia bars merged into one (start, end) span each
+    if not is_asia.any():
+        return []
+    edges = np.diff(np.r_[0, is_asia.astype(np.int8), 0])
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return list(zip(x[starts], x[ends] + _BAR_DAYS))
+
 
 # Handles plotting of candlesticks with highlights
 class Visualizer:
 
-    def __init__(self, ticker):
+    def __init__(self, ticker, candles=None, window: int = 100):
         self.ticker = ticker
-        # load price data and cut down to 100 candles before 10:00
-        self.df = pd.read_csv(f"modules/data/price/{ticker}.csv", parse_dates=["Date"])
-        cutoff = pd.Timestamp("2025-05-01 10:00", tz="UTC")
-        self.df = self.df[self.df["Date"] <= cutoff].tail(100)
+        self.window = window
+        # candle window to draw (CandleSeries or price DataFrame); loaded from CSV on first plot if not given
+        if isinstance(candles, pd.DataFrame):
+            candles = CandleSeries.from_frame(candles)
+        self.candles = candles[-window:] if candles is not None else None
+        self.fig = None
 
-    def plot(self):
-        # basic candlestick drawing using matplotlib
-        df = self.df
-        fig, ax = plt.subplots(figsize=(12, 6))
+    def _load(self) -> CandleSeries:
+        if self.candles is None:
+            self.candles = CandleSeries.from_csv(f"modules/data/price/{self.ticker}.csv")[-self.window:]
+        return self.candles
 
-        for _, row in df.iterrows():
-            color = 'green' if row["Close"] >= row["Open"] else 'red'
-            ax.plot([row["Date"], row["Date"]], [row["Low"], row["High"]], color='black')
-            ax.plot([row["Date"], row["Date"]], [row["Open"], row["Close"]], color=color, linewidth=4)
+    def _draw(self, levels: dict | None = None) -> Figure:
+        # wicks, bodies, Asia spans and levels are one collection each
+        c = self._load()
+        t = _get_template()
+        t.clear()
+        ax = t.ax
+        x = mdates.date2num(pd.DatetimeIndex(c.time))
+
+        wicks = np.stack([np.c_[x, c.low], np.c_[x, c.high]], axis=1)
+        bodies = np.stack([np.c_[x, c.open], np.c_[x, c.close]], axis=1)
+        colors = np.where(c.close >= c.open, 'green', 'red')
+        t.add(LineCollection(wicks, colors='black', linewidths=1.5))
+        t.add(LineCollection(bodies, colors=colors, linewidths=4))
 
         # highlight Asian session candles
-        asia_df = df[df["Session"] == "Asia"]
-        for date in asia_df["Date"]:
-            ax.axvspan(date, date + pd.Timedelta(minutes=30), color='blue', alpha=0.1)
+        spans = asia_spans(x, c.session_mask("Asia"))
+        if spans:
+            polys = [[(a, 0), (b, 0), (b, 1), (a, 1)] for a, b in spans]  # y in axes units: full height
+            t.add(PolyCollection(polys, facecolors='blue', edgecolors='none', alpha=0.1,
+                                 transform=ax.get_xaxis_transform()))
+
+        # horizontal levels (Asian high/low, entry, SL, TP)
+        if len(x) and levels:
+            named = [(k, v) for k, v in levels.items() if v is not None]
+            segs = [[(x[0], v), (x[-1] + _BAR_DAYS, v)] for _, v in named]
+            cols = [_LEVEL_COLORS.get(k, 'gray') for k, _ in named]
+            t.add(LineCollection(segs, colors=cols, linewidths=1, linestyles='dashed'))
 
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+        if len(x):
+            prices = np.r_[c.low, c.high, [v for v in (levels or {}).values() if v is not None]]
+            pad = (prices.max() - prices.min()) * 0.05 or 1e-4
+            ax.set_xlim(x[0] - _BAR_DAYS, x[-1] + 2 * _BAR_DAYS)
+            ax.set_ylim(prices.min() - pad, prices.max() + pad)
         ax.set_title(f"{self.ticker}")
-        ax.grid(True)
-        self.fig = fig  # save fig for export
+        return t.fig
+
+    def plot(self, levels: dict | None = None):
+        # basic candlestick drawing (kept for callers that save to a file afterwards)
+        self.fig = self._draw(levels)
+
+    def render(self, levels: dict | None = None, dpi: int = 100) -> bytes:
+        # chart as PNG bytes, ready for Telegram; no file is written
+        t = _get_template()
+        with t.lock:
+            fig = self._draw(levels)
+            buf = io.BytesIO()
+            fig.savefig(buf, format="png", dpi=dpi)
+        return buf.getvalue()
 
     def save_plot(self) -> str:
         # save chart to file (for Telegram)
+        if self.fig is None:
+            self.plot()
         out_dir = Path("modules/data/photos")
         out_dir.mkdir(parents=True, exist_ok=True)
         out_path = out_dir / f"signal_{datetime.now():%Y%m%d_%H%M%S}.png"
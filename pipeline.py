@@ -0,0 +1,97 @@
+# fetch → features → train for a basket of symbols, one worker process per symbol
+import argparse
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+STAGES = ["fetch", "load", "features", "train"]
+
+
+def run_symbol(ticker: str, incremental: bool = False, source: str = "mt5") -> dict:
+    # run every stage for one symbol; a failure stops this symbol only
+    report = {"ticker": ticker, "status": "ok", "failed_stage": None, "error": None, "patterns": None}
+    stage = None
+    try:
+        stage = "setup"
+        from modules.candle import CandleSeries
+        from modules.asian_range_feature import AsianRange
+        from modules.model import Model
+        from modules.collect_data import MT5DataFetcher
+        from modules.data_source import open_source
+
+        stage = "fetch"
+        start = time.perf_counter()
+        MT5DataFetcher(ticker, source=open_source(source)).get_data(incremental=incremental)
+        report["fetch"] = time.perf_counter() - start
+
+        stage = "load"
+        start = time.perf_counter()
+        candles = CandleSeries.from_csv(f"modules/data/price/{ticker}.csv")
+        report["load"] = time.perf_counter() - start
+        report["candles"] = len(candles)
+
+        stage = "features"
+        start = time.perf_counter()
+        features = AsianRange(ticker, candles).get_features()
+        report["features"] = time.perf_counter() - start
+        report["patterns"] = len(features)
+
+        stage = "train"
+        start = time.perf_counter()
+        Model(ticker).train()
+        report["train"] = time.perf_counter() - start
+    except Exception as e:
+        report.update(status="failed", failed_stage=stage, error=f"{type(e).__name__}: {e}")
+        report["traceback"] = traceback.format_exc()
+    return report
+
+
+def run_pipeline(tickers: list[str], workers: int | None = None, incremental: bool = False,
+                 source: str = "mt5") -> pd.DataFrame:
+    # symbols run in parallel; results come back as one row per symbol
+    workers = workers or min(len(tickers), os.cpu_count() or 1)
+    reports = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(run_symbol, t, incremental, source): t for t in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:  # the worker itself died
+                report = {"ticker": ticker, "status": "failed", "failed_stage": "worker",
+                          "error": f"{type(e).__name__}: {e}"}
+            print(f"{ticker}: {report['status']}" + (f" ({report['error']})" if report.get("error") else ""))
+            reports.append(report)
+
+    table = pd.DataFrame(reports).set_index("ticker").reindex(tickers)
+    for stage in STAGES:
+        if stage not in table:
+            table[stage] = float("nan")
+    table["total"] = table[STAGES].sum(axis=1, min_count=1)
+    columns = ["status", *STAGES, "total", "candles", "patterns", "failed_stage", "error"]
+    return table[[c for c in columns if c in table]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train models for several symbols in parallel")
+    parser.add_argument("tickers", nargs="+", help="e.g. EURUSD GBPUSD USDJPY")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--incremental", action="store_true", help="only fetch bars newer than the stored CSV")
+    parser.add_argument("--source", default="mt5",
+                        help='"mt5", "synthetic[:years]" or a price file pattern like "backup/{symbol}.csv"')
+    args = parser.parse_args()
+
+    table = run_pipeline(args.tickers, args.workers, args.incremental, args.source)
+    with pd.option_context("display.float_format", "{:.2f}".format, "display.width", 160):
+        print("\nStage timings (seconds):")
+        print(table.drop(columns=["error"], errors="ignore"))
+
+    os.makedirs("modules/data", exist_ok=True)
+    table.to_csv("modules/data/pipeline_report.csv")
+
+
+if __name__ == "__main__":
+    main()
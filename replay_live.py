@@ -0,0 +1,33 @@
+# replay stored candles through the live decision path and compare with the training rows
+import argparse
+from modules.candle import CandleSeries
+from modules.replay import Replay, replay_trader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accelerated replay of LiveTrader over stored candles")
+    parser.add_argument("ticker", nargs="?", default="EURUSD")
+    parser.add_argument("--start", default=None, help="first day to replay (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="day after the last one to replay")
+    parser.add_argument("--verbose", action="store_true", help="show the live path's prints")
+    args = parser.parse_args()
+
+    candles = CandleSeries.from_csv(f"modules/data/price/{args.ticker}.csv").between(args.start, args.end)
+    trader = replay_trader(args.ticker)
+    replay = Replay(trader, candles, quiet=not args.verbose)
+    signals = replay.run()
+    stats = replay.stats
+    print(f"Replayed {stats['bars']} bars ({stats['events']} bar closes) in {stats['seconds']:.2f}s, "
+          f"{stats['signals']} signals")
+
+    report = replay.compare()
+    print(f"Backtest rows: {report['backtest_rows']}, matched days: {report['matched_days']}, "
+          f"same entry bar: {report['same_entry_bar']}, same direction: {report['same_direction']}")
+    print(f"Only live: {len(report['only_live'])}, only backtest: {len(report['only_backtest'])}")
+    print(report["features"].to_string(index=False))
+    print(trader.metrics.summary()["stages"])
+    signals.to_csv(f"modules/data/{args.ticker}_replay_signals.csv", index=False)
+
+
+if __name__ == "__main__":
+    main()
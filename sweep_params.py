@@ -0,0 +1,32 @@
+# run a parameter sweep of the Asian range strategy over stored price data
+import argparse
+import os
+import time
+from modules.candle import CandleSeries
+from modules.param_sweep import SweepRunner, DEFAULT_SPACE, grid, random_sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep for the Asian range sweep strategy")
+    parser.add_argument("ticker", nargs="?", default="EURUSD")
+    parser.add_argument("--samples", type=int, default=0, help="random configurations (0 = full grid)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    candles = CandleSeries.from_csv(f"modules/data/price/{args.ticker}.csv")
+    configs = random_sample(DEFAULT_SPACE, args.samples, args.seed) if args.samples else grid(DEFAULT_SPACE)
+    print(f"Candles loaded: {len(candles)}, configurations: {len(configs)}")
+
+    start = time.perf_counter()
+    summary = SweepRunner(candles, workers=args.workers).run(configs)
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s")
+
+    os.makedirs("modules/data/sweeps", exist_ok=True)
+    path = f"modules/data/sweeps/{args.ticker}_sweep.csv"
+    summary.sort_values("tp1_rate", ascending=False).to_csv(path, index=False)
+    print(f"Summary saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
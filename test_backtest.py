@@ -0,0 +1,164 @@
+import unittest
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.sessions import label_sessions
+
+
+def random_candles(n=6000, seed=3):
+    # weekday-only M30 random walk labelled with real sessions
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-03", periods=int(n * 1.5), freq="30min", tz="UTC")
+    dates = dates[dates.dayofweek < 5][:n]
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0007, n)), 5)
+    opens = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0, 0.0005, (2, n)))
+    df = pd.DataFrame({
+        "Date": dates, "Open": opens,
+        "High": np.round(np.maximum(opens, close) + wick[0], 5),
+        "Low": np.round(np.minimum(opens, close) - wick[1], 5),
+        "Close": close, "Volume": rng.integers(100, 1000, n),
+    })
+    df["Index"] = df.index
+    df["Session"] = label_sessions(df["Date"])
+    return CandleSeries.from_frame(df)
+
+
+COLUMNS = ["index", "date", "asian_high", "asian_low", "session", "trade_direction", "tp1_hit", "tp2_hit",
+           "sl_hit", "be_hit", "entry_price", "rr_tp1", "rr_tp2", "atr14", "ema20", "rsi14", "macd",
+           "prev_result", "prev_direction", "prev_traded", "day_type", "asia_vol", "london_vol"]
+
+
+def loop_backtest(ar: AsianRange) -> dict:
+    # the original per-candle simulation, the reference for the vectorized engine
+    candles, lookahead = ar.candles, ar.lookahead
+    data = {col: [] for col in COLUMNS}
+    traded_dates, prev_trade_info = set(), {}
+    asia_range = {}
+    n = len(candles)
+
+    for i in range(n):
+        candle = candles[i]
+        c_date = candle.date.date()
+        day_type = candle.date.strftime("%A")
+
+        if candle.session == "Asia" and (i == 0 or candles[i - 1].session != "Asia"):
+            asia_candles = []
+            j = i
+            while j < n and candles[j].session == "Asia":
+                asia_candles.append(candles[j])
+                j += 1
+            asia_high = max(c.high for c in asia_candles)
+            asia_low = min(c.low for c in asia_candles)
+            asia_range = {"high": asia_high, "low": asia_low, "vol": asia_high - asia_low}
+
+        if asia_range and candle.session == "London" and c_date not in traded_dates:
+            trade_dir = None
+            entry_price = None
+            sl = None
+
+            # detect sweep
+            if candle.high > asia_range["high"] > candle.close:
+                trade_dir = "Short"
+                entry_price = candle.close
+                sl = candle.high
+            elif candle.low < asia_range["low"] < candle.close:
+                trade_dir = "Long"
+                entry_price = candle.close
+                sl = candle.low
+
+            if trade_dir is None:
+                continue
+
+            tp1 = (asia_range["high"] + asia_range["low"]) / 2
+            tp2 = asia_range["low"] if trade_dir == "Short" else asia_range["high"]
+
+            rr_tp1 = rr_tp2 = 0
+            if entry_price != sl:
+                if trade_dir == "Long":
+                    rr_tp1 = round((tp1 - entry_price) / (entry_price - sl), 2)
+                    rr_tp2 = round((tp2 - entry_price) / (entry_price - sl), 2)
+                else:
+                    rr_tp1 = round((entry_price - tp1) / (sl - entry_price), 2)
+                    rr_tp2 = round((entry_price - tp2) / (sl - entry_price), 2)
+
+            tp1_hit = tp2_hit = sl_hit = be_hit = 0
+            active_sl = sl
+            london_high, london_low = candle.high, candle.low
+
+            # simulate future candles after entry
+            for j in range(i + 1, min(i + 1 + lookahead, n)):
+                f = candles[j]
+                london_high = max(london_high, f.high)
+                london_low = min(london_low, f.low)
+                if trade_dir == "Short":
+                    if f.high >= active_sl:
+                        be_hit = 1 if tp1_hit else 0
+                        sl_hit = 0 if tp1_hit else 1
+                        break
+                    if not tp1_hit and f.low <= tp1:
+                        tp1_hit = 1
+                        active_sl = entry_price
+                    if f.low <= tp2:
+                        tp2_hit = 1
+                        break
+                else:
+                    if f.low <= active_sl:
+                        be_hit = 1 if tp1_hit else 0
+                        sl_hit = 0 if tp1_hit else 1
+                        break
+                    if not tp1_hit and f.high >= tp1:
+                        tp1_hit = 1
+                        active_sl = entry_price
+                    if f.high >= tp2:
+                        tp2_hit = 1
+                        break
+
+            prev = prev_trade_info.get(c_date - timedelta(days=1), {})
+
+            if any((tp1_hit, tp2_hit, sl_hit, be_hit, entry_price)):
+                row = (candle.index, candle.date, asia_range["high"], asia_range["low"], candle.session, trade_dir,
+                       tp1_hit, tp2_hit, sl_hit, be_hit, entry_price, rr_tp1, rr_tp2, ar.atr[i], ar.ema20[i],
+                       ar.rsi14[i], ar.macd[i], prev.get("result", "None"), prev.get("direction", "None"),
+                       int(bool(prev)), day_type, asia_range["vol"], london_high - london_low)
+                for col, value in zip(COLUMNS, row):
+                    data[col].append(value)
+                traded_dates.add(c_date)
+                prev_trade_info[c_date] = {
+                    "result": "TP1" if tp1_hit else "TP2" if tp2_hit else "SL" if sl_hit else "BE",
+                    "direction": trade_dir
+                }
+    return data
+
+
+# The vectorized engine must produce the same rows as the original loop
+class TestBacktest(unittest.TestCase):
+
+    def assertSameRows(self, candles, lookahead):
+        new = AsianRange("TEST", candles, lookahead)
+        ref = loop_backtest(new)
+        new._run_backtest()
+        self.assertGreater(len(ref["index"]), 0)
+        pd.testing.assert_frame_equal(pd.DataFrame(ref), pd.DataFrame(new._data)[COLUMNS], check_dtype=False)
+
+    def test_matches_loop(self):
+        self.assertSameRows(random_candles(), 30)
+
+    def test_short_and_long_lookahead(self):
+        candles = random_candles(seed=11)
+        self.assertSameRows(candles, 4)
+        self.assertSameRows(candles, 90)
+
+    def test_zero_lookahead(self):
+        # no bars after entry: every trade is recorded with no outcome
+        candles = random_candles(seed=5)
+        self.assertSameRows(candles, 0)
+        data = AsianRange("TEST", candles, 0)._backtest_from(0)
+        for col in ("tp1_hit", "tp2_hit", "sl_hit", "be_hit"):
+            self.assertEqual(int(np.sum(data[col])), 0, col)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from modules.asian_range_feature import AsianRange
+from modules.bundle import ModelBundle, artifact_path
+from modules.candle import CandleSeries
+from modules.fast_forest import FlatForest
+from modules.model import Model
+from modules.synthetic import generate_candles
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# Serving-only bundle: loads without the training features and without sklearn
+class TestBundle(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        candles = CandleSeries.from_frame(generate_candles(2, seed=4))
+        ar = AsianRange("SYNTH", candles)
+        ar._run_backtest()
+        cls.rows = pd.DataFrame(ar._data)
+
+    def setUp(self):
+        # bundles are written relative to the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.model = Model("SYNTH", self.rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.model.train()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def test_predictions_match_model(self):
+        bundle = ModelBundle.load("SYNTH")
+        self.assertEqual(bundle.columns, self.model.x.columns.tolist())
+        x = self.model.x.to_numpy(dtype=float)
+        expected = self.model.model.predict(self.model.scaler.transform(self.model.x))
+        self.assertEqual([bundle.predict(row) for row in x[:20]], expected[:20].tolist())
+
+    def test_load_model_does_not_read_features(self):
+        model = Model("SYNTH")  # there is no features CSV in the temp dir
+        model.load_model()
+        self.assertEqual(model.feature_order, self.model.x.columns.tolist())
+        with self.assertRaises(FileNotFoundError):
+            model.x
+
+    def test_serving_path_skips_sklearn(self):
+        code = ("import sys\nfrom modules.bundle import ModelBundle\n"
+                f"b = ModelBundle.load('SYNTH')\nb.predict([0.0] * {len(self.model.x.columns)})\n"
+                "print('sklearn' in sys.modules)")
+        env = {**os.environ, "PYTHONPATH": ROOT}
+        out = subprocess.run([sys.executable, "-c", code], cwd=self.tmp, env=env, capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), "False", out.stderr)
+
+    def test_forest_is_memory_mapped(self):
+        bundle = ModelBundle.load("SYNTH")
+        self.assertIsInstance(bundle.forest.threshold, np.memmap)
+        self.assertFalse(bundle.forest.threshold.flags.writeable)
+
+    def test_schema_mismatch(self):
+        header = os.path.join(artifact_path("SYNTH"), "header.json")
+        with open(header) as f:
+            meta = json.load(f)
+        meta["schema_version"] = 0
+        with open(header, "w") as f:
+            json.dump(meta, f)
+        with self.assertRaises(ValueError):
+            ModelBundle.load("SYNTH")
+
+    def test_bundle_without_artifact_falls_back_to_pickle(self):
+        shutil.rmtree(artifact_path("SYNTH"))
+        bundle = ModelBundle.load("SYNTH")
+        self.assertEqual(bundle.label_maps, self.model.label_maps)
+        self.assertIsNotNone(bundle.estimator)
+        np.testing.assert_array_equal(bundle.scaler.mean_, self.model.scaler.mean_)
+
+    def test_parity_mismatch_drops_stale_artifact(self):
+        # a flattened forest that disagrees with the model must not leave the previous serving copy behind
+        self.assertTrue(os.path.exists(artifact_path("SYNTH")))
+        wrong = lambda forest, x: np.full(len(x), -1)
+        with mock.patch.object(FlatForest, "predict", wrong), contextlib.redirect_stdout(io.StringIO()):
+            self.model.save_model()
+        self.assertFalse(os.path.exists(artifact_path("SYNTH")))
+        bundle = ModelBundle.load("SYNTH")
+        self.assertIsNone(bundle.forest)
+        self.assertIsNotNone(bundle.estimator)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import pandas as pd
+from modules.candle import Candlestick, CandleSeries, CandleView
+from modules.synthetic import generate_candles
+
+
+# Columnar candles: zero-copy slices, row views and the conversions to and from frames / objects
+class TestCandleSeries(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_candles(0.1, seed=1)
+        cls.candles = CandleSeries.from_frame(cls.df)
+
+    def test_slice_shares_buffers(self):
+        part = self.candles[10:20]
+        self.assertIsInstance(part, CandleSeries)
+        self.assertEqual(len(part), 10)
+        self.assertTrue(np.shares_memory(part.close, self.candles.close))
+        self.assertEqual(part.session_names, self.candles.session_names)
+        self.assertEqual(part[0].index, self.candles[10].index)
+
+    def test_view_reads_the_row(self):
+        row = self.df.iloc[-1]
+        view = self.candles[-1]
+        self.assertIsInstance(view, CandleView)
+        self.assertEqual(view.date, row["Date"])
+        self.assertEqual((view.open, view.high, view.low, view.close), tuple(row[["Open", "High", "Low", "Close"]]))
+        self.assertEqual(view.session, row["Session"])
+        with self.assertRaises(IndexError):
+            self.candles[len(self.candles)]
+
+    def test_between_is_half_open(self):
+        start, end = self.df["Date"].iloc[5], self.df["Date"].iloc[15]
+        part = self.candles.between(start, end)
+        self.assertEqual(part.index.tolist(), list(range(5, 15)))
+        # naive bounds are read in the series' time zone
+        naive = self.candles.between(start.tz_localize(None), end.tz_localize(None))
+        self.assertEqual(naive.index.tolist(), part.index.tolist())
+        self.assertEqual(len(self.candles.between(end, start)), 0)
+        self.assertEqual(len(self.candles.between()), len(self.candles))
+
+    def test_day(self):
+        date = self.df["Date"].iloc[100]
+        expected = self.df[self.df["Date"].dt.date == date.date()]
+        self.assertEqual(self.candles.day(date.date()).index.tolist(), expected["Index"].tolist())
+
+    def test_frame_round_trip(self):
+        back = CandleSeries.from_frame(pd.DataFrame({
+            "Index": self.candles.index, "Date": self.candles.dates, "Open": self.candles.open,
+            "High": self.candles.high, "Low": self.candles.low, "Close": self.candles.close,
+            "Volume": self.candles.volume, "Session": self.candles.session,
+        }))
+        for field in ("index", "time", "open", "high", "low", "close", "volume", "session_codes"):
+            np.testing.assert_array_equal(getattr(back, field), getattr(self.candles, field), field)
+        self.assertEqual(back.session_names, self.candles.session_names)
+        self.assertEqual(back.tz, self.candles.tz)
+
+    def test_candles_round_trip(self):
+        objects = [Candlestick(c.index, c.date, c.open, c.high, c.low, c.close, c.volume, c.session)
+                   for c in self.candles[:200]]
+        back = CandleSeries.from_candles(objects)
+        np.testing.assert_array_equal(back.time, self.candles.time[:200])
+        np.testing.assert_array_equal(back.close, self.candles.close[:200])
+        self.assertEqual([c.session for c in back], [c.session for c in objects])
+
+    def test_unknown_session_raises(self):
+        c = self.candles[0]
+        objects = [Candlestick(c.index, c.date, c.open, c.high, c.low, c.close, c.volume, "Sydney")]
+        with self.assertRaisesRegex(ValueError, "Sydney"):
+            CandleSeries.from_candles(objects)
+
+
+if __name__ == "__main__":
+    unittest.main()
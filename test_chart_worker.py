@@ -0,0 +1,36 @@
+import unittest
+from modules.chart_worker import ChartRenderer
+from test_backtest import random_candles
+
+
+# Rendering process: PNG bytes back, timeouts restart the worker
+class TestChartWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.candles = random_candles(300)
+        self.renderer = ChartRenderer(timeout=30.0)
+        self.renderer.start()
+
+    def tearDown(self):
+        self.renderer.close()
+
+    def test_render_and_submit(self):
+        png = self.renderer.render("EURUSD", self.candles, {"asian_high": 1.1, "asian_low": 1.09})
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        received = []
+        self.renderer.submit("EURUSD", self.candles, on_done=received.append).result(30)
+        self.assertTrue(received[0].startswith(b"\x89PNG"))
+
+    def test_timeout_restarts_worker(self):
+        self.renderer.timeout = 1e-6
+        with self.assertRaises(TimeoutError):
+            self.renderer.render("EURUSD", self.candles)
+        self.assertFalse(self.renderer.alive)
+        self.renderer.timeout = 30.0
+        png = self.renderer.render("EURUSD", self.candles)
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertEqual(self.renderer.stats["restarts"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from modules.collect_data import MT5DataFetcher
+from modules.data_source import HistoricalSource
+from modules.synthetic import generate_candles
+
+
+# A stored frame whose bars can be revised between fetches
+class FrameSource(HistoricalSource):
+
+    def __init__(self, df: pd.DataFrame, until=None):
+        super().__init__(until)
+        self.df = df
+
+    def _load(self, symbol: str, minutes: int) -> pd.DataFrame:
+        return self.df.copy()
+
+    def revise(self, df: pd.DataFrame):
+        self.df = df
+        self._frames.clear()
+        self._times.clear()
+
+
+# Cutting the revised tail off a stored price CSV without reading the whole file
+class TestTruncateCsv(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_candles(0.05, seed=8)[["Date", "Open", "High", "Low", "Close", "Volume", "Index", "Session"]]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "prices.csv")
+
+    def write(self, df: pd.DataFrame, newline: bool = True):
+        df.to_csv(self.path, index=False)
+        if not newline:
+            with open(self.path, "r+b") as f:
+                f.truncate(f.seek(0, os.SEEK_END) - 1)
+
+    def read(self) -> pd.DataFrame:
+        return pd.read_csv(self.path, parse_dates=["Date"])
+
+    def assertTruncated(self, rows: int, chunk: int = 4096):
+        # cut at the open time of row `rows`, then append the dropped rows again
+        cutoff = self.df["Date"].iloc[rows]
+        MT5DataFetcher._truncate_csv(self.path, cutoff, chunk)
+        kept = self.read()
+        pd.testing.assert_frame_equal(kept, self.read_expected(rows), check_dtype=False)
+        self.df.iloc[rows:].to_csv(self.path, mode="a", header=False, index=False)
+        pd.testing.assert_frame_equal(self.read(), self.read_expected(len(self.df)), check_dtype=False)
+
+    def read_expected(self, rows: int) -> pd.DataFrame:
+        path = os.path.join(self.tmp.name, "expected.csv")
+        self.df.iloc[:rows].to_csv(path, index=False)
+        return pd.read_csv(path, parse_dates=["Date"])
+
+    def test_cutoff_in_first_chunk(self):
+        self.write(self.df)
+        self.assertTruncated(len(self.df) - 3)
+
+    def test_cutoff_across_chunk_doubling(self):
+        # each row is longer than the first chunk, so the window has to grow several times
+        self.write(self.df)
+        self.assertTruncated(len(self.df) - 40, chunk=64)
+
+    def test_cutoff_before_first_row(self):
+        self.write(self.df)
+        self.assertTruncated(0, chunk=64)
+
+    def test_header_only(self):
+        self.write(self.df.iloc[:0])
+        MT5DataFetcher._truncate_csv(self.path, self.df["Date"].iloc[0])
+        self.assertEqual(len(self.read()), 0)
+        self.assertEqual(self.read().columns.tolist(), self.df.columns.tolist())
+
+    def test_missing_trailing_newline(self):
+        self.write(self.df, newline=False)
+        self.assertTruncated(len(self.df) - 5)
+
+    def test_missing_trailing_newline_nothing_cut(self):
+        # cutoff after the last row: the row stays and the appended bars start on their own line
+        self.write(self.df.iloc[:-2], newline=False)
+        self.assertTruncated(len(self.df) - 2)
+
+
+# An incremental fetch must leave memory and the CSV exactly as a full fetch of the same source would
+class TestFetchDelta(unittest.TestCase):
+
+    def setUp(self):
+        # the fetcher writes relative to the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(os.chdir, self.cwd)
+
+    def fetcher(self, source) -> MT5DataFetcher:
+        return MT5DataFetcher("SYNTH", date_from=datetime(2005, 1, 1), source=source)
+
+    def test_delta_matches_full_fetch(self):
+        df = generate_candles(0.2, start="2005-01-03")[["Date", "Open", "High", "Low", "Close", "Volume"]]
+        source = FrameSource(df, until="2005-02-01")
+        fetcher = self.fetcher(source)
+        first = fetcher.get_data()
+        fetcher.trim(50)  # only the tail stays in memory
+
+        # the bar that was still forming at the first fetch closes differently, and a month of bars is added
+        revised = df.copy()
+        last = revised.index[revised["Date"] == first["Date"].iloc[-1]][0]
+        revised.loc[last, ["High", "Close"]] += 0.002
+        source.revise(revised)
+        source.until = "2005-03-01"
+        fetcher.get_data(incremental=True)
+        self.assertGreater(fetcher.new_rows, 2)
+
+        full = self.fetcher(FrameSource(revised, until="2005-03-01"))
+        full._fetch_data()
+        expected = full.df
+        # memory: the tail, Index continuing from the full history
+        tail = expected.iloc[-len(fetcher.df):].reset_index(drop=True)
+        pd.testing.assert_frame_equal(fetcher.df, tail, check_dtype=False)
+        np.testing.assert_array_equal(fetcher.df["Index"].to_numpy(), tail["Index"].to_numpy())
+        self.assertEqual(fetcher.df.loc[fetcher.df["Date"] == first["Date"].iloc[-1], "Close"].item(),
+                         revised.loc[last, "Close"])
+        # file: every bar once, the revised one replaced
+        full._save_to_csv("expected.csv")
+        pd.testing.assert_frame_equal(pd.read_csv(fetcher.path), pd.read_csv("expected.csv"))
+
+
+if __name__ == "__main__":
+    unittest.main()
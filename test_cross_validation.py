@@ -0,0 +1,62 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.cross_validation import build_folds, walk_forward_splits
+from modules.model import Model
+from modules.synthetic import generate_candles
+
+
+# Walk-forward folds and evaluation on the held-out rows
+class TestCrossValidation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        candles = CandleSeries.from_frame(generate_candles(3, seed=5))
+        ar = AsianRange("SYNTH", candles)
+        ar._run_backtest()
+        cls.rows = pd.DataFrame(ar._data)
+
+    def test_expanding_splits(self):
+        splits = walk_forward_splits(120, n_folds=5)
+        self.assertEqual(splits, [(20, 40), (40, 60), (60, 80), (80, 100), (100, 120)])
+        with self.assertRaises(ValueError):
+            walk_forward_splits(4, n_folds=5)
+
+    def test_scaler_fitted_on_train_rows_only(self):
+        x = np.arange(60, dtype=float).reshape(30, 2)
+        folds = build_folds(x, np.arange(30) % 2, n_folds=2)
+        for fold in folds:
+            np.testing.assert_allclose(fold.x_train.mean(axis=0), 0, atol=1e-12)
+            self.assertGreater(fold.x_test.mean(), 1.0)  # later rows sit above the training mean
+
+    def test_cross_validate_uses_cached_folds(self):
+        model = Model("SYNTH", self.rows)
+        model.model = RandomForestClassifier(n_estimators=10, random_state=0)
+        per_fold, summary = model.cross_validate(n_folds=3, workers=1)
+        self.assertEqual(len(per_fold), 3)
+        self.assertTrue((np.diff(per_fold["train_rows"]) > 0).all())
+        self.assertIs(model.folds(3), model.folds(3))
+        self.assertTrue(0 <= summary["f1_mean"] <= 1)
+
+    def test_evaluate_scores_held_out_rows(self):
+        model = Model("SYNTH", self.rows)
+        model.model = RandomForestClassifier(n_estimators=10, random_state=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.train(save=False)
+        report = model.evaluate()
+        support = int(report.split("macro avg")[1].split()[-1])
+        self.assertEqual(support, int(np.ceil(len(self.rows) * 0.2)))
+        # a loaded model (new scaler object) is scored on the same rows without refitting
+        scaler = model.scaler
+        model._holdout_cache = None
+        model.evaluate()
+        self.assertIs(model.scaler, scaler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from modules.collect_data import MT5DataFetcher
+from modules.data_source import FileSource, MT5Session, SyntheticSource, timeframe_code, timeframe_minutes
+from modules.synthetic import generate_candles
+
+
+# Stand-in for the MetaTrader5 package: counts handshakes, can drop the terminal connection
+class FakeMT5:
+
+    def __init__(self, df):
+        self.df = df
+        self.up = True
+        self.initialized = 0
+        self.requests = []
+
+    def initialize(self, **kwargs):
+        self.initialized += 1
+        self.up = True
+        return True
+
+    def shutdown(self):
+        pass
+
+    def last_error(self):
+        return (0, "ok")
+
+    def terminal_info(self):
+        return SimpleNamespace(connected=self.up)
+
+    def symbol_select(self, symbol, enable):
+        return True
+
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        self.requests.append((symbol, timeframe))
+        if not self.up:
+            return None
+        rows = self.df[(self.df["Date"] >= pd.Timestamp(date_from, tz="UTC")) &
+                       (self.df["Date"] <= pd.Timestamp(date_to, tz="UTC"))]
+        out = np.zeros(len(rows), dtype=[("time", "i8"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+                                         ("close", "f8"), ("tick_volume", "i8")])
+        out["time"] = rows["Date"].dt.tz_localize(None).to_numpy("datetime64[s]").astype(np.int64)
+        for src, dst in (("Open", "open"), ("High", "high"), ("Low", "low"), ("Close", "close"),
+                         ("Volume", "tick_volume")):
+            out[dst] = rows[src].to_numpy()
+        return out
+
+
+class TestDataSource(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_timeframe_codes(self):
+        for minutes, code in ((1, 1), (30, 30), (60, 0x4001), (240, 0x4004), (1440, 0x4018), (10080, 0x8001)):
+            self.assertEqual(timeframe_code(minutes), code)
+            self.assertEqual(timeframe_minutes(code), minutes)
+
+    def test_one_session_for_many_symbols_and_timeframes(self):
+        fake = FakeMT5(generate_candles(0.1))
+        session = MT5Session(module=fake)
+        for symbol, minutes in (("EURUSD", 30), ("GBPUSD", 30), ("EURUSD", 60)):
+            df = session.fetch(symbol, minutes, datetime(2005, 1, 1), datetime(2005, 2, 1))
+            self.assertGreater(len(df), 0)
+            self.assertEqual(list(df.columns), ["Date", "Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(fake.initialized, 1)
+        self.assertEqual(fake.requests[-1], ("EURUSD", 0x4001))
+
+    def test_reconnects_when_terminal_drops(self):
+        fake = FakeMT5(generate_candles(0.1))
+        session = MT5Session(module=fake, check_interval=0.0, backoff=0.0)
+        session.fetch("EURUSD", 30, datetime(2005, 1, 1), datetime(2005, 2, 1))
+        fake.up = False
+        df = session.fetch("EURUSD", 30, datetime(2005, 1, 1), datetime(2005, 2, 1))
+        self.assertIsNotNone(df)
+        self.assertEqual(session.stats["reconnects"], 1)
+        self.assertEqual(fake.initialized, 2)
+
+    def test_incremental_fetch_over_replay_cursor(self):
+        source = SyntheticSource(0.2, start="2005-01-03", until="2005-02-01")
+        fetcher = MT5DataFetcher("SYNTH", date_from=datetime(2005, 1, 1), source=source)
+        first = fetcher.get_data()
+        self.assertLess(first["Date"].iloc[-1], pd.Timestamp("2005-02-01", tz="UTC"))
+        source.until = "2005-03-01"
+        df = fetcher.get_data(incremental=True)
+
+        full = source.frame("SYNTH", 30)
+        full = full[full["Date"] < pd.Timestamp("2005-03-01", tz="UTC")]
+        np.testing.assert_array_equal(df["Close"].to_numpy(), full["Close"].to_numpy())
+        np.testing.assert_array_equal(df["Index"].to_numpy(), np.arange(len(df)))
+        stored = pd.read_csv(fetcher.path, parse_dates=["Date"])
+        self.assertEqual(len(stored), len(df))
+
+    def test_file_source(self):
+        frame = generate_candles(0.1)
+        os.makedirs("backup")
+        frame.to_csv("backup/SYNTH.csv", index=False)
+        source = FileSource("backup/{symbol}.csv")
+        df = source.fetch("SYNTH", 30, datetime(2005, 1, 10), datetime(2005, 1, 11))
+        expected = frame[(frame["Date"] >= pd.Timestamp("2005-01-10", tz="UTC")) &
+                         (frame["Date"] <= pd.Timestamp("2005-01-11", tz="UTC"))]
+        np.testing.assert_array_equal(df["High"].to_numpy(), expected["High"].to_numpy())
+        self.assertIsNone(source.fetch("SYNTH", 30, datetime(2006, 1, 1), datetime(2006, 2, 1)))
+        with self.assertRaises(ValueError):
+            source.fetch("SYNTH", 1, datetime(2005, 1, 10), datetime(2005, 1, 11))
+
+    def test_synthetic_symbols_and_timeframes(self):
+        source = SyntheticSource(0.1, start="2005-01-03")
+        a = source.frame("EURUSD", 30)
+        self.assertFalse(np.array_equal(a["Close"].to_numpy(), source.frame("GBPUSD", 30)["Close"].to_numpy()))
+        np.testing.assert_array_equal(a["Close"].to_numpy(),
+                                      SyntheticSource(0.1, start="2005-01-03").frame("EURUSD", 30)["Close"].to_numpy())
+        h1 = source.frame("EURUSD", 60)
+        self.assertAlmostEqual(h1["High"].max(), a["High"].max())
+        m1 = source.frame("EURUSD", 1)
+        self.assertEqual(len(m1), 30 * len(a))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from modules.candle import CandleSeries
+from modules.day_index import DayIndex
+from modules.synthetic import generate_candles
+
+
+# Day/session slices and cached Asian ranges match scanning the series
+class TestDayIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.candles = CandleSeries.from_frame(generate_candles(0.2, seed=3))
+        cls.dates = sorted(set(d.date() for d in cls.candles.dates))
+
+    def assertSameBars(self, a, b):
+        np.testing.assert_array_equal(a.time, b.time)
+        np.testing.assert_array_equal(a.close, b.close)
+
+    def check(self, index, candles, dates):
+        for date in dates:
+            day = candles.day(date)
+            self.assertSameBars(index.day(candles, date), day)
+            for name in ("Asia", "London"):
+                mask = day.session_mask(name)
+                self.assertSameBars(index.session(candles, date, name), day[mask.argmax():][:int(mask.sum())])
+            asia = day.session_mask("Asia")
+            expected = (day.high[asia].max(), day.low[asia].min()) if asia.any() else None
+            self.assertEqual(index.asian_range(date), expected)
+
+    def test_full_build(self):
+        index = DayIndex(self.candles)
+        self.assertEqual(len(index), len(self.dates))
+        self.check(index, self.candles, self.dates)
+
+    def test_missing_day(self):
+        index = DayIndex(self.candles)
+        saturday = next(d for d in self.dates if d.weekday() == 4) + np.timedelta64(1, "D").item()
+        self.assertEqual(len(index.day(self.candles, saturday)), 0)
+        self.assertIsNone(index.asian_range(saturday))
+
+    def test_extended_bar_by_bar(self):
+        # one new series per bar close (the last bar revised each time), as the live loop sees it
+        n = len(self.candles)
+        index = DayIndex(self.candles[:n - 200])
+        for end in range(n - 200, n + 1, 7):
+            series = self.candles[:end]
+            revised = CandleSeries(series.index, series.time, series.open, series.high,
+                                   series.low, series.close.copy(), series.volume,
+                                   series.session_codes, series.session_names, series.tz)
+            revised.close[-1] += 0.0001
+            index.update(revised)
+        self.check(index, revised, self.dates[-5:])
+        fresh = DayIndex(revised)
+        np.testing.assert_array_equal(index.bounds, fresh.bounds)
+        np.testing.assert_array_equal(index.asian_high, fresh.asian_high)
+
+    def test_trimmed_front(self):
+        # live feeds keep only a tail of the history; offsets follow the shifted series
+        n = len(self.candles)
+        index = DayIndex(self.candles[:n - 100])
+        tail = self.candles[n - 500:]
+        self.check(index, tail, self.dates[-5:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from modules.fast_forest import (export_forest, FlatForest, save_forest, load_forest, open_forest, prune_forest,
+                                 to_float32, tree_scores, write_arrays)
+
+
+# The flattened forest must give the same answers as sklearn on the training features
+class TestFastForest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 800
+        # mixed scales, like prices next to RSI and encoded categories
+        self.x = np.column_stack([
+            1.1 + rng.normal(0, 0.01, n), rng.uniform(0, 100, n),
+            rng.integers(0, 5, n), rng.normal(0, 0.0005, n),
+        ])
+        self.y = ((self.x[:, 1] > 50) ^ (self.x[:, 3] > 0) | (rng.random(n) < 0.2)).astype(int)
+        self.scaler = StandardScaler().fit(self.x)
+        self.model = RandomForestClassifier(n_estimators=40, random_state=0)
+        self.model.fit(self.scaler.transform(self.x), self.y)
+        self.forest = FlatForest(export_forest(self.model, self.scaler))
+
+    def test_batch_parity(self):
+        x_scaled = self.scaler.transform(self.x)
+        np.testing.assert_array_equal(self.forest.predict(self.x), self.model.predict(x_scaled))
+        np.testing.assert_allclose(self.forest.predict_proba(self.x), self.model.predict_proba(x_scaled))
+
+    def test_single_row(self):
+        row = self.x[17].tolist()
+        expected = self.model.predict(self.scaler.transform([row]))
+        np.testing.assert_array_equal(self.forest.predict(row), expected)
+
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), "forest.npz")
+        save_forest(export_forest(self.model, self.scaler), path)
+        loaded = load_forest(path)
+        np.testing.assert_array_equal(loaded.predict(self.x), self.forest.predict(self.x))
+
+    def test_memory_mapped_directory(self):
+        path = os.path.join(tempfile.mkdtemp(), "forest")
+        write_arrays(export_forest(self.model, self.scaler), path, {"note": "test"})
+        loaded = open_forest(path)
+        self.assertIsInstance(loaded.feature, np.memmap)
+        np.testing.assert_array_equal(loaded.predict(self.x), self.forest.predict(self.x))
+
+    def test_open_forest_survives_resave(self):
+        path = os.path.join(tempfile.mkdtemp(), "forest")
+        arrays = export_forest(self.model, self.scaler)
+        write_arrays(arrays, path)
+        old = open_forest(path)
+        expected = old.predict(self.x)
+        smaller = prune_forest(arrays, self.x[600:], self.y[600:], keep=0.25)
+        write_arrays(smaller, path)  # a retrain writes a smaller forest while the old one is mapped
+        for name in ("feature", "threshold", "left", "right", "value", "missing_left"):
+            getattr(old, name).sum()  # touch every page of the old map
+        np.testing.assert_array_equal(old.predict(self.x), expected)
+        self.assertEqual(open_forest(path).n_trees, 10)
+        self.assertEqual(len([f for f in os.listdir(path) if f.endswith(".npy")]), len(smaller))
+
+    def test_pruning_keeps_best_trees(self):
+        arrays = export_forest(self.model, self.scaler)
+        x_val, y_val = self.x[600:], self.y[600:]
+        pruned = prune_forest(arrays, x_val, y_val, keep=0.25)
+        self.assertEqual(len(pruned["roots"]), 10)
+        scores = tree_scores(arrays, x_val, y_val)
+        kept = np.sort(tree_scores(pruned, x_val, y_val))
+        np.testing.assert_allclose(kept, np.sort(scores)[-10:])
+        # every kept tree still answers exactly like its sklearn original
+        best = np.sort(np.argsort(-scores, kind="stable")[:10])
+        x_scaled = self.scaler.transform(self.x)
+        expected = np.mean([self.model.estimators_[t].predict_proba(x_scaled) for t in best], axis=0)
+        np.testing.assert_allclose(FlatForest(pruned).predict_proba(self.x), expected)
+
+    def test_float32_is_smaller_and_close(self):
+        arrays = export_forest(self.model, self.scaler)
+        small = to_float32(arrays)
+        self.assertEqual(small["threshold"].nbytes * 2, arrays["threshold"].nbytes)
+        agreement = (FlatForest(small).predict(self.x) == self.forest.predict(self.x)).mean()
+        self.assertGreater(agreement, 0.99)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from modules import backtest, feature_store
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.feature_store import FeatureStore, relink_previous
+from modules.intrabar import IntrabarStore
+from modules.synthetic import generate_candles, m1_from_m30
+
+
+def full_rows(candles: CandleSeries, intrabar: IntrabarStore | None = None) -> pd.DataFrame:
+    # what a run without the cache produces
+    ar = AsianRange("SYNTH", candles, intrabar=intrabar)
+    return relink_previous(backtest.to_frame(ar._backtest_from(0)))
+
+
+# Cached feature rows: hits, incremental extension, invalidation and eviction
+class TestFeatureStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_candles(1, seed=6)
+        cls.candles = CandleSeries.from_frame(cls.df)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def store(self, **kwargs) -> FeatureStore:
+        return FeatureStore("SYNTH", {"lookahead": 30}, root=self.tmp.name, **kwargs)
+
+    def get(self, store: FeatureStore, candles: CandleSeries, intrabar: IntrabarStore | None = None) -> pd.DataFrame:
+        ar = AsianRange("SYNTH", candles, intrabar=intrabar)
+        return store.get(candles, ar._backtest_from)
+
+    def test_hit(self):
+        store = self.store()
+        first = self.get(store, self.candles)
+        self.assertEqual(store.stats["mode"], "miss")
+        again = self.get(self.store(), self.candles)
+        pd.testing.assert_frame_equal(again, first)
+        pd.testing.assert_frame_equal(first, full_rows(self.candles))
+
+    def test_extension_equals_full_recompute(self):
+        store = self.store()
+        for end in (len(self.candles) - 900, len(self.candles) - 300, len(self.candles)):
+            rows = self.get(store, self.candles[:end])
+        self.assertEqual(store.stats["mode"], "extend")
+        self.assertGreater(store.stats["start_bar"], 0)
+        pd.testing.assert_frame_equal(rows, full_rows(self.candles))
+
+    def test_revised_bars_invalidate(self):
+        store = self.store()
+        self.get(store, self.candles[:-300])
+        revised = self.df.copy()
+        revised.loc[len(revised) // 2, ["High", "Close"]] += 0.01  # a bar in the cached part changed
+        candles = CandleSeries.from_frame(revised)
+        rows = self.get(store, candles)
+        self.assertEqual(store.stats["mode"], "miss")
+        pd.testing.assert_frame_equal(rows, full_rows(candles))
+
+    def test_eviction(self):
+        store = self.store(max_entries=2)
+        for end in (1000, 2000, 3000):
+            self.get(store, self.candles[:end])
+        entries = store._load_index()
+        self.assertEqual([e["bars"] for e in entries], [2000, 3000])
+        self.assertEqual(sorted(os.listdir(store.dir)), sorted([f"{e['key']}.pkl" for e in entries] + ["index.json"]))
+
+    def test_rows_version_in_key(self):
+        old = self.store().dir
+        with mock.patch.object(feature_store, "ROWS_VERSION", feature_store.ROWS_VERSION + 1):
+            self.assertNotEqual(self.store().dir, old)
+
+    def test_m1_revision_invalidates(self):
+        m1 = m1_from_m30(self.df, seed=6)
+        path = os.path.join(self.tmp.name, "m1")
+        intrabar = IntrabarStore(path)
+        intrabar.write(m1)
+        store = self.store(intrabar=intrabar)
+        self.get(store, self.candles, intrabar)
+        self.get(store, self.candles, intrabar)
+        self.assertEqual(store.stats["mode"], "hit")
+
+        m1.loc[len(m1) // 2, "High"] += 0.01
+        intrabar.write(m1)
+        rows = self.get(store, self.candles, intrabar)
+        self.assertEqual(store.stats["mode"], "miss")
+        pd.testing.assert_frame_equal(rows, full_rows(self.candles, IntrabarStore(path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+from modules import indicators
+from modules.indicators import IndicatorState
+
+
+def reference_loops(high, low, close) -> dict[str, np.ndarray]:
+    # the per-candle loops AsianRange used before modules.indicators, on plain lists
+    n = len(close)
+
+    def ema(period):
+        out, k = [None] * n, 2 / (period + 1)
+        for i in range(period, n):
+            if i == period:
+                out[i] = sum(close[i - period:i]) / period
+            else:
+                out[i] = close[i] * k + out[i - 1] * (1 - k)
+        return [round(v, 5) if v else None for v in out]
+
+    atr, rsi, tr, gains, losses = [None] * n, [None] * n, [], [], []
+    for i in range(1, n):
+        tr.append(max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])))
+        delta = close[i] - close[i - 1]
+        gains.append(max(0, delta))
+        losses.append(max(0, -delta))
+        if i >= 14:
+            atr[i] = round(sum(tr[-14:]) / 14, 5)
+            avg_gain, avg_loss = sum(gains[-14:]) / 14, sum(losses[-14:]) / 14
+            rs = avg_gain / avg_loss if avg_loss != 0 else 0
+            rsi[i] = round(100 - (100 / (1 + rs)), 2)
+    ema12, ema26 = ema(12), ema(26)
+    macd = [round(a - b, 5) if a and b else None for a, b in zip(ema12, ema26)]
+    as_array = lambda values: np.array([np.nan if v is None else v for v in values])
+    return {"atr14": as_array(atr), "ema20": as_array(ema(20)), "rsi14": as_array(rsi), "macd": as_array(macd)}
+
+
+def random_bars(seed: int, n: int = 2000):
+    rng = np.random.default_rng(seed)
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0007, n)), 5)
+    close[300:330] = close[300]  # flat stretch: no gains, no losses
+    opens = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0, 0.0004, (2, n)))
+    high = np.round(np.maximum(opens, close) + wick[0], 5)
+    low = np.round(np.minimum(opens, close) - wick[1], 5)
+    return high, low, close
+
+
+# The vectorized functions against the loops they replaced
+class TestAgainstLoops(unittest.TestCase):
+
+    def test_matches_reference_loops(self):
+        # same warm-up NaNs everywhere; values equal up to one unit of the last decimal on rounding ties
+        unit = {"atr14": 1e-5, "ema20": 1e-5, "rsi14": 1e-2, "macd": 1e-5}
+        differing = total = 0
+        for seed in range(8):
+            high, low, close = random_bars(seed)
+            ref = reference_loops(high.tolist(), low.tolist(), close.tolist())
+            got = indicators.compute_all(high, low, close)
+            for name, expected in ref.items():
+                np.testing.assert_array_equal(np.isnan(got[name]), np.isnan(expected), f"{name} seed {seed}")
+                present = ~np.isnan(expected)
+                diff = np.abs(got[name][present] - expected[present])
+                self.assertLessEqual(diff.max(), unit[name] * 1.001, f"{name} seed {seed}")
+                differing += int((diff > 0).sum())
+                total += int(present.sum())
+        self.assertLess(differing, total / 1000)
+
+
+# Checks that the streaming indicator state matches the vectorized functions
+class TestIndicatorState(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 600
+        self.close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0007, n)), 5)
+        opens = np.r_[self.close[0], self.close[:-1]]
+        wick = np.abs(rng.normal(0, 0.0004, (2, n)))
+        self.high = np.round(np.maximum(opens, self.close) + wick[0], 5)
+        self.low = np.round(np.minimum(opens, self.close) - wick[1], 5)
+        self.batch = indicators.compute_all(self.high, self.low, self.close)
+
+    def assertMatchesBatch(self, values, i):
+        for name, arr in self.batch.items():
+            if np.isnan(arr[i]):
+                self.assertTrue(np.isnan(values[name]), f"{name} at {i}")
+            else:
+                self.assertAlmostEqual(values[name], arr[i], places=9, msg=f"{name} at {i}")
+
+    def test_update_matches_batch(self):
+        state = IndicatorState()
+        for i in range(len(self.close)):
+            state.update(self.high[i], self.low[i], self.close[i])
+            self.assertMatchesBatch(state.values(), i)
+
+    def test_seed_then_update(self):
+        state = IndicatorState.from_arrays(self.high[:400], self.low[:400], self.close[:400])
+        self.assertMatchesBatch(state.values(), 399)
+        for i in range(400, len(self.close)):
+            state.update(self.high[i], self.low[i], self.close[i])
+        self.assertMatchesBatch(state.values(), len(self.close) - 1)
+
+    def test_preview_and_snapshot(self):
+        state = IndicatorState.from_arrays(self.high[:500], self.low[:500], self.close[:500])
+        before = state.values()
+        preview = state.preview(self.high[500], self.low[500], self.close[500])
+        self.assertEqual(state.values(), before)  # preview must not change the state
+        self.assertMatchesBatch(preview, 500)
+
+        restored = IndicatorState.restore(state.snapshot())
+        restored.update(self.high[500], self.low[500], self.close[500])
+        self.assertEqual(restored.values(), preview)
+
+    def test_keys_follow_periods(self):
+        state = IndicatorState.from_arrays(self.high, self.low, self.close, atr_period=10, rsi_period=7,
+                                           ema_periods=(50, 5, 35))
+        values = state.values()
+        self.assertEqual(list(values), ["atr10", "ema50", "rsi7", "macd"])
+        self.assertAlmostEqual(values["atr10"], indicators.atr(self.high, self.low, self.close, 10)[-1], places=9)
+        self.assertAlmostEqual(values["ema50"], indicators.ema(self.close, 50)[-1], places=9)
+        self.assertAlmostEqual(values["rsi7"], indicators.rsi(self.close, 7)[-1], places=9)
+        self.assertAlmostEqual(values["macd"], indicators.macd(self.close, 5, 35)[-1], places=9)
+        self.assertEqual(list(IndicatorState(ema_periods=(20,)).values()), ["atr14", "ema20", "rsi14"])
+
+
+if __name__ == '__main__':
+    unittest.main()
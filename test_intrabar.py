@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules import backtest
+from modules.candle import CandleSeries
+from modules.intrabar import IntrabarResolver, IntrabarStore, compare
+from modules.synthetic import generate_candles, m1_from_m30
+
+
+# M1 resolution only changes the bars that touched SL and TP1 together
+class TestIntrabar(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        df = generate_candles(2, seed=4)
+        cls.candles = CandleSeries.from_frame(df)
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.store = IntrabarStore(cls.tmp.name)
+        cls.store.write(m1_from_m30(df, seed=4))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_columns_are_memory_mapped(self):
+        self.assertIsInstance(IntrabarStore(self.tmp.name).column("high"), np.memmap)
+
+    def test_only_ambiguous_sl_rows_change(self):
+        plain = backtest.run_backtest(self.candles)
+        resolver = IntrabarResolver(self.store, self.candles)
+        resolved = backtest.run_backtest(self.candles, resolver=resolver)
+        changed = plain["sl_hit"] != resolved["sl_hit"]
+        self.assertGreater(resolver.stats["ambiguous"], 0)
+        self.assertEqual(changed.sum(), resolver.stats["tp1_first"])
+        self.assertTrue((plain["sl_hit"][changed] == 1).all())
+        self.assertTrue((resolved["tp1_hit"][changed] == 1).all())
+        self.assertTrue((plain["tp1_hit"][~changed] == resolved["tp1_hit"][~changed]).all())
+        self.assertEqual(resolver.stats["m1_rows_read"], 30 * resolver.stats["ambiguous"])
+
+    def test_missing_m1_keeps_m30_labels(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            empty = IntrabarStore(tmp)
+            empty.write(m1_from_m30(generate_candles(0.01, seed=4, start="1990-01-01")))
+            resolved = backtest.run_backtest(self.candles, resolver=IntrabarResolver(empty, self.candles))
+        plain = backtest.run_backtest(self.candles)
+        for col in ("tp1_hit", "tp2_hit", "sl_hit", "be_hit"):
+            np.testing.assert_array_equal(plain[col], resolved[col])
+
+    def test_compare_report(self):
+        report = compare(self.candles, self.store).set_index("metric")
+        self.assertIn("runtime ms", report.index)
+        self.assertGreater(report.loc["tp1_hit rate", "m1_resolved"], report.loc["tp1_hit rate", "m30"])
+
+    def test_fingerprint_reads_only_the_tail(self):
+        m1 = m1_from_m30(generate_candles(0.02, seed=4), seed=4)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = IntrabarStore(tmp)
+            store.write(m1, block_rows=1000)
+            full, prefix = store.fingerprint(), store.fingerprint(2500)
+            self.assertNotEqual(full, prefix)
+
+            # rows inside a digested block are never read again: an edit behind the store's back goes unseen
+            high = np.load(os.path.join(tmp, "high.npy"))
+            high[10] += 1.0
+            np.save(os.path.join(tmp, "high.npy"), high)
+            self.assertEqual(IntrabarStore(tmp).fingerprint(2500), prefix)
+
+            # rewriting through the store updates the digests; the prefix before the edit keeps its value
+            revised = m1.copy()
+            revised.loc[2200, "High"] += 0.01
+            store.write(revised, block_rows=1000)
+            self.assertEqual(store.fingerprint(2200), self._written(m1).fingerprint(2200))
+            self.assertNotEqual(store.fingerprint(2500), prefix)
+            self.assertNotEqual(store.fingerprint(), full)
+
+            # appended rows leave the fingerprint of the old rows alone
+            self.assertEqual(self._written(m1.iloc[:3000]).fingerprint(2500), prefix)
+
+    def _written(self, m1) -> IntrabarStore:
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        store = IntrabarStore(tmp)
+        store.write(m1, block_rows=1000)
+        return store
+
+
+if __name__ == '__main__':
+    unittest.main()
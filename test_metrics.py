@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from modules.metrics import Histogram, Metrics
+
+
+# Stage timings, histograms and exports
+class TestMetrics(unittest.TestCase):
+
+    def test_stage_records_duration_and_errors(self):
+        metrics = Metrics()
+        with metrics.stage("fetch"):
+            time.sleep(0.002)
+        with self.assertRaises(ValueError):
+            with metrics.stage("fetch"):
+                raise ValueError("broker down")
+        summary = metrics.summary()["stages"]["fetch"]
+        self.assertEqual(summary["count"], 2)
+        self.assertEqual(summary["errors"], 1)
+        self.assertGreater(summary["max"], 0.001)
+
+    def test_histogram_buckets(self):
+        h = Histogram((0.01, 0.1, 1.0))
+        for value in (0.005, 0.01, 0.05, 2.0):
+            h.observe(value)
+        self.assertEqual(h.counts, [2, 1, 0, 1])
+        self.assertEqual(h.cumulative(), [2, 3, 3, 4])
+        self.assertEqual(h.quantile(0.5), 0.01)
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics(enabled=False)
+        with metrics.stage("predict"):
+            pass
+        metrics.inc("signals")
+        self.assertEqual(metrics.summary(), {"stages": {}, "counters": {}})
+
+    def test_exports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prom = Metrics(path=os.path.join(tmp, "m.prom"), labels={"ticker": "EURUSD"})
+            prom.observe("predict", 0.0004)
+            prom.inc("signals")
+            prom.export()
+            with open(prom.path) as f:
+                text = f.read()
+            self.assertIn('asianrange_stage_seconds_count{ticker="EURUSD",stage="predict"} 1', text)
+            self.assertIn('asianrange_events_total{ticker="EURUSD",event="signals"} 1', text)
+
+            log = Metrics(path=os.path.join(tmp, "m.jsonl"), fmt="jsonl")
+            log.observe("fetch", 0.2)
+            log.export()
+            log.export()
+            with open(log.path) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(lines[0]["stages"]["fetch"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+import importlib.util
+import io
+import unittest
+import pandas as pd
+from modules.asian_range_feature import AsianRange
+from modules.base_bot import LocalBot
+from modules.candle import CandleSeries
+from modules.metrics import Metrics
+from modules.model import Model
+from modules.synthetic import generate_candles
+
+HAS_SKLEARN = importlib.util.find_spec("sklearn") is not None
+
+
+def train(ticker, candles):
+    ar = AsianRange(ticker, candles)
+    ar._run_backtest()
+    model = Model(ticker, pd.DataFrame(ar._data))
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.train(save=False)
+    return model
+
+
+class BrokenFeed:
+    new_rows = 0
+
+    def advance(self, until):
+        raise ConnectionError("no data")
+
+    def get_candles(self):
+        return None
+
+
+# Several symbols in one event loop give the same signals as one replay per symbol
+@unittest.skipUnless(HAS_SKLEARN, "scikit-learn not installed")
+class TestMonitor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.candles = {t: CandleSeries.from_frame(generate_candles(0.3, seed=s))
+                       for s, t in enumerate(("AAA", "BBB", "CCC"))}
+        cls.models = {t: train(t, c) for t, c in cls.candles.items()}
+
+    def _monitor(self, feeds, connection=None):
+        from modules.monitor import Monitor
+        monitor = Monitor(feeds, bot=LocalBot(), workers=2, connection=connection,
+                          metrics=Metrics(path=None), send_charts=False)
+        monitor.load_models(self.models)
+        self.addCleanup(monitor.close)
+        return monitor
+
+    def test_matches_single_symbol_replays(self):
+        from modules.replay import Replay, ReplaySource, bar_events, replay_trader
+        batches = []
+
+        @contextlib.contextmanager
+        def connection():
+            batches.append(1)
+            yield
+
+        monitor = self._monitor({t: ReplaySource(c) for t, c in self.candles.items()}, connection)
+        events = bar_events(self.candles["AAA"])
+        expected = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(monitor.process(events))
+            monitor.notifier.flush(5)  # delivery warnings are printed by the notifier thread
+            for ticker, candles in self.candles.items():
+                expected[ticker] = Replay(replay_trader(ticker, self.models[ticker]), candles).run()
+
+        self.assertEqual(len(batches), len(events))  # one shared connection per bar close
+        cols = ["date", "direction", "prediction"]
+        for ticker, trader in monitor.traders.items():
+            self.assertGreater(len(trader.signals), 0)
+            got = pd.DataFrame(trader.signals)[cols]
+            pd.testing.assert_frame_equal(got, expected[ticker][cols])
+
+    def test_failing_symbol_does_not_stop_others(self):
+        from modules.replay import ReplaySource, bar_events
+        monitor = self._monitor({"AAA": ReplaySource(self.candles["AAA"]), "BBB": BrokenFeed()})
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(monitor.process(bar_events(self.candles["AAA"])))
+        self.assertGreater(len(monitor.traders["AAA"].signals), 0)
+        self.assertGreater(monitor.metrics.counters["fetch_errors"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
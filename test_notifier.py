@@ -0,0 +1,71 @@
+import contextlib
+import io
+import time
+import unittest
+from modules.base_bot import LocalBot
+from modules.notifier import Notifier
+
+
+# Notification queue against the local stand-in backend
+class TestNotifier(unittest.TestCase):
+
+    def test_chart_and_text_coalesce(self):
+        bot = LocalBot(delay=0.05)
+        notifier = Notifier(bot, rate=100, burst=100)
+        notifier.send_message("warm-up")  # keeps the worker busy so the next two wait together
+        notifier.send_photo(b"png", key="signal")
+        notifier.send_message("EURUSD\nShort\nTP prediction", key="signal")
+        self.assertTrue(notifier.flush(2))
+        notifier.close()
+        self.assertEqual([s[0] for s in bot.sent], ["message", "photo"])
+        self.assertEqual(bot.sent[1][1:3], (b"png", "EURUSD\nShort\nTP prediction"))
+        self.assertEqual(notifier.stats["coalesced"], 1)
+
+    def test_latency_measured_on_delivery(self):
+        # bar closed 1s ago; the send itself takes 0.2s, so the bound is crossed only once delivered
+        bot = LocalBot(delay=0.2)
+        notifier = Notifier(bot, rate=100, burst=100, max_latency=1.1)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            notifier.send_message("EURUSD\nShort\nTP prediction", key="signal", bar_close=time.monotonic() - 1.0)
+            notifier.send_message("no signal")  # not tied to a bar close: not timed
+            self.assertTrue(notifier.flush(2))
+            notifier.close()
+        self.assertEqual(len(notifier.latencies), 1)
+        self.assertGreaterEqual(notifier.latencies[0], 1.2)
+        self.assertIn("exceeded 1.1s", out.getvalue())
+
+    def test_producer_never_blocks(self):
+        bot = LocalBot(delay=0.2)
+        notifier = Notifier(bot, maxsize=5, rate=100, burst=100)
+        t0 = time.perf_counter()
+        for i in range(50):
+            notifier.send_message(f"alert {i}")
+        self.assertLess(time.perf_counter() - t0, 0.1)
+        self.assertGreater(notifier.stats["dropped"], 0)
+        notifier.close(timeout=0)
+
+    def test_rate_limit(self):
+        bot = LocalBot()
+        notifier = Notifier(bot, rate=20, burst=1)
+        for i in range(5):
+            notifier.send_message(str(i))
+        self.assertTrue(notifier.flush(2))
+        notifier.close()
+        times = [s[3] for s in bot.sent]
+        self.assertEqual(len(times), 5)
+        self.assertGreaterEqual(times[-1] - times[0], 4 / 20 * 0.9)
+
+    def test_retry_with_backoff(self):
+        bot = LocalBot(fail_first=2)
+        notifier = Notifier(bot, backoff=0.01, rate=100, burst=100)
+        notifier.send_message("hello")
+        self.assertTrue(notifier.flush(2))
+        notifier.close()
+        self.assertEqual(notifier.stats["retried"], 2)
+        self.assertEqual(notifier.stats["sent"], 1)
+        self.assertEqual(bot.sent[0][1], "hello")
+
+
+if __name__ == '__main__':
+    unittest.main()
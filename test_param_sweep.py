@@ -0,0 +1,42 @@
+import unittest
+from multiprocessing import shared_memory
+from unittest import mock
+import pandas as pd
+from modules import param_sweep
+from modules.candle import CandleSeries
+from modules.param_sweep import SweepRunner, grid
+from modules.synthetic import generate_candles
+
+
+# Shared-memory process pool vs the in-process loop
+class TestParamSweep(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.candles = CandleSeries.from_frame(generate_candles(0.5, seed=3))
+        cls.configs = grid({"lookahead": [10, 30], "asia_hours": [(2, 9), (3, 9)], "tp1_frac": [0.5, 0.7]})
+
+    def test_parallel_matches_serial(self):
+        created, make = [], shared_memory.SharedMemory
+
+        def record(*args, **kwargs):
+            shm = make(*args, **kwargs)
+            if kwargs.get("create"):
+                created.append(shm.name)
+            return shm
+
+        serial = SweepRunner(self.candles, workers=1).run(self.configs)
+        with mock.patch.object(param_sweep.shared_memory, "SharedMemory", side_effect=record):
+            parallel = SweepRunner(self.candles, workers=2, chunk_size=3).run(self.configs)
+        pd.testing.assert_frame_equal(parallel, serial)
+        self.assertEqual(len(serial), len(self.configs))
+
+        # every block the parent created is gone once the sweep returns
+        self.assertEqual(len(created), len(param_sweep._FIELDS))
+        for name in created:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from modules.bundle import artifact_path, model_path
+from modules.data_source import SyntheticSource
+from pipeline import run_pipeline
+
+
+# Two symbols over stored synthetic prices; the one without a price file fails on its own
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        # the pipeline writes relative to the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        os.makedirs("prices")
+        SyntheticSource(2).frame("GOOD", 30).to_csv("prices/GOOD.csv", index=False)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def test_failure_is_isolated(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            table = run_pipeline(["GOOD", "MISSING"], workers=2, source="prices/{symbol}.csv")
+
+        self.assertEqual(table.index.tolist(), ["GOOD", "MISSING"])
+        good, missing = table.loc["GOOD"], table.loc["MISSING"]
+        self.assertEqual(good["status"], "ok")
+        self.assertGreater(good["candles"], 0)
+        self.assertGreater(good["patterns"], 0)
+        self.assertAlmostEqual(good["total"], good[["fetch", "load", "features", "train"]].sum())
+        for path in ("modules/data/price/GOOD.csv", "modules/data/features/asian_range_GOOD.csv",
+                     model_path("GOOD"), os.path.join(artifact_path("GOOD"), "header.json")):
+            self.assertTrue(os.path.exists(path), path)
+
+        self.assertEqual(missing["status"], "failed")
+        self.assertEqual(missing["failed_stage"], "fetch")
+        self.assertIn("FileNotFoundError", missing["error"])
+        self.assertFalse(os.path.exists(model_path("MISSING")))
+
+
+if __name__ == "__main__":
+    unittest.main()
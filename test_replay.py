@@ -0,0 +1,36 @@
+import contextlib
+import io
+import unittest
+import pandas as pd
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.model import Model
+from modules.synthetic import generate_candles
+
+
+# Live decision path replayed over synthetic history, checked against the backtest rows
+class TestReplay(unittest.TestCase):
+
+    def test_signals_match_backtest_days(self):
+        from modules.replay import Replay, replay_trader
+        candles = CandleSeries.from_frame(generate_candles(0.5, seed=2))
+        ar = AsianRange("SYNTH", candles)
+        ar._run_backtest()
+        rows = pd.DataFrame(ar._data)
+        model = Model("SYNTH", rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.train(save=False)
+
+        replay = Replay(replay_trader("SYNTH", model), candles)
+        signals = replay.run()
+        self.assertGreater(len(signals), 0)
+        report = replay.compare(rows)
+        self.assertEqual(report["only_live"], [])
+        self.assertEqual(report["same_direction"], report["matched_days"])
+        features = report["features"].set_index("feature")
+        for col in ("asian_high", "asian_low", "entry_price", "rr_tp1", "atr14", "ema20", "rsi14", "macd"):
+            self.assertEqual(features.loc[col, "mismatches"], 0, col)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from modules.scheduler import BarScheduler, FakeClock
+
+
+# Scheduler driven by a fake clock: wake-ups and session events
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        # 2024-06-03 is a Monday in EU summer time; broker = UTC+3
+        self.clock = FakeClock(datetime(2024, 6, 3, 4, 10, tzinfo=timezone.utc))
+        self.scheduler = BarScheduler(latency_offset=2.0, clock=self.clock)
+
+    def test_wakes_at_bar_close(self):
+        event = self.scheduler.wait_next()
+        self.assertEqual(event.bar_close, datetime(2024, 6, 3, 7, 30))
+        self.assertEqual(self.scheduler.broker_now(), datetime(2024, 6, 3, 7, 30, 2))
+        event = self.scheduler.wait_next()
+        self.assertEqual(event.bar_open, datetime(2024, 6, 3, 7, 30))
+        self.assertAlmostEqual(self.clock.sleeps[-1], 1800.0)
+
+    def test_session_events(self):
+        seen = {}
+        for _ in range(48):
+            event = self.scheduler.wait_next()
+            for name in event.events:
+                seen.setdefault(name, event.bar_close)
+        self.assertEqual(seen["asia_done"], datetime(2024, 6, 3, 9, 0))
+        self.assertEqual(seen["london_open"], datetime(2024, 6, 3, 10, 0))
+        self.assertEqual(seen["london_close"], datetime(2024, 6, 3, 15, 0))
+        self.assertEqual(seen["new_day"], datetime(2024, 6, 4, 0, 0))
+
+    def test_async_wait(self):
+        async def two():
+            events = self.scheduler.aevents()
+            return [await anext(events), await anext(events)]
+
+        first, second = asyncio.run(two())
+        self.assertEqual(first.bar_close, datetime(2024, 6, 3, 7, 30))
+        self.assertEqual(second.bar_close, datetime(2024, 6, 3, 8, 0))
+        self.assertEqual(self.scheduler.broker_now(), datetime(2024, 6, 3, 8, 0, 2))
+
+    def test_winter_offset(self):
+        # 2024-01-15 is a Monday in EU winter time: broker = UTC+2, Asia ends at 10:00 broker (08:00 UTC)
+        clock = FakeClock(datetime(2024, 1, 15, 4, 10, tzinfo=timezone.utc))
+        scheduler = BarScheduler(latency_offset=2.0, clock=clock)
+        event = scheduler.wait_next()
+        self.assertEqual(event.bar_close, datetime(2024, 1, 15, 6, 30))
+        self.assertEqual(clock.now(), datetime(2024, 1, 15, 4, 30, 2, tzinfo=timezone.utc))
+        seen = {}
+        for _ in range(48):
+            event = scheduler.wait_next()
+            for name in event.events:
+                seen.setdefault(name, event.bar_close)
+        self.assertEqual(seen["asia_done"], datetime(2024, 1, 15, 10, 0))
+        self.assertEqual(scheduler.to_utc(seen["asia_done"]), datetime(2024, 1, 15, 8, 0, tzinfo=timezone.utc))
+        self.assertEqual(seen["london_open"], datetime(2024, 1, 15, 11, 0))
+        self.assertEqual(seen["london_close"], datetime(2024, 1, 15, 16, 0))
+
+    def test_latency(self):
+        event = self.scheduler.wait_next()
+        self.clock.advance(0.5)
+        self.assertAlmostEqual(self.scheduler.since_close(event), 2.5)
+
+    def test_clock_jumps(self):
+        self.clock.advance_to(datetime(2024, 6, 3, 5, 0))  # naive = UTC
+        self.assertEqual(self.clock.now(), datetime(2024, 6, 3, 5, 0, tzinfo=timezone.utc))
+        self.clock.advance_to(datetime(2024, 6, 3, 4, 0, tzinfo=timezone.utc))  # already passed
+        self.assertEqual(self.clock.now(), datetime(2024, 6, 3, 5, 0, tzinfo=timezone.utc))
+        self.clock.set(datetime(2024, 6, 3, 4, 0, tzinfo=timezone.utc))
+        self.assertEqual(self.scheduler.broker_now(), datetime(2024, 6, 3, 7, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
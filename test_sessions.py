@@ -0,0 +1,38 @@
+import unittest
+import pandas as pd
+from modules.sessions import label_sessions, session_of, SESSION_HOURS
+
+
+# Vectorized session labels must be identical to the per-row function
+class TestSessions(unittest.TestCase):
+
+    def assertSameLabels(self, dates):
+        expected = [session_of(ts) for ts in dates]
+        got = label_sessions(dates).astype(str).tolist()
+        self.assertEqual(got, expected)
+
+    def test_matches_row_function(self):
+        # 15 minute bars across two DST switches and a year boundary
+        dates = pd.Series(pd.date_range("2023-03-20", "2024-04-05", freq="15min", tz="UTC"))
+        self.assertSameLabels(dates)
+
+    def test_dst_edges(self):
+        edges = ["2021-03-28", "2021-10-31", "2024-03-31", "2024-10-27", "2025-01-01"]
+        dates = pd.Series([pd.Timestamp(e, tz="UTC") + pd.Timedelta(minutes=m)
+                           for e in edges for m in range(-120, 121, 1)])
+        self.assertSameLabels(dates)
+
+    def test_categorical_and_windows(self):
+        dates = pd.Series(pd.date_range("2024-06-03", periods=48, freq="30min", tz="UTC"))
+        labels = label_sessions(dates)
+        self.assertIsInstance(labels.dtype, pd.CategoricalDtype)
+
+        # wider London window and a window wrapping midnight
+        windows = dict(SESSION_HOURS, London=(10, 16), Night=(23, 2))
+        labels = label_sessions(dates, windows).astype(str)
+        self.assertEqual(labels[dates.dt.hour == 15].unique().tolist(), ["London"])
+        self.assertEqual(labels[dates.dt.hour.isin([23, 0, 1])].unique().tolist(), ["Night"])
+
+
+if __name__ == '__main__':
+    unittest.main()
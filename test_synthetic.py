@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from modules import backtest
+from modules.candle import CandleSeries
+from modules.synthetic import generate_candles
+
+
+# Synthetic candle generator: deterministic, session-labelled, with gaps and sweeps
+class TestSynthetic(unittest.TestCase):
+
+    def test_deterministic(self):
+        self.assertTrue(generate_candles(0.5, seed=7).equals(generate_candles(0.5, seed=7)))
+        self.assertFalse(generate_candles(0.5, seed=7).equals(generate_candles(0.5, seed=8)))
+
+    def test_bars_are_consistent(self):
+        df = generate_candles(1, seed=1)
+        self.assertTrue((df["High"] >= df[["Open", "Close"]].max(axis=1)).all())
+        self.assertTrue((df["Low"] <= df[["Open", "Close"]].min(axis=1)).all())
+        self.assertTrue((df["Date"].dt.dayofweek < 5).all())
+        self.assertEqual(set(df["Session"].cat.categories) & {"Asia", "London"}, {"Asia", "London"})
+
+    def test_produces_sweeps(self):
+        candles = CandleSeries.from_frame(generate_candles(1, seed=2))
+        trades = len(backtest.run_backtest(candles)["index"])
+        days = len(np.unique(backtest.trading_days(candles)))
+        self.assertGreater(trades, days // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
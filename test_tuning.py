@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import pandas as pd
+from modules.asian_range_feature import AsianRange
+from modules.candle import CandleSeries
+from modules.model import Model
+from modules.synthetic import generate_candles
+from modules.tuning import SuccessiveHalving, load_params, tuning_log_path, tuning_path
+
+SPACE = {"n_estimators": [5, 10], "max_depth": [None, 3], "min_samples_leaf": [1, 5]}
+
+
+# Successive halving over walk-forward folds, persisted next to the model
+class TestTuning(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        candles = CandleSeries.from_frame(generate_candles(3, seed=5))
+        ar = AsianRange("SYNTH", candles)
+        ar._run_backtest()
+        cls.rows = pd.DataFrame(ar._data)
+
+    def setUp(self):
+        # search results are written relative to the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def test_rungs_halve_configurations(self):
+        folds = Model("SYNTH", self.rows).folds(n_folds=5)
+        search = SuccessiveHalving(folds, SPACE, n_configs=6, eta=3, workers=1)
+        self.assertEqual(search._rungs(), [1, 3, 5])
+        params, log = search.run()
+        for key, value in params.items():
+            self.assertIn(value, SPACE[key])
+        per_rung = log.groupby("rung")["config"].nunique().tolist()
+        self.assertEqual(per_rung, [6, 2, 1])
+        self.assertEqual(search.best_folds, 5)
+        self.assertFalse(search.stopped_early)
+
+    def test_budget_stops_search(self):
+        folds = Model("SYNTH", self.rows).folds(n_folds=3)
+        search = SuccessiveHalving(folds, SPACE, n_configs=8, budget=0.0, workers=1)
+        params, log = search.run()
+        self.assertTrue(search.stopped_early)
+        self.assertEqual(params, {})
+
+    def test_budget_does_not_wait_for_running_trials(self):
+        folds = Model("SYNTH", self.rows).folds(n_folds=3)
+        slow = {"n_estimators": [3000]}  # one trial takes several seconds
+        search = SuccessiveHalving(folds, slow, n_configs=1, budget=0.5, workers=1)
+        t0 = time.monotonic()
+        search.run()
+        self.assertTrue(search.stopped_early)
+        self.assertLess(time.monotonic() - t0, search.budget + 1.0)
+
+    def test_tuned_params_persist(self):
+        model = Model("SYNTH", self.rows)
+        params = model.tune(budget=60.0, n_configs=4, n_folds=3, workers=1, space=SPACE)
+        self.assertTrue(os.path.exists(tuning_path("SYNTH")))
+        self.assertTrue(os.path.exists(tuning_log_path("SYNTH")))
+        self.assertEqual(load_params("SYNTH"), params)
+        reloaded = Model("SYNTH", self.rows).model.get_params()
+        for key, value in params.items():
+            self.assertEqual(reloaded[key], value)
+
+    def test_expired_budget_keeps_saved_params(self):
+        model = Model("SYNTH", self.rows)
+        params = model.tune(budget=60.0, n_configs=4, n_folds=3, workers=1, space=SPACE)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(model.tune(budget=0.0, n_configs=4, n_folds=3, workers=1, space=SPACE), {})
+        self.assertEqual(load_params("SYNTH"), params)
+        for key, value in params.items():
+            self.assertEqual(model.model.get_params()[key], value)
+
+
+if __name__ == "__main__":
+    unittest.main()
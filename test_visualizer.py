@@ -0,0 +1,28 @@
+import unittest
+import numpy as np
+from modules.visualizer import Visualizer, asia_spans
+from test_backtest import random_candles
+
+
+# In-memory chart rendering
+class TestVisualizer(unittest.TestCase):
+
+    def test_asia_spans_merge_contiguous_bars(self):
+        x = np.arange(8, dtype=float)
+        mask = np.array([0, 1, 1, 1, 0, 0, 1, 1], dtype=bool)
+        spans = asia_spans(x, mask)
+        self.assertEqual(len(spans), 2)
+        self.assertEqual(spans[0][0], 1.0)
+        self.assertEqual(spans[1][0], 6.0)
+
+    def test_render_png_bytes(self):
+        candles = random_candles(300)
+        png = Visualizer("EURUSD", candles).render({"asian_high": 1.1, "asian_low": 1.09})
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        # the template is reused: a second render starts from a clean axes
+        again = Visualizer("EURUSD", candles).render({"asian_high": 1.1, "asian_low": 1.09})
+        self.assertEqual(png, again)
+
+
+if __name__ == '__main__':
+    unittest.main()
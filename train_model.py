@@ -1,9 +1,8 @@
-from modules.candle import Candlestick
+from modules.candle import CandleSeries
 from modules.asian_range_feature import AsianRange
 from modules.model import Model
 from modules.collect_data import MT5DataFetcher
 
-import pandas as pd
 
 def main():
     # hardcoded ticker for now
@@ -13,15 +12,9 @@ def main():
     fetcher = MT5DataFetcher(ticker)
     fetcher.get_data()
 
-    # load the csv into DataFrame
-    df = pd.read_csv(f"modules/data/price/{ticker}.csv", parse_dates=["Date"])
-    print("Data is loaded")
-
-    # convert rows into Candlestick objects
-    candles = [Candlestick(row["Index"], row["Date"], row["Open"], row["High"],
-                           row["Low"], row["Close"], row["Volume"], row["Session"])
-               for _, row in df.iterrows()]
-    print(f"Candles created: {len(candles)}")
+    # load the csv straight into columnar candle arrays
+    candles = CandleSeries.from_csv(f"modules/data/price/{ticker}.csv")
+    print(f"Candles loaded: {len(candles)}")
 
     # collect features for AI training
     detector = AsianRange(ticker, candles)
@@ -31,7 +24,12 @@ def main():
     # train model on generated features
     model = Model(ticker)
     model.train()
-    model.evaluate()
+
+    # walk-forward cross-validation (folds fitted in parallel)
+    per_fold, summary = model.cross_validate()
+    print(per_fold.to_string(index=False))
+    print(f"F1 {summary['f1_mean']:.3f} ± {summary['f1_std']:.3f}, "
+          f"precision {summary['precision_mean']:.3f} ± {summary['precision_std']:.3f}")
 
 if __name__ == "__main__":
     main()
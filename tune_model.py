@@ -0,0 +1,26 @@
+# successive-halving hyperparameter search for the classifier, then retrain with the winner
+import argparse
+from modules.model import Model
+from modules.tuning import tuning_path, tuning_log_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter search on walk-forward folds")
+    parser.add_argument("ticker", nargs="?", default="EURUSD")
+    parser.add_argument("--budget", type=float, default=300.0, help="wall-clock seconds for the search")
+    parser.add_argument("--configs", type=int, default=27, help="random configurations in the first rung")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    model = Model(args.ticker)
+    params = model.tune(budget=args.budget, n_configs=args.configs, n_folds=args.folds, workers=args.workers)
+    print(f"Best params: {params}")
+    print(f"Search saved to {tuning_path(args.ticker)} and {tuning_log_path(args.ticker)}")
+
+    # retrain on the usual split with the tuned estimator
+    model.train()
+
+
+if __name__ == "__main__":
+    main()